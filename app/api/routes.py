@@ -1,116 +1,323 @@
 """API routes for the orchestrator status application"""
 
+import math
+import time
 from datetime import datetime
 from functools import wraps
-from flask import Blueprint, jsonify, request, abort
+from typing import Optional
+from urllib.parse import urlsplit
+from flask import Blueprint, Response, g, jsonify, request, abort
 from flask_limiter.util import get_remote_address
 
 from config.settings import Config
-from app.services.status_service import StatusService
+from app.services.api_keys import ApiKeyStore, key_prefix
+from app.services.history_store import FLEET_SERIES, parse_step
+from app.services.status_service import StatusService, create_fleet_services
+from app.services.status_stream import StatusBroadcaster
 from app.main import get_logger
 
 # Create API blueprint
 api_bp = Blueprint('api', __name__)
 
-# Initialize status service
-status_service = StatusService()
+# Initialize a status service per fleet; the unprefixed routes serve the primary fleet
+fleet_services = create_fleet_services()
+status_service = next(iter(fleet_services.values()))
+
+# Hashed API keys, reloaded from API_KEYS_FILE when it changes
+api_keys = ApiKeyStore(Config.API_KEYS, Config.API_KEYS_FILE or None, Config.API_KEYS_RELOAD_INTERVAL)
+
+# Push channels for /api/stream, one per fleet and worker process
+status_broadcasters = {
+    name: StatusBroadcaster(
+        service,
+        max_clients=Config.STREAM_MAX_CLIENTS,
+        max_stream_seconds=Config.STREAM_MAX_SECONDS
+    )
+    for name, service in fleet_services.items()
+}
+
+
+def notify_streams():
+    """Wake the stream watchers of every fleet (called after an in-process update)."""
+    for broadcaster in status_broadcasters.values():
+        broadcaster.notify()
+
+
+def get_fleet_service(fleet: Optional[str]) -> StatusService:
+    """Return the status service of a fleet (the primary fleet for None), or abort with 404."""
+    if fleet is None:
+        return status_service
+    service = fleet_services.get(fleet)
+    if service is None:
+        abort(404, description=f"Unknown fleet '{fleet}'")
+    return service
+
+
+def is_browser_request(headers) -> bool:
+    """True for requests from the web UI: a browser whose Referer is on the requested host."""
+    referer = headers.get('Referer')
+    if not referer or 'Mozilla' not in headers.get('User-Agent', ''):
+        return False
+    try:
+        # Compare just the host:port part (works from any IP/domain the UI is served on)
+        return urlsplit(referer).netloc == headers.get('Host', '')
+    except ValueError:
+        return False
 
 
 def require_api_key(f):
     """Decorator to require API key authentication for external requests."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Check if this is an internal request (from the web UI)
-        referer = request.headers.get('Referer', '')
-        user_agent = request.headers.get('User-Agent', '')
-        host = request.headers.get('Host', '')
-        
-        # Allow browser requests from the same host (regardless of IP/domain)
-        # This allows the web UI to work from any IP/domain
-        is_browser_request = False
-        if referer and user_agent and 'Mozilla' in user_agent:
-            # Extract the host from the referer
-            try:
-                from urllib.parse import urlparse
-                referer_host = urlparse(referer).netloc
-                # Compare just the host:port part
-                is_browser_request = referer_host == host
-            except:
-                pass
-        
-        if not is_browser_request:
-            # Require API key for external requests
-            if Config.API_KEYS:
-                api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
-                if not api_key or api_key not in Config.API_KEYS:
-                    logger = get_logger()
-                    logger.warning(f"Unauthorized API access attempt from {get_remote_address()} with key: {api_key[:8] + '...' if api_key else 'None'}")
-                    abort(401, description="Invalid or missing API key")
+        if api_keys.enabled:
+            # A valid key is the common case for external clients and skips the browser checks
+            headers = request.headers
+            api_key = headers.get('X-API-Key') or request.args.get('api_key')
+            key_info = api_keys.lookup(api_key)
+            if key_info is None and not is_browser_request(headers):
+                logger = get_logger()
+                logger.warning(f"Unauthorized API access attempt from {get_remote_address()} with key: {key_prefix(api_key)}")
+                abort(401, description="Invalid or missing API key")
+            g.api_key_info = key_info
         
         return f(*args, **kwargs)
     return decorated_function
 
 
-@api_bp.route('/status')
-@require_api_key
-def api_status():
-    """Return the current orchestrator status as JSON."""
-    data = status_service.get_status()
-    if not data:
+def rendered_response(service, endpoint):
+    """
+    Serve a pre-serialized response body for a fleet's current status snapshot.
+    
+    Honors If-None-Match and If-Modified-Since with 304s and picks a brotli or
+    gzip variant according to Accept-Encoding.
+    """
+    rendered = service.get_rendered(endpoint)
+    if rendered is None:
         return jsonify({
             'error': 'Status data not available',
             'message': 'Please wait for the updater to run'
         }), 503
     
-    # Add some metadata
-    response_data = {
-        'success': True,
-        'data': data,
-        'api_version': '1.0'
-    }
+    body, encoding, etag = rendered.select(request.accept_encodings)
+    
+    not_modified = False
+    if request.if_none_match:
+        not_modified = rendered.matches_etag(request.if_none_match)
+    elif request.if_modified_since:
+        not_modified = rendered.last_modified <= request.if_modified_since.timestamp()
     
-    return jsonify(response_data)
+    response = Response(b'' if not_modified else body,
+                        status=304 if not_modified else 200,
+                        mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Last-Modified'] = rendered.last_modified_http
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding and not not_modified:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@api_bp.route('/status')
+@api_bp.route('/<fleet>/status')
+@require_api_key
+def api_status(fleet=None):
+    """Return the current orchestrator status as JSON."""
+    return rendered_response(get_fleet_service(fleet), 'status')
 
 
 @api_bp.route('/status/summary')
+@api_bp.route('/<fleet>/status/summary')
 @require_api_key
-def api_status_summary():
+def api_status_summary(fleet=None):
     """Return a summary of the orchestrator status."""
-    data = status_service.get_summary()
-    if not data:
+    # Just the summary without individual orchestrator details
+    return rendered_response(get_fleet_service(fleet), 'summary')
+
+
+@api_bp.route('/status/changes')
+@api_bp.route('/<fleet>/status/changes')
+@require_api_key
+def api_status_changes(fleet=None):
+    """Return only the orchestrators that changed since the version the client last saw."""
+    since = request.args.get('since', 0, type=int)
+    
+    changes = get_fleet_service(fleet).get_changes(since)
+    if changes is None:
         return jsonify({
             'error': 'Status data not available',
             'message': 'Please wait for the updater to run'
         }), 503
     
-    # Return just the summary without individual orchestrator details
-    summary = {
+    return jsonify({
         'success': True,
-        'data': data,
+        'data': changes,
         'api_version': '1.0'
-    }
-    
-    return jsonify(summary)
+    })
 
 
-@api_bp.route('/pillars')
+@api_bp.route('/stream')
+@api_bp.route('/<fleet>/stream')
 @require_api_key
-def api_pillars():
-    """Return comprehensive pillar data combining static info and current status."""
-    data = status_service.get_pillars()
-    if not data:
+def api_stream(fleet=None):
+    """
+    Push status updates as Server-Sent Events.
+    
+    The first event is a full 'snapshot' (or a 'delta' when reconnecting with
+    Last-Event-ID one version behind); later events carry only the changes.
+    """
+    status_broadcaster = status_broadcasters[get_fleet_service(fleet).fleet.name]
+    if not status_broadcaster.acquire_client():
         return jsonify({
-            'error': 'Status data not available',
-            'message': 'Please wait for the updater to run'
+            'error': 'Too many streaming clients',
+            'message': 'Use /api/stream/poll instead'
         }), 503
     
-    response_data = {
+    client_version = request.headers.get('Last-Event-ID', 0, type=int)
+    response = Response(status_broadcaster.stream(client_version), mimetype='text/event-stream')
+    # Runs when the stream ends or the client disconnects, even before the first event
+    response.call_on_close(status_broadcaster.release_client)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
+@api_bp.route('/stream/poll')
+@api_bp.route('/<fleet>/stream/poll')
+@require_api_key
+def api_stream_poll(fleet=None):
+    """
+    Long-poll fallback for /api/stream.
+    
+    Waits until a snapshot newer than `since` exists and returns the same
+    payload as /api/status/changes, or 204 when nothing changed before the timeout.
+    """
+    since = request.args.get('since', 0, type=int)
+    timeout = min(request.args.get('timeout', Config.STREAM_POLL_TIMEOUT, type=int), Config.STREAM_POLL_TIMEOUT)
+    
+    status_broadcaster = status_broadcasters[get_fleet_service(fleet).fleet.name]
+    body, version = status_broadcaster.poll(since, max(0, timeout))
+    if body is None:
+        response = Response(status=204)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@api_bp.route('/status/history')
+@api_bp.route('/<fleet>/status/history')
+@require_api_key
+def api_status_history(fleet=None):
+    """Return recent status summaries, newest first (requires the Redis backend)."""
+    service = get_fleet_service(fleet)
+    limit = request.args.get('limit', 100, type=int)
+    limit = max(1, min(limit, Config.REDIS_HISTORY_LENGTH))
+
+    history = service.get_history(limit)
+    return jsonify({
         'success': True,
-        'data': data,
+        'data': {
+            'backend': service.storage.name,
+            'count': len(history),
+            'history': history
+        },
         'api_version': '1.0'
-    }
-    
-    return jsonify(response_data)
+    })
+
+
+def parse_time_param(value, default):
+    """Parse a Unix timestamp or ISO 8601 query parameter."""
+    if value is None or value == '':
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp())
+    if not math.isfinite(number):
+        raise ValueError(f"Invalid time '{value}'")
+    return int(number)
+
+
+@api_bp.route('/history')
+@api_bp.route('/<fleet>/history')
+@require_api_key
+def api_history(fleet=None):
+    """
+    Return a metric over time from the 1m/1h/1d rollups.
+
+    Query parameters: ip (orchestrator IP, default the fleet-wide series),
+    metric, from/to (Unix seconds or ISO 8601, default the last 24 hours) and
+    step (seconds or e.g. '5m', '1h', '1d').
+    """
+    service = get_fleet_service(fleet)
+    if service.history is None:
+        return jsonify({
+            'error': 'History not available',
+            'message': 'Set HISTORY_ENABLED=true to record status history'
+        }), 404
+
+    ip = request.args.get('ip') or FLEET_SERIES
+    if ip != FLEET_SERIES and ip not in service.orchestrator_ips:
+        return jsonify({'error': 'Unknown orchestrator', 'message': f"No history for '{ip}'"}), 404
+
+    metrics = service.history.metrics_for(ip)
+    metric = request.args.get('metric') or metrics[0]
+    try:
+        end = parse_time_param(request.args.get('to'), int(time.time()))
+        start = parse_time_param(request.args.get('from'), end - 86400)
+        step = request.args.get('step')
+        # Default to roughly 300 points over the range
+        step = parse_step(step) if step else max(60, (end - start) // 300)
+        if start >= end:
+            raise ValueError("'from' must be before 'to'")
+        result = service.history.query(ip, metric, start, end, step)
+    except (ValueError, OverflowError) as e:
+        return jsonify({
+            'error': 'Invalid history query',
+            'message': str(e),
+            'metrics': list(metrics)
+        }), 400
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'ip': ip,
+            'metric': metric,
+            'from': start,
+            'to': end,
+            'step': result['step'],
+            'resolution': result['resolution'],
+            'points': result['points']
+        },
+        'api_version': '1.0'
+    })
+
+
+@api_bp.route('/pillars')
+@api_bp.route('/<fleet>/pillars')
+@require_api_key
+def api_pillars(fleet=None):
+    """Return comprehensive pillar data combining static info and current status."""
+    return rendered_response(get_fleet_service(fleet), 'pillars')
+
+
+@api_bp.route('/fleets')
+@require_api_key
+def api_fleets():
+    """Return the monitored fleets with their settings and current bridge status."""
+    fleets = []
+    for service in fleet_services.values():
+        info = service.fleet.describe()
+        summary = service.get_summary() or {}
+        info['bridge_status'] = summary.get('bridge_status', 'unknown')
+        info['online_count'] = summary.get('online_count')
+        fleets.append(info)
+    return jsonify({
+        'success': True,
+        'data': {'fleets': fleets},
+        'api_version': '1.0'
+    })
 
 
 @api_bp.route('/auth/info')
@@ -118,19 +325,15 @@ def api_pillars():
 def api_auth_info():
     """Return API authentication information."""
     api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
-    
-    # Find the index of the current API key (for identification)
-    key_index = None
-    if api_key and api_key in Config.API_KEYS:
-        key_index = Config.API_KEYS.index(api_key) + 1
+    key_info = g.get('api_key_info')
     
     return jsonify({
         'success': True,
         'data': {
             'authenticated': True,
-            'key_index': key_index,
-            'total_keys_configured': len(Config.API_KEYS),
-            'key_prefix': api_key[:8] + '...' if api_key else None,
+            'key_index': key_info.index if key_info else None,
+            'total_keys_configured': api_keys.count,
+            'key_prefix': key_prefix(api_key),
             'access_time': datetime.now().isoformat()
         },
         'api_version': '1.0'
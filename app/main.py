@@ -2,7 +2,8 @@
 
 import os
 import sys
-from flask import Flask
+import time
+from flask import Flask, g, request
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -13,6 +14,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.settings import Config
 from config.logging import setup_logging
 from app.services.background_updater import BackgroundUpdater
+from app.services.metrics import HTTP_DURATION, registry as metrics
+from app.services.rate_limit_storage import limiter_storage_uri
 
 
 def create_app():
@@ -34,19 +37,44 @@ def create_app():
     # Store logger in app context for access by other modules
     app.logger_instance = logger
     
+    # Metrics are written per process and merged by /metrics
+    if Config.METRICS_ENABLED:
+        metrics.configure(os.path.join('data', Config.METRICS_DIR), Config.METRICS_FLUSH_INTERVAL)
+    
     # Initialize background updater (but don't start it here for Gunicorn)
     app.background_updater = BackgroundUpdater(update_interval=Config.UPDATE_INTERVAL, app=app)
     
     # Configure CORS
     CORS(app, origins=Config.ALLOWED_ORIGINS)
     
-    # Configure rate limiting
+    # Configure rate limiting: counters are shared by all workers (RATE_LIMIT_STORAGE), and
+    # 304 responses, which cost almost nothing to serve, do not use up the budget
     limiter = Limiter(
         key_func=get_remote_address,
-        default_limits=[f"{Config.RATE_LIMIT_PER_MINUTE} per minute"]
+        default_limits=[f"{Config.RATE_LIMIT_PER_MINUTE} per minute"],
+        default_limits_deduct_when=lambda response: response.status_code != 304,
+        storage_uri=limiter_storage_uri(Config),
+        strategy=Config.RATE_LIMIT_STRATEGY,
+        key_prefix=f"{Config.REDIS_KEY_PREFIX}:ratelimit" if Config.RATE_LIMIT_STORAGE == 'redis' else ''
     )
     limiter.init_app(app)
     
+    # Per-route request timings
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get('request_started')
+        if started is not None:
+            # The route pattern, not the path, keeps the label set bounded
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            metrics.observe(HTTP_DURATION,
+                            (('endpoint', endpoint), ('method', request.method), ('status', str(response.status_code))),
+                            time.perf_counter() - started)
+        return response
+    
     # Security headers middleware
     @app.after_request
     def after_request(response):
@@ -58,12 +86,18 @@ def create_app():
         return response
     
     # Register blueprints
-    from app.web.routes import web_bp
-    from app.api.routes import api_bp
+    from app.web.routes import web_bp, health_check
+    from app.api.routes import api_bp, notify_streams
+    
+    # Health checks from load balancers and monitoring are never rate limited
+    limiter.exempt(health_check)
     
     app.register_blueprint(web_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # Push updates to streaming clients as soon as an in-process update completes
+    app.background_updater.add_listener(notify_streams)
+    
     # Background updater will be stopped by signal handlers in run.py
     
     logger.info("Flask application created successfully")
@@ -0,0 +1,45 @@
+"""Dedicated poller process: runs the background updater outside the request workers"""
+
+import os
+import signal
+import sys
+import threading
+
+# Add the project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.main import create_app, get_logger, stop_background_services
+
+
+def main():
+    """Run the background updater until SIGTERM/SIGINT."""
+    app = create_app()
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    with app.app_context():
+        logger = get_logger()
+        logger.info(f"Poller process {os.getpid()} starting")
+        app.background_updater.start()
+        try:
+            if app.background_updater.status_service.should_update():
+                app.background_updater.force_update()
+        except Exception as e:
+            # The update loop keeps retrying on its own schedule
+            logger.error(f"Initial status update failed: {e}")
+
+    while not stop_event.wait(1.0):
+        pass
+
+    with app.app_context():
+        get_logger().info(f"Poller process {os.getpid()} stopping")
+    stop_background_services(app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+API key lookup for require_api_key.
+Keys are stored as HMAC-SHA256 digests under a random per-process secret and
+looked up in a dict, so checking a key costs one digest and one hash lookup
+regardless of how many keys are configured, and the comparison happens on
+digests the client cannot predict rather than on the keys themselves. Keys
+come from API_KEYS, or from API_KEYS_FILE (one key per line), which is
+re-read when it changes so keys can be rotated without a restart.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class KeyInfo:
+    """Metadata of one configured API key."""
+
+    __slots__ = ('index', 'prefix')
+
+    def __init__(self, index: int, prefix: str):
+        self.index = index  # 1-based position in the configuration
+        self.prefix = prefix
+
+
+def key_prefix(api_key: Optional[str]) -> Optional[str]:
+    """Shortened key for logs and /api/auth/info."""
+    return api_key[:8] + '...' if api_key else None
+
+
+def read_key_file(path: str) -> List[str]:
+    """Read API keys from a file: one per line (or comma-separated), '#' starts a comment."""
+    keys = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            keys.extend(key.strip() for key in line.split(',') if key.strip())
+    return keys
+
+
+class ApiKeyStore:
+    """Thread-safe set of hashed API keys, optionally reloaded from a key file."""
+
+    def __init__(self, keys: List[str], path: Optional[str] = None, reload_interval: float = 10,
+                 clock=time.monotonic):
+        """
+        Initialize the key store.
+
+        Args:
+            keys: Keys from the environment, used when no key file is given
+            path: Key file that replaces `keys` and is reloaded when it changes
+            reload_interval: Minimum seconds between key file change checks (0 disables reloading)
+            clock: Monotonic time source
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.clock = clock
+        self._secret = secrets.token_bytes(32)
+        self._digests: Dict[bytes, KeyInfo] = {}
+        self._file_signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        if path:
+            self._load_file()
+        else:
+            self._set_keys(keys)
+
+    def _digest(self, api_key: str) -> bytes:
+        return hmac.new(self._secret, api_key.encode('utf-8'), hashlib.sha256).digest()
+
+    def _set_keys(self, keys: List[str]):
+        digests = {}
+        for index, key in enumerate(keys, start=1):
+            digests.setdefault(self._digest(key), KeyInfo(index, key_prefix(key)))
+        self._digests = digests  # Rebound, never mutated, so lookups need no lock
+
+    def _load_file(self):
+        try:
+            stat = os.stat(self.path)
+            # Remembered even if reading fails, so a broken file is only re-read once it changes
+            self._file_signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            keys = read_key_file(self.path)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Failed to read API key file {self.path}: {e}")
+            return
+        if not keys:
+            logger.warning(f"API key file {self.path} contains no keys: API key authentication is disabled")
+        self._set_keys(keys)
+        logger.info(f"Loaded {len(self._digests)} API keys from {self.path}")
+
+    def refresh(self):
+        """Reload the key file if it changed, checking at most once per reload interval."""
+        if not self.path or self.reload_interval <= 0 or self.clock() < self._next_check:
+            return
+        with self._lock:
+            if self.clock() < self._next_check:
+                return
+            self._next_check = self.clock() + self.reload_interval
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                logger.warning(f"Cannot stat API key file {self.path}: {e}")
+                return
+            if (stat.st_mtime_ns, stat.st_size, stat.st_ino) != self._file_signature:
+                self._load_file()
+
+    @property
+    def enabled(self) -> bool:
+        """True when at least one key is configured (otherwise the API is open)."""
+        self.refresh()
+        return bool(self._digests)
+
+    @property
+    def count(self) -> int:
+        self.refresh()
+        return len(self._digests)
+
+    def lookup(self, api_key: Optional[str]) -> Optional[KeyInfo]:
+        """Return the metadata of a configured key, or None for a missing or unknown key."""
+        if not api_key:
+            return None
+        self.refresh()
+        return self._digests.get(self._digest(api_key))
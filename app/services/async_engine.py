@@ -0,0 +1,284 @@
+"""
+Asyncio polling engine for orchestrator nodes.
+Fans out to every orchestrator at once, bounded by a single global concurrency
+limit and a per-host connection limit, instead of fixed-size thread batches.
+The event loop and client session live as long as the engine, so keep-alive
+connections to the orchestrators are reused from one cycle to the next.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.services.connection_pool import connection_trace_config
+from app.services.metrics import (
+    RPC_DURATION, RPC_ERRORS, RPC_REQUEST_BYTES, RPC_RESPONSE_BYTES, RPC_RETRIES, registry as metrics
+)
+from app.services.orchestrator_client import JSON_HEADERS, RPC_MODE_BATCH, BatchNotSupportedError
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Retry behaviour mirrors the urllib3 Retry used by the threaded engine
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class AsyncPollingEngine:
+    """Polls all orchestrators concurrently on a single asyncio event loop."""
+
+    def __init__(self, client, max_concurrency: int = 100, per_host_limit: int = 2,
+                 keepalive_timeout: float = 300):
+        """
+        Initialize the async polling engine.
+
+        Args:
+            client: OrchestratorClient used for URL building and result processing
+            max_concurrency: Maximum number of requests in flight across all orchestrators
+            per_host_limit: Maximum number of concurrent connections per orchestrator
+            keepalive_timeout: Seconds an idle connection is kept open (keep it above the poll interval)
+        """
+        self.client = client
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.keepalive_timeout = keepalive_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = None
+        self._lock = threading.Lock()  # One cycle at a time on the engine's loop
+
+    @staticmethod
+    def available() -> bool:
+        """Return True if the async engine's dependencies are installed."""
+        return aiohttp is not None
+
+    def query_all(self, ip_addresses: List[str], deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Query all orchestrators concurrently and wait for every result.
+
+        Args:
+            ip_addresses: List of orchestrator IP addresses
+            deadline: time.monotonic() value after which pending orchestrators are reported as timed out
+
+        Returns:
+            List of orchestrator result dictionaries (unsorted)
+        """
+        if not ip_addresses:
+            return []
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(self._query_all(ip_addresses, deadline))
+
+    def _get_session(self):
+        """Return the engine's client session, creating it on the engine's loop when needed."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.per_host_limit,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[connection_trace_config(self.client.connection_stats)]
+            )
+        return self._session
+
+    def close(self):
+        """Close the kept-alive connections and the engine's event loop."""
+        with self._lock:
+            if self._loop is None:
+                return
+            if self._session is not None:
+                self._loop.run_until_complete(self._session.close())
+                self._session = None
+            self._loop.close()
+            self._loop = None
+
+    async def _query_all(self, ip_addresses: List[str], deadline: Optional[float] = None) -> List[Dict]:
+        """Fan out to every orchestrator under the global and per-host limits."""
+        session = self._get_session()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        tasks = [asyncio.ensure_future(self._query_single(session, semaphore, ip)) for ip in ip_addresses]
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        # Cancel the stragglers so the snapshot is not held up by them
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        processed = []
+        for ip, task in zip(ip_addresses, tasks):
+            if task in pending:
+                processed.append(self.client._create_timeout_response(ip))
+            elif task.exception() is not None:
+                logger.error(f"Failed to query orchestrator {ip}: {task.exception()}")
+                processed.append(self.client._create_error_response(ip, str(task.exception())))
+            else:
+                processed.append(task.result())
+        return processed
+
+    async def _make_request(self, session, ip: str, method: str, params: List = None) -> Dict:
+        """
+        Make a JSON-RPC request to an orchestrator, retrying transient failures.
+
+        Args:
+            session: aiohttp client session
+            ip: IP address of the orchestrator
+            method: RPC method to call
+            params: Method parameters
+
+        Returns:
+            Response data dictionary
+        """
+        return await self._post(session, ip, method, {"method": method, "params": params or []})
+
+    async def _post(self, session, ip: str, method: str, payload, batch: bool = False):
+        """
+        POST a JSON payload to an orchestrator, honoring the per-host rate limiter.
+
+        Latency (across retries), retries, bytes and errors are recorded under
+        the `method` label ('batch' for batch requests).
+        """
+        endpoint = self.client.endpoint(ip)
+        body = json.dumps(payload).encode('utf-8')
+        labels = (('ip', ip), ('method', method))
+        started = time.monotonic()
+        try:
+            result = await self._post_with_retries(session, ip, endpoint, body, labels, batch)
+        except Exception as e:
+            metrics.observe(RPC_DURATION, labels, time.monotonic() - started)
+            metrics.inc(RPC_ERRORS, labels + (('error', _error_class(e)),))
+            raise
+        elapsed = time.monotonic() - started
+        metrics.observe(RPC_DURATION, labels, elapsed)
+        self.client.latency.record(ip, elapsed)
+        return result
+
+    async def _post_with_retries(self, session, ip: str, endpoint, body: bytes, labels, batch: bool):
+        attempt = 0
+        while True:
+            delay = self.client.rate_limiter.reserve(ip)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            connect_timeout, read_timeout = self.client.request_timeout(ip)
+            timeout = aiohttp.ClientTimeout(total=connect_timeout + read_timeout,
+                                            sock_connect=connect_timeout, sock_read=read_timeout)
+            try:
+                metrics.inc(RPC_REQUEST_BYTES, labels, len(body))
+                async with session.post(endpoint.url, data=body, headers=JSON_HEADERS, timeout=timeout,
+                                        ssl=endpoint.ssl) as response:
+                    if response.status in RETRY_STATUSES and attempt < RETRY_TOTAL:
+                        raise _RetryableStatus(response.status)
+                    if batch and 400 <= response.status < 500:
+                        raise BatchNotSupportedError(f"HTTP {response.status}")
+                    response.raise_for_status()
+                    data = await response.read()
+                metrics.inc(RPC_RESPONSE_BYTES, labels, len(data))
+                return json.loads(data)
+            except (aiohttp.ClientConnectionError, _RetryableStatus):
+                if attempt >= RETRY_TOTAL:
+                    raise
+                attempt += 1
+                metrics.inc(RPC_RETRIES, labels)
+                await asyncio.sleep(RETRY_BACKOFF_FACTOR * (2 ** (attempt - 1)))
+
+    async def _make_batch_request(self, session, ip: str, methods: List[str]) -> Dict[str, Dict]:
+        """Send several RPCs to an orchestrator in a single JSON-RPC batch POST."""
+        try:
+            data = await self._post(session, ip, "batch", self.client._build_batch_payload(methods), batch=True)
+        except json.JSONDecodeError:
+            raise BatchNotSupportedError("Batch response is not valid JSON")
+        return self.client._parse_batch_response(methods, data)
+
+    async def _fetch_rpc(self, session, semaphore: asyncio.Semaphore, ip: str,
+                         methods: List[str]) -> Dict[str, Dict]:
+        """Call RPC methods on an orchestrator using the client's configured RPC mode."""
+        if (self.client.rpc_mode == RPC_MODE_BATCH and len(methods) > 1
+                and ip not in self.client.batch_unsupported):
+            try:
+                async with semaphore:
+                    return await self._make_batch_request(session, ip, methods)
+            except BatchNotSupportedError as e:
+                logger.info(f"Orchestrator at {ip} rejected JSON-RPC batch ({e}), using concurrent calls")
+                self.client.batch_unsupported.add(ip)
+
+        if self.client.rpc_mode == RPC_MODE_BATCH:
+            async def call(method):
+                async with semaphore:
+                    return await self._make_request(session, ip, method)
+            responses = await asyncio.gather(*(call(method) for method in methods))
+            return dict(zip(methods, responses))
+
+        responses = {}
+        for method in methods:
+            async with semaphore:
+                responses[method] = await self._make_request(session, ip, method)
+        return responses
+
+    async def _query_single(self, session, semaphore: asyncio.Semaphore, ip: str) -> Dict:
+        """Query a single orchestrator for its identity and status."""
+        breaker = self.client.circuit_breaker
+        if not breaker.allow(ip):
+            return self.client._circuit_open_response(ip)
+
+        started = time.monotonic()
+        try:
+            methods, cached_identity = self.client._rpc_methods_for(ip)
+            responses = await self._fetch_rpc(session, semaphore, ip, methods)
+
+            result = self.client._handle_rpc_responses(ip, responses, cached_identity)
+            outcome = 'ok' if result['state_num'] is not None else 'rpc_error'
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, _RetryableStatus) as e:
+            logger.error(f"Network error querying orchestrator at {ip}: {str(e) or type(e).__name__}")
+            result = self.client._create_error_response(ip, f"Network error: {str(e) or type(e).__name__}")
+            breaker.record_failure(ip, result)
+            self.client.record_query(ip, started, 'network_error')
+            return result
+        except (KeyError, json.JSONDecodeError) as e:
+            logger.error(f"Data parsing error for orchestrator at {ip}: {str(e)}")
+            result = self.client._create_error_response(ip, f"Invalid response format: {str(e)}")
+            outcome = 'parse_error'
+        except Exception as e:
+            logger.error(f"Unexpected error querying orchestrator at {ip}: {str(e)}")
+            result = self.client._create_error_response(ip, f"Unexpected error: {str(e)}")
+            outcome = 'error'
+
+        # The node answered, even if the answer was unusable
+        breaker.record_success(ip)
+        self.client.record_query(ip, started, outcome)
+        return result
+
+
+def _error_class(error: BaseException) -> str:
+    """Classify a failed request for the error metrics (same classes as the threaded engine)."""
+    connect_timeout_error = getattr(aiohttp, 'ConnectionTimeoutError', None)
+    if connect_timeout_error is not None and isinstance(error, connect_timeout_error):
+        return 'connect_timeout'
+    if isinstance(error, aiohttp.ServerTimeoutError):
+        return 'read_timeout'
+    if isinstance(error, asyncio.TimeoutError):
+        return 'timeout'
+    if isinstance(error, aiohttp.ClientConnectionError):
+        return 'connection'
+    if isinstance(error, (aiohttp.ClientResponseError, _RetryableStatus)):
+        return 'http'
+    return type(error).__name__
+
+
+class _RetryableStatus(Exception):
+    """Raised internally for HTTP statuses that should be retried."""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
@@ -2,9 +2,13 @@
 
 import time
 import threading
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 
-from app.services.status_service import StatusService
+from config.settings import Config
+from app.services.poll_scheduler import PollScheduler
+from app.services.status_service import StatusService, create_fleet_services
+
+HEARTBEAT_INTERVAL = 5  # Seconds between liveness reports while waiting for the next update
 
 
 class BackgroundUpdater:
@@ -20,11 +24,31 @@ class BackgroundUpdater:
         """
         self.update_interval = update_interval
         self.app = app
-        self.status_service = StatusService()
+        # One status service per fleet, all polling through one orchestrator client
+        self.services: Dict[str, StatusService] = create_fleet_services()
+        self.status_service = next(iter(self.services.values()))
+        self.client = self.status_service.client
         self.stop_event = threading.Event()
         self.update_thread: Optional[threading.Thread] = None
         self.logger = None
         self.initial_update_done = threading.Event()
+        self.listeners: List[Callable[[], None]] = []
+        self.schedulers: Dict[str, PollScheduler] = {}
+        if Config.ADAPTIVE_POLLING:
+            self.schedulers = {
+                name: PollScheduler(
+                    base_interval=update_interval,
+                    fast_interval=Config.FAST_POLL_INTERVAL,
+                    max_backoff=Config.MAX_POLL_BACKOFF,
+                    hot_seconds=Config.HOT_NODE_SECONDS
+                )
+                for name in self.services
+            }
+    
+    @property
+    def scheduler(self) -> Optional[PollScheduler]:
+        """The primary fleet's poll scheduler (None without adaptive polling)."""
+        return self.schedulers.get(self.status_service.fleet.name)
         
     def _get_logger(self):
         """Get logger instance."""
@@ -41,33 +65,176 @@ class BackgroundUpdater:
                 self.logger = setup_logging('background_updater')
         return self.logger
     
+    def add_listener(self, callback: Callable[[], None]):
+        """Register a callback to run after each successful status update."""
+        self.listeners.append(callback)
+    
+    def _notify_listeners(self):
+        for callback in self.listeners:
+            try:
+                callback()
+            except Exception as e:
+                self._get_logger().error(f"Error in status update listener: {e}")
+    
+    def _seconds_until_due(self) -> float:
+        """Seconds until the next orchestrator of any fleet is due."""
+        return min((scheduler.seconds_until_due() for scheduler in self.schedulers.values()),
+                   default=self.update_interval)
+    
     def _update_loop(self):
         """Main update loop that runs in the background thread."""
         logger = self._get_logger()
-        logger.info(f"Background updater started with {self.update_interval}s interval")
+        fleets = f" for {len(self.services)} fleets" if len(self.services) > 1 else ""
+        if self.schedulers:
+            logger.info(f"Background updater started with adaptive polling{fleets} "
+                        f"({Config.FAST_POLL_INTERVAL}s-{self.update_interval}s, "
+                        f"backoff up to {Config.MAX_POLL_BACKOFF}s)")
+        else:
+            logger.info(f"Background updater started with {self.update_interval}s interval{fleets}")
         
         # Always wait for initial update signal or timeout
         self.initial_update_done.wait(timeout=10)
         
+        delay = self.update_interval
+        registry_versions = {name: service.registry.version for name, service in self.services.items()}
+        if self.schedulers:
+            # Spread the first polls over the interval following the initial full update
+            for name, scheduler in self.schedulers.items():
+                scheduler.set_ips(self.services[name].orchestrator_ips)
+            delay = self._seconds_until_due()
+        next_stats_log = time.monotonic() + self.update_interval
+        
         while not self.stop_event.is_set():
-            # Wait for the specified interval
-            if self.stop_event.wait(self.update_interval):
+            # Wait until the next update is due, reporting liveness meanwhile
+            if self._wait_with_heartbeat(delay):
                 break  # Stop event was set
-                
+            delay = self.update_interval
+            
+            # Orchestrators to poll per fleet (None for all of them)
+            due: Dict[str, Optional[List[str]]] = {}
+            for name, service in self.services.items():
+                if not service.should_update():
+                    logger.info(f"Another instance holds the poller lock for fleet '{name}', skipping it")
+                    continue
+                scheduler = self.schedulers.get(name)
+                if scheduler is None:
+                    due[name] = None
+                    continue
+                ips = service.orchestrator_ips  # Reloads the registry file if it changed
+                if service.registry.version != registry_versions[name]:
+                    # Poll added orchestrators right away, stop polling removed ones
+                    registry_versions[name] = service.registry.version
+                    scheduler.set_ips(ips, stagger=False)
+                fleet_due = scheduler.pop_due(Config.POLL_TICK_SECONDS)
+                if fleet_due:
+                    due[name] = fleet_due
+            
+            if not due:
+                if self.schedulers:
+                    delay = self._seconds_until_due()
+                continue
+            
+            full_update = not self.schedulers
             try:
                 # Update orchestrator status with app context
-                logger.info("Starting background status update...")
-                if self.app:
-                    with self.app.app_context():
-                        self.status_service.update_status()
+                if full_update:
+                    logger.info("Starting background status update...")
+                snapshots = self._run_update(due)
+                self._notify_listeners()
+                if full_update:
+                    logger.info("Background status update completed")
                 else:
-                    self.status_service.update_status()
-                logger.info("Background status update completed")
+                    for name, status_data in snapshots.items():
+                        self._reschedule(self.schedulers[name], due[name], status_data)
+                    delay = self._seconds_until_due()
+                    if time.monotonic() >= next_stats_log:
+                        next_stats_log = time.monotonic() + self.update_interval
+                        for name, scheduler in self.schedulers.items():
+                            logger.info(f"Polling schedule{f' ({name})' if fleets else ''}: {scheduler.stats()}")
                 
             except Exception as e:
                 logger.error(f"Error in background update loop: {e}")
-                # Wait a shorter time before retrying on error
-                self.stop_event.wait(min(30, self.update_interval))
+                if not full_update:
+                    # Retry the orchestrators that were due a little later
+                    for name, ips in due.items():
+                        self.schedulers[name].defer(ips, min(30, self.update_interval))
+                    delay = self._seconds_until_due()
+                else:
+                    # Wait a shorter time before retrying on error
+                    self.stop_event.wait(min(30, self.update_interval))
+    
+    def _run_update(self, due: Optional[Dict[str, Optional[List[str]]]] = None) -> Dict[str, Dict]:
+        """Run one status update, inside the app context when there is an app."""
+        if self.app:
+            with self.app.app_context():
+                return self._update_fleets(due)
+        return self._update_fleets(due)
+    
+    def _update_fleets(self, due: Optional[Dict[str, Optional[List[str]]]] = None) -> Dict[str, Dict]:
+        """
+        Poll the due orchestrators of every fleet in one cycle and publish each fleet's snapshot.
+        
+        All fleets share the client's engine, connection pool and cycle deadline, so
+        fleets are polled concurrently rather than one after the other.
+        
+        Args:
+            due: Fleet name -> orchestrators to poll (None for all of them), default every fleet
+            
+        Returns:
+            Fleet name -> published status data
+        """
+        if due is None:
+            due = dict.fromkeys(self.services)
+        if len(due) == 1:
+            name, ips = next(iter(due.items()))
+            return {name: self.services[name].update_status(ips)}
+        
+        polled = {name: self.services[name].select_ips(ips) for name, ips in due.items()}
+        all_ips = list(dict.fromkeys(ip for ips in polled.values() for ip in ips))
+        self._get_logger().debug(f"Starting status update cycle for {len(all_ips)} orchestrators "
+                                 f"in {len(polled)} fleets...")
+        
+        start_time = time.time()
+        results, _ = self.client.query_all_orchestrators(all_ips)
+        by_ip = {result['ip']: result for result in results}
+        
+        snapshots = {}
+        for name, ips in polled.items():
+            # Each fleet gets its own copies, since snapshots are versioned and sorted in place
+            fleet_results = [dict(by_ip[ip]) for ip in ips if ip in by_ip]
+            try:
+                snapshots[name] = self.services[name].publish_results(
+                    fleet_results, start_time, ips if due[name] is not None else None)
+            except Exception as e:
+                self._get_logger().error(f"Failed to publish status for fleet '{name}': {e}")
+                if name in self.schedulers:
+                    self.schedulers[name].defer(ips, min(30, self.update_interval))
+        return snapshots
+    
+    def _reschedule(self, scheduler: PollScheduler, due: List[str], status_data: Dict):
+        """Schedule the next poll of each orchestrator polled in this cycle."""
+        polled = set(due)
+        for orchestrator in status_data.get('orchestrators', []):
+            if orchestrator['ip'] in polled:
+                scheduler.record(orchestrator)
+                polled.discard(orchestrator['ip'])
+        # Orchestrators without a result (e.g. dropped from the configuration meanwhile)
+        scheduler.defer(polled, self.update_interval)
+    
+    def _wait_with_heartbeat(self, seconds: float) -> bool:
+        """Wait for the given time, sending heartbeats. Returns True if stop was requested."""
+        deadline = time.monotonic() + seconds
+        while True:
+            for service in self.services.values():
+                try:
+                    service.heartbeat()
+                except Exception as e:
+                    self._get_logger().warning(f"Failed to write updater heartbeat: {e}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self.stop_event.is_set()
+            if self.stop_event.wait(min(HEARTBEAT_INTERVAL, remaining)):
+                return True
     
     def start(self):
         """Start the background updater thread."""
@@ -95,8 +262,10 @@ class BackgroundUpdater:
             else:
                 self._get_logger().info("Background updater stopped (current thread)")
         
-        # Close the status service
-        self.status_service.close()
+        # Close the status services, then the client they share
+        for service in self.services.values():
+            service.close()
+        self.client.close()
     
     def is_running(self) -> bool:
         """Check if the background updater is currently running."""
@@ -107,11 +276,8 @@ class BackgroundUpdater:
         try:
             logger = self._get_logger()
             logger.info("Forcing immediate status update...")
-            if self.app:
-                with self.app.app_context():
-                    self.status_service.update_status()
-            else:
-                self.status_service.update_status()
+            self._run_update()
+            self._notify_listeners()
             # Mark initial update as done
             self.initial_update_done.set()
             logger.info("Forced status update completed")
@@ -0,0 +1,284 @@
+"""
+Bridge-health analytics computed once per published snapshot.
+The orchestrators of a snapshot are packed into a nodes x metrics matrix
+(online, state, p95 latency and wraps/unwraps per network) and every statistic
+is a column operation on it: the quorum margin against the fleet's bridge
+threshold, pending signatures per network, orchestrators whose latency or
+queue depth is far above their peers' (a robust z-score against the median
+absolute deviation) and rolling availability.
+
+Availability is time-weighted: the time between two snapshots is credited to
+the states the earlier one reported. It is kept as online and observed seconds
+per bucket in a slots x nodes ring with running totals, so an update costs
+O(nodes) whatever the window length, and old buckets drop out as the ring
+turns. The window starts empty when the poller starts.
+
+Requires numpy; without it snapshots carry no analytics.
+"""
+import threading
+import warnings
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ONLINE, STATE, LATENCY = 0, 1, 2  # Leading matrix columns, followed by wraps/unwraps per network
+MAD_SCALE = 1.4826  # Scales the median absolute deviation to a standard deviation for normal data
+LATENCY_FLOOR_MS = 5.0  # Smallest deviation scale for latencies, so near-identical peers are not flagged
+COUNT_FLOOR = 1.0  # Smallest deviation scale for pending counts
+OUTLIER_MIN_NODES = 5  # Online orchestrators needed before outliers are reported
+MAX_OUTLIERS = 20
+LOWEST_AVAILABILITY = 10  # Least available orchestrators (below 100%) listed in the summary
+
+
+class AvailabilityWindow:
+    """Time-weighted online fraction per orchestrator, and of the bridge, over a sliding window."""
+
+    def __init__(self, window_seconds: float, slots: int):
+        """
+        Initialize an empty window.
+
+        Args:
+            window_seconds: Length of the window
+            slots: Buckets the window is divided into (its resolution)
+        """
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.bucket_seconds = window_seconds / slots
+        self.index: Dict[str, int] = {}
+        self.online = np.zeros((slots, 0))
+        self.observed = np.zeros((slots, 0))
+        self.online_total = np.zeros(0)
+        self.observed_total = np.zeros(0)
+        self.bridge = np.zeros(slots)
+        self.covered = np.zeros(slots)
+        self.bridge_total = 0.0
+        self.covered_total = 0.0
+        self.slot_bucket = np.full(slots, -1, dtype=np.int64)
+        self._last = None  # (timestamp, columns, online vector, bridge online) of the previous snapshot
+
+    def columns(self, ips: List[str]) -> 'np.ndarray':
+        """Return the ring column of each IP, adding columns for new ones."""
+        for ip in ips:
+            if ip not in self.index:
+                self.index[ip] = len(self.index)
+        grow = len(self.index) - self.online.shape[1]
+        if grow > 0:
+            # Grow geometrically so a fleet that keeps adding orchestrators is not copied every update
+            grow = max(grow, self.online.shape[1], 16)
+            self.online = np.pad(self.online, ((0, 0), (0, grow)))
+            self.observed = np.pad(self.observed, ((0, 0), (0, grow)))
+            self.online_total = np.pad(self.online_total, (0, grow))
+            self.observed_total = np.pad(self.observed_total, (0, grow))
+        return np.fromiter((self.index[ip] for ip in ips), dtype=np.intp, count=len(ips))
+
+    def _slot(self, bucket: int) -> int:
+        """Return the slot of a bucket, first dropping every bucket that left the window."""
+        slot = bucket % self.slots
+        stale = (self.slot_bucket >= 0) & (self.slot_bucket <= bucket - self.slots)
+        if self.slot_bucket[slot] != bucket:
+            stale[slot] = self.slot_bucket[slot] >= 0
+        if stale.any():
+            self.online_total -= self.online[stale].sum(axis=0)
+            self.observed_total -= self.observed[stale].sum(axis=0)
+            self.bridge_total -= float(self.bridge[stale].sum())
+            self.covered_total -= float(self.covered[stale].sum())
+            self.online[stale] = 0.0
+            self.observed[stale] = 0.0
+            self.bridge[stale] = 0.0
+            self.covered[stale] = 0.0
+            self.slot_bucket[stale] = -1
+        self.slot_bucket[slot] = bucket
+        return slot
+
+    def add(self, timestamp: float, columns: 'np.ndarray', online: 'np.ndarray', bridge_online: bool):
+        """
+        Account the time since the previous snapshot to the states that snapshot reported.
+
+        Args:
+            timestamp: Unix time of the snapshot
+            columns: Ring columns of the snapshot's orchestrators (see columns())
+            online: 1.0 for each online orchestrator, 0.0 otherwise
+            bridge_online: Whether enough orchestrators were online for the bridge
+        """
+        last = self._last
+        self._last = (timestamp, columns, online, bridge_online)
+        if last is None:
+            return
+        last_time, last_columns, last_online, last_bridge = last
+        # A longer gap (the poller was down) is not evidence either way: count at most one bucket of it
+        elapsed = min(timestamp - last_time, self.bucket_seconds)
+        if elapsed <= 0:
+            return
+
+        slot = self._slot(int(timestamp // self.bucket_seconds))
+        online_seconds = last_online * elapsed
+        self.online[slot, last_columns] += online_seconds
+        self.observed[slot, last_columns] += elapsed
+        self.online_total[last_columns] += online_seconds
+        self.observed_total[last_columns] += elapsed
+        self.covered[slot] += elapsed
+        self.covered_total += elapsed
+        if last_bridge:
+            self.bridge[slot] += elapsed
+            self.bridge_total += elapsed
+
+    def availability(self, columns: 'np.ndarray') -> Tuple['np.ndarray', Optional[float], float]:
+        """
+        Return the availability of the given columns (NaN where not observed yet),
+        of the bridge (None before the second snapshot) and the seconds covered.
+        """
+        observed = self.observed_total[columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Clipped: the running totals pick up rounding error as buckets are subtracted
+            nodes = np.where(observed > 0, np.clip(self.online_total[columns] / observed, 0.0, 1.0), np.nan)
+        bridge = self.bridge_total / self.covered_total if self.covered_total > 0 else None
+        return nodes, bridge, self.covered_total
+
+
+class BridgeAnalytics:
+    """Per-fleet analytics over the orchestrator matrix of each published snapshot."""
+
+    def __init__(self, networks: Iterable[str], window_seconds: float = 86400, slots: int = 96,
+                 outlier_threshold: float = 3.5):
+        """
+        Initialize the analytics stage.
+
+        Args:
+            networks: network_stats keys of the fleet
+            window_seconds: Rolling availability window
+            slots: Buckets the availability window is divided into
+            outlier_threshold: Robust z-score above which an orchestrator is reported as an outlier
+        """
+        self.networks = tuple(networks)
+        self.columns = ('online', 'state_num', 'latency_ms') + tuple(
+            f'{network}_{direction}' for network in self.networks for direction in ('wraps', 'unwraps'))
+        self.outlier_threshold = outlier_threshold
+        self.window = AvailabilityWindow(window_seconds, slots)
+        # Deviation floor per outlier column (latency, then every pending count)
+        self._floors = np.array([LATENCY_FLOOR_MS] + [COUNT_FLOOR] * (len(self.columns) - LATENCY - 1))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        """True when numpy is installed."""
+        return np is not None
+
+    def matrix(self, orchestrators: List[Dict], latency: Callable[[str], Optional[float]]) -> 'np.ndarray':
+        """
+        Pack orchestrator entries into a nodes x columns float matrix.
+
+        Args:
+            orchestrators: Entries of status_data['orchestrators']
+            latency: Returns an orchestrator's p95 latency in seconds, or None (stored as NaN)
+        """
+        rows = []
+        for orch in orchestrators:
+            seconds = latency(orch['ip'])
+            state_num = orch.get('state_num')
+            row = [1.0 if orch.get('status') == 'online' else 0.0,
+                   float('nan') if state_num is None else state_num,
+                   float('nan') if seconds is None else seconds * 1000]
+            stats = orch.get('network_stats') or {}
+            for network in self.networks:
+                counts = stats.get(network) or {}
+                row.append(counts.get('wraps') or 0)
+                row.append(counts.get('unwraps') or 0)
+            rows.append(row)
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(self.columns))
+
+    def update(self, status_data: Dict, min_online: int, latency: Callable[[str], Optional[float]],
+               timestamp: float) -> Dict:
+        """
+        Analyze a snapshot and fold it into the rolling availability window.
+
+        Args:
+            status_data: Snapshot about to be published
+            min_online: The fleet's bridge threshold
+            latency: Returns an orchestrator's p95 latency in seconds, or None
+            timestamp: Unix time of the snapshot
+
+        Returns:
+            Analytics dict for the snapshot's 'analytics' field
+        """
+        orchestrators = status_data.get('orchestrators', [])
+        ips = [orch['ip'] for orch in orchestrators]
+        matrix = self.matrix(orchestrators, latency)
+        online = matrix[:, ONLINE]
+        online_count = int(online.sum())
+
+        with self._lock:
+            columns = self.window.columns(ips)
+            self.window.add(timestamp, columns, online, status_data.get('bridge_status') == 'online')
+            availability, bridge_availability, covered = self.window.availability(columns)
+
+        # Offline orchestrators report no queues, so the sums are over the online ones
+        totals = matrix[:, LATENCY + 1:].sum(axis=0)
+        pending = {
+            network: {'wraps': int(totals[2 * i]), 'unwraps': int(totals[2 * i + 1])}
+            for i, network in enumerate(self.networks)
+        }
+        states, state_counts = np.unique(matrix[:, STATE][~np.isnan(matrix[:, STATE])], return_counts=True)
+
+        return {
+            'quorum': {
+                'min_online': min_online,
+                'online': online_count,
+                'margin': online_count - min_online
+            },
+            'states': {str(int(state)): int(count) for state, count in zip(states, state_counts)},
+            'pending': pending,
+            'outliers': self._outliers(matrix, orchestrators),
+            'availability': self._availability_summary(availability, bridge_availability, covered, orchestrators)
+        }
+
+    def _outliers(self, matrix: 'np.ndarray', orchestrators: List[Dict]) -> List[Dict]:
+        """Online orchestrators whose latency or pending counts are far above the median of their peers."""
+        live = np.flatnonzero(matrix[:, ONLINE] == 1.0)
+        if len(live) < OUTLIER_MIN_NODES:
+            return []
+        values = matrix[live, LATENCY:]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN latency column before enough samples
+            median = np.nanmedian(values, axis=0)
+            mad = np.nanmedian(np.abs(values - median), axis=0)
+        scale = np.maximum(np.nan_to_num(mad) * MAD_SCALE, self._floors)
+        scores = np.nan_to_num((values - median) / scale, nan=0.0)
+
+        rows, cols = np.nonzero(scores > self.outlier_threshold)
+        order = np.argsort(-scores[rows, cols])[:MAX_OUTLIERS]
+        outliers = []
+        for row, col in zip(rows[order], cols[order]):
+            orch = orchestrators[live[row]]
+            outliers.append({
+                'ip': orch['ip'],
+                'pillar_name': orch.get('pillar_name'),
+                'metric': self.columns[LATENCY + col],
+                'value': round(float(values[row, col]), 1),
+                'median': round(float(median[col]), 1),
+                'score': round(float(scores[row, col]), 1)
+            })
+        return outliers
+
+    def _availability_summary(self, availability: 'np.ndarray', bridge: Optional[float], covered: float,
+                              orchestrators: List[Dict]) -> Dict:
+        """Summarize the rolling availability of the bridge and of its least available orchestrators."""
+        observed = np.flatnonzero(~np.isnan(availability))
+        degraded = observed[availability[observed] < 1.0]
+        lowest = degraded[np.argsort(availability[degraded], kind='stable')[:LOWEST_AVAILABILITY]]
+        return {
+            'window_seconds': round(self.window.window_seconds),
+            'covered_seconds': round(min(covered, self.window.window_seconds)),
+            'bridge': None if bridge is None else round(bridge, 4),
+            'orchestrators_mean': round(float(availability[observed].mean()), 4) if len(observed) else None,
+            'lowest': [
+                {
+                    'ip': orchestrators[i]['ip'],
+                    'pillar_name': orchestrators[i].get('pillar_name'),
+                    'availability': round(float(availability[i]), 4)
+                }
+                for i in lowest
+            ]
+        }
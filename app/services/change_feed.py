@@ -0,0 +1,99 @@
+"""
+Versioned change tracking for status snapshots.
+Every published snapshot gets a monotonically increasing `version`, and each
+orchestrator entry records the version in which its status, state or queue
+counts last changed (`changed_version`). A client that remembers the version
+it last saw can then fetch only the orchestrators that changed since, straight
+from the current snapshot, without a separate change log.
+"""
+from typing import Dict, List, Optional
+
+# Fields whose changes are reported by the change feed
+TRACKED_FIELDS = ('status', 'state_num', 'network_stats')
+
+
+def _fingerprint(orchestrator: Dict) -> tuple:
+    return tuple(repr(orchestrator.get(field)) for field in TRACKED_FIELDS)
+
+
+def assign_versions(previous: Optional[Dict], current: Dict) -> Dict:
+    """
+    Version a new snapshot by diffing it against the previous one.
+
+    Adds `version` and `base_version` to the snapshot, `changed_version` to each
+    orchestrator entry and `removed` ({ip: version}) for orchestrators that
+    dropped out of the fleet.
+
+    Args:
+        previous: Previously published snapshot, or None on first start
+        current: New snapshot (modified in place)
+
+    Returns:
+        The current snapshot
+    """
+    if not previous or 'version' not in previous:
+        # No usable history: every client has to start from a full snapshot
+        version = 1
+        current['version'] = version
+        current['base_version'] = version
+        current['removed'] = {}
+        for orchestrator in current.get('orchestrators', []):
+            orchestrator['changed_version'] = version
+        return current
+
+    version = previous['version'] + 1
+    current['version'] = version
+    current['base_version'] = previous.get('base_version', previous['version'])
+
+    previous_entries = {orch['ip']: orch for orch in previous.get('orchestrators', [])}
+    for orchestrator in current.get('orchestrators', []):
+        before = previous_entries.get(orchestrator['ip'])
+        if before is not None and _fingerprint(before) == _fingerprint(orchestrator):
+            orchestrator['changed_version'] = before.get('changed_version', version)
+        else:
+            orchestrator['changed_version'] = version
+
+    current_ips = {orch['ip'] for orch in current.get('orchestrators', [])}
+    removed = {ip: v for ip, v in previous.get('removed', {}).items() if ip not in current_ips}
+    for ip in previous_entries:
+        if ip not in current_ips:
+            removed[ip] = version
+    current['removed'] = removed
+    return current
+
+
+def changes_since(data: Dict, since: int) -> Dict:
+    """
+    Build the change feed response for a client that last saw version `since`.
+
+    A client whose version predates the tracked history, or is ahead of it
+    (e.g. after the history was reset), gets a full snapshot instead.
+
+    Args:
+        data: Current versioned snapshot
+        since: Version the client last saw
+
+    Returns:
+        Dict with `full` set when `changed` holds every orchestrator
+    """
+    version = data.get('version', 0)
+    full = since < data.get('base_version', version) or since > version
+
+    if full:
+        changed: List[Dict] = list(data.get('orchestrators', []))
+        removed: List[str] = []
+    else:
+        changed = [orch for orch in data.get('orchestrators', []) if orch.get('changed_version', version) > since]
+        removed = sorted(ip for ip, v in data.get('removed', {}).items() if v > since)
+
+    return {
+        'version': version,
+        'since': since,
+        'full': full,
+        'timestamp': data.get('timestamp'),
+        'bridge_status': data.get('bridge_status'),
+        'online_count': data.get('online_count'),
+        'total_count': data.get('total_count'),
+        'changed': changed,
+        'removed': removed
+    }
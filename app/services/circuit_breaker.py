@@ -0,0 +1,141 @@
+"""
+Per-orchestrator circuit breakers.
+After a run of network failures a node's circuit opens: queries return its
+last error response immediately instead of waiting for connection timeouts and
+retries. Once the reset timeout has passed a single probe is let through
+(half-open); success closes the circuit, failure re-opens it with a doubled
+timeout, up to a maximum.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class Circuit:
+    """Breaker state of one orchestrator."""
+
+    __slots__ = ('state', 'failures', 'opened_at', 'reset_timeout', 'last_error')
+
+    def __init__(self, reset_timeout: float):
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.reset_timeout = reset_timeout
+        self.last_error: Optional[Dict] = None
+
+
+class CircuitBreaker:
+    """Thread-safe collection of circuits, one per orchestrator host."""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60,
+                 max_reset_timeout: float = 600, clock=time.monotonic):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive network failures that open a circuit (0 disables the breaker)
+            reset_timeout: Seconds an open circuit waits before letting a probe through
+            max_reset_timeout: Upper bound for the reset timeout, which doubles after each failed probe
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max(max_reset_timeout, reset_timeout)
+        self.clock = clock
+        self._circuits: Dict[str, Circuit] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def _circuit(self, host: str) -> Circuit:
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = Circuit(self.reset_timeout)
+        return circuit
+
+    def allow(self, host: str) -> bool:
+        """
+        Decide whether a request to a host may go out.
+
+        Moves an open circuit whose reset timeout has passed to half-open and
+        lets exactly one probe through; other callers keep failing fast until
+        the probe reports back.
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == STATE_CLOSED:
+                return True
+            # A probe that never reported back (e.g. the poller was interrupted) is replaced after a timeout
+            now = self.clock()
+            if now - circuit.opened_at >= circuit.reset_timeout:
+                circuit.state = STATE_HALF_OPEN
+                circuit.opened_at = now
+                return True
+            return False
+
+    def record_success(self, host: str):
+        """Close the circuit of a host that answered."""
+        if not self.enabled:
+            return
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.state = STATE_CLOSED
+            circuit.failures = 0
+            circuit.reset_timeout = self.reset_timeout
+            circuit.last_error = None
+
+    def record_failure(self, host: str, error_response: Dict):
+        """
+        Count a network failure and remember the error response served while open.
+
+        Args:
+            host: Orchestrator host
+            error_response: Result returned for the failed query
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.failures += 1
+            circuit.last_error = error_response
+            if circuit.state == STATE_HALF_OPEN:
+                # The probe failed: stay open for longer
+                circuit.reset_timeout = min(self.max_reset_timeout, circuit.reset_timeout * 2)
+                circuit.state = STATE_OPEN
+                circuit.opened_at = self.clock()
+            elif circuit.state == STATE_CLOSED and circuit.failures >= self.failure_threshold:
+                circuit.state = STATE_OPEN
+                circuit.opened_at = self.clock()
+
+    def last_error(self, host: str) -> Optional[Dict]:
+        """Return the error response of the host's most recent failure, if any."""
+        with self._lock:
+            circuit = self._circuits.get(host)
+            return circuit.last_error if circuit is not None else None
+
+    def describe(self, host: str) -> Dict:
+        """
+        Return the breaker state of a host for the API output.
+
+        Returns:
+            Dict with state, consecutive failures and the time of the next probe (None unless open)
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None:
+                return {'state': STATE_CLOSED, 'failures': 0, 'next_probe': None}
+            next_probe = None
+            if circuit.state == STATE_OPEN:
+                remaining = max(0.0, circuit.opened_at + circuit.reset_timeout - self.clock())
+                next_probe = datetime.fromtimestamp(time.time() + remaining).isoformat()
+            return {'state': circuit.state, 'failures': circuit.failures, 'next_probe': next_probe}
+
@@ -0,0 +1,135 @@
+"""
+Persistent orchestrator connections and connection reuse accounting.
+Both polling engines keep idle keep-alive connections to every orchestrator
+between cycles, so a steady-state cycle sends its requests over connections
+opened in earlier cycles instead of paying a TCP (and TLS) handshake per node.
+Every request records whether it got a reused connection or had to open one,
+in the bridge_health_rpc_connections_total metric and in ConnectionStats.
+
+The threaded engine mounts TrackedHTTPAdapter, whose pool manager keeps one
+connection pool per orchestrator. requests' default adapter caches only 10
+host pools, so with more orchestrators than that the least recently used
+pools, and their connections, were dropped every cycle.
+"""
+import threading
+from typing import Dict
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+
+from app.services.metrics import RPC_CONNECTIONS, registry as metrics
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class ConnectionStats:
+    """Counts of requests sent over new and reused orchestrator connections."""
+
+    def __init__(self):
+        self.opened = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def record(self, host: str, reused: bool):
+        """Record the connection a request was sent on."""
+        with self._lock:
+            if reused:
+                self.reused += 1
+            else:
+                self.opened += 1
+        metrics.inc(RPC_CONNECTIONS, (('host', host), ('reused', 'true' if reused else 'false')))
+
+    def describe(self) -> Dict:
+        """Totals and the fraction of requests that reused a connection (None before the first request)."""
+        with self._lock:
+            opened, reused = self.opened, self.reused
+        total = opened + reused
+        return {
+            'opened': opened,
+            'reused': reused,
+            'reuse_ratio': round(reused / total, 4) if total else None
+        }
+
+
+class _TrackedPoolMixin:
+    """Records, for every request attempt, whether the pool handed out an open connection."""
+
+    connection_stats = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        if self.connection_stats is not None:
+            # Fresh connections, and pooled ones the server closed (dropped on checkout), have no socket yet
+            self.connection_stats.record(self.host, conn.sock is not None)
+        return conn
+
+
+class TrackedHTTPConnectionPool(_TrackedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class TrackedHTTPSConnectionPool(_TrackedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class TrackedPoolManager(PoolManager):
+    """PoolManager whose host pools record connection reuse."""
+
+    def __init__(self, connection_stats: ConnectionStats, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection_stats = connection_stats
+        self.pool_classes_by_scheme = {'http': TrackedHTTPConnectionPool, 'https': TrackedHTTPSConnectionPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.connection_stats = self.connection_stats
+        return pool
+
+
+class TrackedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter using TrackedPoolManager."""
+
+    def __init__(self, connection_stats: ConnectionStats, **kwargs):
+        """
+        Initialize the adapter.
+
+        Args:
+            connection_stats: Receives the connection of every request
+            kwargs: HTTPAdapter arguments; pool_connections is the number of orchestrators
+                whose connections are kept, pool_maxsize the idle connections kept per orchestrator
+        """
+        self.connection_stats = connection_stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = TrackedPoolManager(
+            self.connection_stats,
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            **pool_kwargs
+        )
+
+
+def connection_trace_config(connection_stats: ConnectionStats):
+    """aiohttp TraceConfig recording whether each request attempt reused a connection."""
+    async def on_request_start(session, context, params):
+        context.host = params.url.host
+
+    async def on_connection_create_start(session, context, params):
+        connection_stats.record(context.host, False)
+
+    async def on_connection_reuseconn(session, context, params):
+        connection_stats.record(context.host, True)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
@@ -0,0 +1,117 @@
+"""
+Orchestrator endpoints: where each orchestrator's JSON-RPC API is reached.
+By default an orchestrator is polled at http://<ip>:ORCHESTRATOR_PORT. Registry
+file entries can override the host (e.g. a DNS name or a TLS-terminating
+proxy in front of the node), port, scheme and TLS verification of a single
+orchestrator; the IP stays the orchestrator's identity everywhere else.
+"""
+import ssl
+from typing import Dict, Optional, Union
+
+DEFAULT_PORT = 55000
+SCHEMES = ('http', 'https')
+# Registry entry fields that override the default endpoint
+ENDPOINT_FIELDS = ('host', 'port', 'scheme', 'tls_verify')
+
+TlsVerify = Union[bool, str]  # Verify against the system CAs, do not verify, or a CA bundle path
+
+
+def parse_tls_verify(value) -> TlsVerify:
+    """Parse a tls_verify setting: true/false, or the path of a CA bundle."""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip()
+    if text.lower() in ('', 'true', 'yes', '1'):
+        return True
+    if text.lower() in ('false', 'no', '0'):
+        return False
+    return text
+
+
+def parse_endpoint_overrides(entry: Dict) -> Dict:
+    """
+    Read the endpoint fields of a registry entry.
+
+    Returns:
+        Dict with the fields that are set (host, port, scheme, tls_verify), empty if none are
+
+    Raises:
+        ValueError: If the port or scheme is invalid
+    """
+    overrides = {}
+    for field in ENDPOINT_FIELDS:
+        value = entry.get(field)
+        if value is None or value == '':
+            continue
+        if field == 'port':
+            port = int(value)
+            if not 0 < port < 65536:
+                raise ValueError(f"invalid port {value}")
+            overrides['port'] = port
+        elif field == 'scheme':
+            scheme = str(value).strip().lower()
+            if scheme not in SCHEMES:
+                raise ValueError(f"invalid scheme '{value}' (expected http or https)")
+            overrides['scheme'] = scheme
+        elif field == 'tls_verify':
+            overrides['tls_verify'] = parse_tls_verify(value)
+        else:
+            overrides['host'] = str(value).strip()
+    return overrides
+
+
+class Endpoint:
+    """Address and TLS settings of one orchestrator's JSON-RPC API."""
+
+    __slots__ = ('host', 'port', 'scheme', 'tls_verify', 'url', '_ssl')
+
+    def __init__(self, host: Optional[str], port: int = DEFAULT_PORT, scheme: str = 'http',
+                 tls_verify: TlsVerify = True):
+        """
+        Initialize the endpoint.
+
+        Args:
+            host: Host name or IP address (None for a template used by for_ip)
+            port: TCP port of the JSON-RPC API
+            scheme: 'http' or 'https'
+            tls_verify: Verify the certificate (True), skip verification (False) or verify against a CA bundle path
+        """
+        self.host = host
+        self.port = port
+        self.scheme = scheme
+        self.tls_verify = tls_verify
+        url_host = f'[{host}]' if host and ':' in host else host  # IPv6 literal
+        self.url = f"{scheme}://{url_host}:{port}" if host else None
+        self._ssl = None
+
+    def for_ip(self, ip: str, overrides: Optional[Dict] = None) -> 'Endpoint':
+        """Return the endpoint of an orchestrator: this template with the IP and the entry's overrides."""
+        overrides = overrides or {}
+        return Endpoint(
+            overrides.get('host') or ip,
+            overrides.get('port', self.port),
+            overrides.get('scheme', self.scheme),
+            overrides.get('tls_verify', self.tls_verify)
+        )
+
+    @property
+    def ssl(self):
+        """The `ssl` argument for aiohttp requests (a context for a CA bundle, built once)."""
+        if self.scheme != 'https' or self.tls_verify is True:
+            return True
+        if self.tls_verify is False:
+            return False
+        if self._ssl is None:
+            self._ssl = ssl.create_default_context(cafile=self.tls_verify)
+        return self._ssl
+
+    def __eq__(self, other):
+        return (isinstance(other, Endpoint)
+                and (self.host, self.port, self.scheme, self.tls_verify)
+                == (other.host, other.port, other.scheme, other.tls_verify))
+
+    def __hash__(self):
+        return hash((self.host, self.port, self.scheme, self.tls_verify))
+
+    def __repr__(self):
+        return f"Endpoint({self.url or 'template'}, tls_verify={self.tls_verify!r})"
@@ -0,0 +1,211 @@
+"""
+Fleets: independent orchestrator sets monitored from one deployment.
+Each fleet (for example the mainnet and testnet bridges) has its own
+orchestrator registry, bridge threshold, network list and snapshot storage,
+while every fleet is polled through one OrchestratorClient, so they share the
+polling engine, connection pool, rate limiter and circuit breakers.
+
+FLEETS lists the fleet names. The first is the primary fleet: it uses the
+top-level settings (ORCHESTRATOR_REGISTRY_FILE, MIN_ONLINE_FOR_BRIDGE,
+BRIDGE_NETWORKS, STATUS_FILE, ...) and is served by the unprefixed routes, so
+a deployment without FLEETS behaves as before. The other fleets are read from
+FLEET_<NAME>_REGISTRY_FILE, and any fleet can override FLEET_<NAME>_MIN_ONLINE
+and FLEET_<NAME>_NETWORKS. An orchestrator IP belongs to a single fleet.
+"""
+import logging
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from app.services import orchestrator_client
+from app.services.orchestrator_client import DEFAULT_NETWORKS, build_static_pillars
+from app.services.orchestrator_registry import OrchestratorRegistry, get_registry
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FLEET_NAME_RE = re.compile(r'^[a-z0-9][a-z0-9_-]{0,31}$')
+# First path segments of the unprefixed API routes, which cannot double as fleet names
+RESERVED_FLEET_NAMES = ('auth', 'fleets', 'history', 'pillars', 'status', 'stream')
+NETWORK_KEY_RE = re.compile(r'^[a-z0-9_]+$')
+
+
+def parse_networks(value: str) -> Dict[str, str]:
+    """
+    Parse a network list such as 'BNB Chain=bnb,Ethereum=eth'.
+
+    Each entry maps a network name reported by getStatus to the key used in
+    network_stats, the history metrics and the /metrics labels. A name without
+    '=key' uses its lowercased letters and digits as the key.
+
+    Raises:
+        ValueError: If an entry is malformed, a key repeats or the list is empty
+    """
+    networks = {}
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        name, _, key = entry.partition('=')
+        name = name.strip()
+        key = key.strip() or ''.join(c.lower() for c in name if c.isalnum())
+        if not name or not NETWORK_KEY_RE.match(key):
+            raise ValueError(f"invalid network entry '{entry.strip()}' (expected 'Network Name=key')")
+        if key in networks.values():
+            raise ValueError(f"network key '{key}' is used twice")
+        networks[name] = key
+    if not networks:
+        raise ValueError("no networks configured")
+    return networks
+
+
+def validate_fleet_name(name: str):
+    """
+    Check that a fleet name can be used in routes, file paths and environment variables.
+
+    Raises:
+        ValueError: If the name is invalid or reserved
+    """
+    if not FLEET_NAME_RE.match(name):
+        raise ValueError(f"invalid fleet name '{name}' (lowercase letters, digits, '-' and '_')")
+    if name in RESERVED_FLEET_NAMES:
+        raise ValueError(f"fleet name '{name}' is reserved")
+
+
+class Fleet:
+    """One monitored orchestrator set and its bridge parameters."""
+
+    def __init__(self, name: str, registry: OrchestratorRegistry, min_online: int,
+                 networks: Dict[str, str], primary: bool = False):
+        """
+        Initialize the fleet.
+
+        Args:
+            name: Fleet name, used in /api/<fleet>/ routes and storage paths
+            registry: Registry of the fleet's orchestrators
+            min_online: Orchestrators that must be online for the bridge to be online
+            networks: Network name reported by getStatus -> network_stats key
+            primary: True for the fleet served by the unprefixed routes
+        """
+        self.name = name
+        self.registry = registry
+        self.min_online = min_online
+        self.networks = networks
+        self.primary = primary
+        self._static_pillars = (None, {})
+
+    @property
+    def ips(self):
+        """Orchestrator IPs of the fleet (reloaded first if its registry file changed)."""
+        return self.registry.ips
+
+    @property
+    def static_pillars(self) -> Dict[str, Dict]:
+        """Static pillar fields of the fleet's pillar mapping, rebuilt when the registry changes."""
+        mapping = self.registry.mapping
+        cached_mapping, static_pillars = self._static_pillars
+        if cached_mapping is not mapping:
+            static_pillars = build_static_pillars(mapping)
+            self._static_pillars = (mapping, static_pillars)
+        return static_pillars
+
+    @property
+    def namespace(self) -> Optional[str]:
+        """Suffix separating the fleet's shared memory and Redis keys from the primary's (None for it)."""
+        return None if self.primary else self.name
+
+    def data_path(self, name: str) -> str:
+        """Path of one of the fleet's files under data/ (data/fleets/<fleet>/ for secondary fleets)."""
+        if self.primary:
+            return os.path.join('data', name)
+        return os.path.join('data', 'fleets', self.name, name)
+
+    def describe(self) -> Dict:
+        """Fleet settings for /api/fleets."""
+        return {
+            'name': self.name,
+            'primary': self.primary,
+            'min_online': self.min_online,
+            'networks': list(self.networks.values()),
+            'orchestrator_count': len(self.ips)
+        }
+
+
+def load_fleets(config) -> Dict[str, Fleet]:
+    """
+    Build the configured fleets, primary first.
+
+    The primary fleet uses the process-wide registry; the others get their own,
+    without the PILLAR_MAPPING defaults.
+    """
+    fleets = {}
+    for index, name in enumerate(config.FLEETS):
+        primary = index == 0
+        if primary:
+            registry = get_registry()
+        else:
+            registry = OrchestratorRegistry(config.get_fleet_setting(name, 'REGISTRY_FILE') or None, [], {},
+                                            config.REGISTRY_RELOAD_INTERVAL)
+        fleets[name] = Fleet(
+            name,
+            registry,
+            int(config.get_fleet_setting(name, 'MIN_ONLINE', str(config.MIN_ONLINE_FOR_BRIDGE))),
+            parse_networks(config.get_fleet_setting(name, 'NETWORKS', config.BRIDGE_NETWORKS)),
+            primary=primary
+        )
+
+    owners = {}
+    for fleet in fleets.values():
+        for ip in fleet.ips:
+            if ip in owners:
+                logger.warning(f"Orchestrator {ip} is listed in fleets '{owners[ip]}' and '{fleet.name}'; "
+                               f"its pillar name and networks come from '{owners[ip]}'")
+            else:
+                owners[ip] = fleet.name
+    return fleets
+
+
+def publish_fleet_mappings(fleets: Dict[str, Fleet]):
+    """Point the orchestrator client at the pillar names, network lists and endpoints of every fleet."""
+    pillar_mapping = {}
+    networks_by_ip = {}
+    endpoints = {}
+    # Earlier fleets win for an IP listed twice
+    for fleet in reversed(list(fleets.values())):
+        pillar_mapping.update(fleet.registry.mapping)
+        for ip in fleet.registry.ips:
+            endpoints.pop(ip, None)
+        endpoints.update(fleet.registry.endpoints)
+        if fleet.networks != DEFAULT_NETWORKS:
+            networks_by_ip.update(dict.fromkeys(fleet.registry.ips, fleet.networks))
+        else:
+            for ip in fleet.registry.ips:
+                networks_by_ip.pop(ip, None)
+    orchestrator_client.set_pillar_mapping(pillar_mapping)
+    orchestrator_client.set_fleet_networks(networks_by_ip)
+    orchestrator_client.set_endpoint_overrides(endpoints)
+
+
+_fleets: Optional[Dict[str, Fleet]] = None
+_fleets_lock = threading.Lock()
+
+
+def get_fleets() -> Dict[str, Fleet]:
+    """Return the process-wide fleets, primary first, loading them on first use."""
+    global _fleets
+    if _fleets is None:
+        with _fleets_lock:
+            if _fleets is None:
+                from config.settings import Config
+
+                fleets = load_fleets(Config)
+                publish_fleet_mappings(fleets)
+                for fleet in fleets.values():
+                    fleet.registry.add_listener(lambda added, removed: publish_fleet_mappings(fleets))
+                _fleets = fleets
+    return _fleets
+
+
+def primary_fleet() -> Fleet:
+    """Return the fleet served by the unprefixed routes."""
+    return next(iter(get_fleets().values()))
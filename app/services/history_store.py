@@ -0,0 +1,372 @@
+"""
+Time-series history of orchestrator state and queue depths.
+Every status update is folded into fixed-size ring files, one per series and
+resolution (1m, 1h and 1d), so disk usage is bounded by the configured slot
+counts and range queries read pre-aggregated buckets instead of raw samples.
+
+Each ring file is a 64-byte header followed by `slots` records. A record holds
+the bucket start time and, per metric, the sample count, sum, min and max of
+the values that fell into the bucket. The poller is the only writer; API
+workers map the files read-only.
+"""
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BHTS0001'
+HEADER = struct.Struct('<8sIII')  # magic, step, slots, metric count
+HEADER_SIZE = 64
+BUCKET = struct.Struct('<q')  # Bucket start (Unix seconds), 0 for an empty slot
+METRIC = struct.Struct('<Iddd')  # count, sum, min, max
+
+FLEET_SERIES = 'fleet'
+
+DEFAULT_NETWORKS = ('bnb', 'eth', 'supernova')
+
+
+def orchestrator_metrics(networks: Iterable[str] = DEFAULT_NETWORKS) -> Tuple[str, ...]:
+    """Per-orchestrator metric names for the network_stats keys of a fleet."""
+    metrics = ['online', 'state_num']
+    for network in networks:
+        metrics.extend((f'{network}_wraps', f'{network}_unwraps'))
+    return tuple(metrics)
+
+
+# Per-orchestrator metrics, extracted from one entry of status_data['orchestrators']
+ORCHESTRATOR_METRICS = orchestrator_metrics()
+# Fleet-wide metrics, extracted from the top level of status_data
+FLEET_METRICS = ('online_count', 'total_count', 'bridge_online', 'query_time_seconds')
+
+# Rollup resolutions, finest first: name -> bucket size in seconds
+RESOLUTIONS = (('1m', 60), ('1h', 3600), ('1d', 86400))
+
+_SERIES_RE = re.compile(r'^[A-Za-z0-9_.:-]+$')
+
+
+def parse_step(value: str) -> int:
+    """
+    Parse a step such as '300', '5m', '1h' or '1d' into seconds.
+
+    Raises:
+        ValueError: If the value is not a positive duration
+    """
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    value = value.strip().lower()
+    multiplier = units.get(value[-1:], None)
+    number = value[:-1] if multiplier else value
+    if not number.isdigit():
+        raise ValueError(f"Invalid step '{value}', use seconds or a duration such as 5m, 1h or 1d")
+    seconds = int(number) * (multiplier or 1)
+    if seconds <= 0:
+        raise ValueError(f"Step must be positive: {value}")
+    return seconds
+
+
+def orchestrator_samples(orchestrator: Dict,
+                         networks: Iterable[str] = DEFAULT_NETWORKS) -> Dict[str, Optional[float]]:
+    """Extract the per-orchestrator metric values from one status entry."""
+    stats = orchestrator.get('network_stats') or {}
+    samples = {
+        'online': 1.0 if orchestrator.get('status') == 'online' else 0.0,
+        'state_num': orchestrator.get('state_num')
+    }
+    for network in networks:
+        network_stats = stats.get(network) or {}
+        samples[f'{network}_wraps'] = network_stats.get('wraps')
+        samples[f'{network}_unwraps'] = network_stats.get('unwraps')
+    return samples
+
+
+def fleet_samples(status_data: Dict) -> Dict[str, Optional[float]]:
+    """Extract the fleet-wide metric values from a status snapshot."""
+    return {
+        'online_count': status_data.get('online_count'),
+        'total_count': status_data.get('total_count'),
+        'bridge_online': 1.0 if status_data.get('bridge_status') == 'online' else 0.0,
+        'query_time_seconds': status_data.get('query_time_seconds')
+    }
+
+
+class RingFile:
+    """One series at one resolution: a memory-mapped ring of aggregated buckets."""
+
+    def __init__(self, path: str, step: int, slots: int, metrics: Tuple[str, ...], writable: bool = False):
+        """
+        Initialize the ring file.
+
+        Args:
+            path: File path
+            step: Bucket size in seconds
+            slots: Number of buckets kept (retention is step * slots)
+            metrics: Metric names stored in each bucket, in order
+            writable: Create/resize the file and allow updates (poller only)
+        """
+        self.path = path
+        self.step = step
+        self.slots = slots
+        self.metrics = metrics
+        self.metric_index = {name: i for i, name in enumerate(metrics)}
+        self.record_size = BUCKET.size + METRIC.size * len(metrics)
+        self.size = HEADER_SIZE + self.record_size * slots
+        self.writable = writable
+        self._mm: Optional[mmap.mmap] = None
+        self._inode = None
+
+    def _open(self) -> bool:
+        """Map the file, (re)initializing it when writable and its layout changed."""
+        if self.writable:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        else:
+            try:
+                fd = os.open(self.path, os.O_RDONLY)
+            except FileNotFoundError:
+                return False
+        try:
+            st = os.fstat(fd)
+            expected = HEADER.pack(MAGIC, self.step, self.slots, len(self.metrics))
+            if self.writable:
+                header = os.pread(fd, HEADER.size, 0)
+                if st.st_size != self.size or header != expected:
+                    # New file or changed retention/metrics: start the ring over
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, self.size)
+                    os.pwrite(fd, expected, 0)
+                mm = mmap.mmap(fd, self.size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            else:
+                if st.st_size != self.size:
+                    return False
+                mm = mmap.mmap(fd, self.size, mmap.MAP_SHARED, mmap.PROT_READ)
+                if mm[:HEADER.size] != expected:
+                    mm.close()
+                    return False
+        finally:
+            os.close(fd)
+
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mm
+        self._inode = st.st_ino
+        return True
+
+    def _ensure_open(self) -> bool:
+        if self._mm is None:
+            return self._open()
+        if not self.writable:
+            # The poller may have recreated the file with a new layout
+            try:
+                if os.stat(self.path).st_ino != self._inode:
+                    return self._open()
+            except FileNotFoundError:
+                return False
+        return True
+
+    def _offset(self, bucket: int) -> int:
+        return HEADER_SIZE + ((bucket // self.step) % self.slots) * self.record_size
+
+    def add(self, timestamp: float, values: Dict[str, Optional[float]]):
+        """Fold one sample into the bucket containing `timestamp`."""
+        if not self._ensure_open():
+            return
+        mm = self._mm
+        bucket = int(timestamp) - int(timestamp) % self.step
+        offset = self._offset(bucket)
+        fresh = BUCKET.unpack_from(mm, offset)[0] != bucket
+        if fresh:
+            # Hide the slot from readers while its metrics are reset
+            BUCKET.pack_into(mm, offset, 0)
+
+        for i, name in enumerate(self.metrics):
+            value = values.get(name)
+            metric_offset = offset + BUCKET.size + i * METRIC.size
+            if fresh:
+                if value is None:
+                    METRIC.pack_into(mm, metric_offset, 0, 0.0, 0.0, 0.0)
+                else:
+                    METRIC.pack_into(mm, metric_offset, 1, value, value, value)
+            elif value is not None:
+                count, total, low, high = METRIC.unpack_from(mm, metric_offset)
+                if count:
+                    METRIC.pack_into(mm, metric_offset, count + 1, total + value, min(low, value), max(high, value))
+                else:
+                    METRIC.pack_into(mm, metric_offset, 1, value, value, value)
+
+        if fresh:
+            BUCKET.pack_into(mm, offset, bucket)
+
+    def read(self, metric: str, start: int, end: int) -> List[Tuple[int, int, float, float, float]]:
+        """
+        Read the buckets of one metric in [start, end).
+
+        Returns:
+            List of (bucket_start, count, sum, min, max) for buckets holding samples
+        """
+        if not self._ensure_open():
+            return []
+        mm = self._mm
+        index = self.metric_index[metric]
+        # Never read more than one lap of the ring
+        first = max(start - start % self.step, end - self.step * self.slots)
+        first += -first % self.step  # The retention floor is not bucket-aligned when `end` is not
+        rows = []
+        for bucket in range(first, end, self.step):
+            offset = self._offset(bucket)
+            if BUCKET.unpack_from(mm, offset)[0] != bucket:
+                continue
+            count, total, low, high = METRIC.unpack_from(mm, offset + BUCKET.size + index * METRIC.size)
+            if count:
+                rows.append((bucket, count, total, low, high))
+        return rows
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+class HistoryStore:
+    """Ring files for the fleet and every orchestrator, at 1m, 1h and 1d resolution."""
+
+    def __init__(self, directory: str, retention: Dict[str, int], networks: Iterable[str] = DEFAULT_NETWORKS):
+        """
+        Initialize the history store.
+
+        Args:
+            directory: Directory holding the ring files
+            retention: Number of buckets kept per resolution, e.g. {'1m': 2880, '1h': 1440, '1d': 730}
+            networks: network_stats keys recorded per orchestrator
+        """
+        self.directory = directory
+        self.retention = retention
+        self.networks = tuple(networks)
+        self.orchestrator_metrics = orchestrator_metrics(self.networks)
+        self.resolutions = [(name, step) for name, step in RESOLUTIONS if retention.get(name, 0) > 0]
+        self._rings: Dict[Tuple[str, str, bool], RingFile] = {}
+        self._lock = threading.Lock()
+
+    def metrics_for(self, series: str) -> Tuple[str, ...]:
+        return FLEET_METRICS if series == FLEET_SERIES else self.orchestrator_metrics
+
+    def _ring(self, series: str, resolution: str, step: int, writable: bool = False) -> RingFile:
+        """Return the ring for a series; only the recording process opens rings for writing."""
+        key = (series, resolution, writable)
+        ring = self._rings.get(key)
+        if ring is None:
+            path = os.path.join(self.directory, f"{series}.{resolution}.ring")
+            ring = RingFile(path, step, self.retention[resolution], self.metrics_for(series), writable=writable)
+            self._rings[key] = ring
+        return ring
+
+    def record(self, status_data: Dict, timestamp: float, ips: Optional[Iterable[str]] = None):
+        """
+        Fold a status snapshot into every series.
+
+        Args:
+            status_data: Snapshot as published by StatusService.update_status
+            timestamp: Unix time of the snapshot
+            ips: Orchestrators to record (those polled in this cycle), default all of them
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        ips = None if ips is None else set(ips)
+        series = [(FLEET_SERIES, fleet_samples(status_data))]
+        series.extend((orch['ip'], orchestrator_samples(orch, self.networks))
+                      for orch in status_data.get('orchestrators', [])
+                      if _SERIES_RE.match(orch.get('ip', '')) and (ips is None or orch['ip'] in ips))
+
+        with self._lock:
+            for name, values in series:
+                for resolution, step in self.resolutions:
+                    try:
+                        self._ring(name, resolution, step, writable=True).add(timestamp, values)
+                    except OSError as e:
+                        logger.error(f"Failed to record history for {name} ({resolution}): {e}")
+
+    def choose_resolution(self, start: int, step: int) -> Optional[Tuple[str, int]]:
+        """Pick the finest resolution that is no finer than `step` and still retains `start`."""
+        now = time.time()
+        candidates = [(name, res_step) for name, res_step in self.resolutions if res_step <= step]
+        if not candidates:
+            candidates = self.resolutions[:1]
+        for name, res_step in candidates:
+            if now - res_step * self.retention[name] <= start:
+                return name, res_step
+        # Nothing retains the whole range: use the coarsest candidate, which reaches back furthest
+        return candidates[-1] if candidates else None
+
+    def query(self, series: str, metric: str, start: int, end: int, step: int) -> Dict:
+        """
+        Answer a range query from the best rollup.
+
+        Args:
+            series: Orchestrator IP or FLEET_SERIES
+            metric: Metric name (see metrics_for)
+            start: Range start, Unix seconds (inclusive)
+            end: Range end, Unix seconds (exclusive)
+            step: Requested bucket size in seconds
+
+        Returns:
+            Dict with the resolution used and a list of points
+            (timestamp, avg, min, max, count) aligned to `step`
+
+        Raises:
+            ValueError: For an unknown series name or metric
+        """
+        if not _SERIES_RE.match(series):
+            raise ValueError(f"Invalid series: {series}")
+        if metric not in self.metrics_for(series):
+            raise ValueError(f"Unknown metric '{metric}'")
+
+        chosen = self.choose_resolution(start, step)
+        if chosen is None:
+            return {'resolution': None, 'step': step, 'points': []}
+        resolution, res_step = chosen
+        # Output buckets are whole multiples of the rollup they are built from
+        step = max(res_step, step - step % res_step)
+
+        with self._lock:
+            rows = self._ring(series, resolution, res_step).read(metric, start, end)
+
+        points: Dict[int, List[float]] = {}
+        for bucket, count, total, low, high in rows:
+            key = bucket - bucket % step
+            point = points.get(key)
+            if point is None:
+                points[key] = [count, total, low, high]
+            else:
+                point[0] += count
+                point[1] += total
+                point[2] = min(point[2], low)
+                point[3] = max(point[3], high)
+
+        return {
+            'resolution': resolution,
+            'step': step,
+            'points': [
+                {
+                    'timestamp': key,
+                    'avg': _round(total / count),
+                    'min': _round(low),
+                    'max': _round(high),
+                    'count': count
+                }
+                for key, (count, total, low, high) in sorted(points.items())
+            ]
+        }
+
+    def close(self):
+        with self._lock:
+            for ring in self._rings.values():
+                ring.close()
+            self._rings.clear()
+
+
+def _round(value: float) -> float:
+    return round(value, 4) if math.isfinite(value) else None
@@ -0,0 +1,53 @@
+"""
+Cache for orchestrator getIdentity responses.
+pillarName and producer almost never change, so they are only re-fetched on a
+slow cadence or after explicit invalidation, keeping getStatus as the only RPC
+on the per-cycle hot path.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+
+class IdentityCache:
+    """Thread-safe TTL cache of getIdentity responses keyed by orchestrator IP."""
+
+    def __init__(self, ttl: float = 3600):
+        """
+        Initialize the identity cache.
+
+        Args:
+            ttl: Seconds a cached identity stays valid (0 disables caching)
+        """
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, ip: str) -> Optional[Dict]:
+        """Return the cached identity response for an IP, or None if missing or expired."""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry is None:
+                return None
+            identity_data, fetched_at = entry
+            if time.monotonic() - fetched_at >= self.ttl:
+                del self._entries[ip]
+                return None
+            return identity_data
+
+    def set(self, ip: str, identity_data: Dict):
+        """Store a freshly fetched identity response."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[ip] = (identity_data, time.monotonic())
+
+    def invalidate(self, ip: Optional[str] = None):
+        """Drop the cached identity for an IP, or for every IP if none is given."""
+        with self._lock:
+            if ip is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ip, None)
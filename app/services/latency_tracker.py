@@ -0,0 +1,62 @@
+"""
+Per-orchestrator response latency tracking and adaptive read timeouts.
+Keeps a sliding window of successful request durations per host and derives
+the read timeout from the observed p95, so a healthy node that always answers
+in 100ms is given up on after a fraction of a second instead of the full
+ORCHESTRATOR_TIMEOUT, while consistently slow nodes keep a longer budget.
+"""
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+WINDOW = 50  # Requests kept per host
+MIN_SAMPLES = 5  # Requests needed before the timeout adapts
+
+
+class LatencyTracker:
+    """Thread-safe sliding windows of request latencies, one per orchestrator host."""
+
+    def __init__(self, max_timeout: float, min_timeout: float = 1.0, multiplier: float = 3.0,
+                 adaptive: bool = True):
+        """
+        Initialize the latency tracker.
+
+        Args:
+            max_timeout: Read timeout for hosts without enough samples, and the upper bound
+            min_timeout: Lower bound for adapted read timeouts
+            multiplier: Read timeout as a multiple of the host's p95 latency
+            adaptive: False always uses max_timeout
+        """
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.multiplier = multiplier
+        self.adaptive = adaptive
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: str, seconds: float):
+        """Record the duration of a successful request to a host."""
+        with self._lock:
+            samples = self._samples.get(host)
+            if samples is None:
+                samples = self._samples[host] = deque(maxlen=WINDOW)
+            samples.append(seconds)
+
+    def p95(self, host: str) -> Optional[float]:
+        """Return the host's p95 latency in seconds, or None without enough samples."""
+        with self._lock:
+            samples = self._samples.get(host)
+            if samples is None or len(samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.95) - 1)]
+
+    def timeout_for(self, host: str) -> float:
+        """Return the read timeout to use for the next request to a host."""
+        if not self.adaptive:
+            return self.max_timeout
+        p95 = self.p95(host)
+        if p95 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.multiplier))
@@ -0,0 +1,366 @@
+"""
+Process-local metrics with Prometheus text exposition.
+Every process (Gunicorn workers and the poller) counts into its own in-memory
+counters and histograms, and a background thread periodically writes them to
+`<directory>/<pid>-<token>.json` (the token is random per process, so a reused
+pid never overwrites an earlier process's file). A /metrics scrape, served by
+any worker, flushes its own process, sums the files of all processes and
+renders the result, so the numbers cover the whole deployment rather than
+whichever worker answered.
+
+When a worker or the poller exits, the Gunicorn master folds the files of
+processes that are no longer running into `exited.json`, so counters never go
+backwards and the directory does not grow with every restart. The directory
+is cleared when the Gunicorn master starts.
+"""
+import atexit
+import bisect
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.snapshot_codec import write_atomic
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+CYCLE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+EXITED_FILE = 'exited.json'  # Totals of processes that are no longer running
+LOCK_FILE = '.lock'  # Shared while files are summed, exclusive while exited processes are folded
+
+RPC_DURATION = 'bridge_health_rpc_duration_seconds'
+RPC_ERRORS = 'bridge_health_rpc_errors_total'
+RPC_RETRIES = 'bridge_health_rpc_retries_total'
+RPC_REQUEST_BYTES = 'bridge_health_rpc_request_bytes_total'
+RPC_RESPONSE_BYTES = 'bridge_health_rpc_response_bytes_total'
+RPC_CONNECTIONS = 'bridge_health_rpc_connections_total'
+QUERY_DURATION = 'bridge_health_orchestrator_query_duration_seconds'
+QUERY_RESULTS = 'bridge_health_orchestrator_queries_total'
+CYCLE_DURATION = 'bridge_health_poll_cycle_duration_seconds'
+HTTP_DURATION = 'bridge_health_http_request_duration_seconds'
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    RPC_DURATION: ('histogram', 'Duration of JSON-RPC requests to orchestrators, including retries',
+                   LATENCY_BUCKETS),
+    RPC_ERRORS: ('counter', 'Failed JSON-RPC requests by error class', None),
+    RPC_RETRIES: ('counter', 'HTTP retries made for JSON-RPC requests', None),
+    RPC_REQUEST_BYTES: ('counter', 'JSON-RPC request body bytes sent', None),
+    RPC_RESPONSE_BYTES: ('counter', 'JSON-RPC response body bytes received', None),
+    RPC_CONNECTIONS: ('counter', 'JSON-RPC request attempts by whether they reused a kept-alive connection', None),
+    QUERY_DURATION: ('histogram', 'Duration of orchestrator queries (all RPCs for one node in a cycle)',
+                     LATENCY_BUCKETS),
+    QUERY_RESULTS: ('counter', 'Orchestrator queries by result', None),
+    CYCLE_DURATION: ('histogram', 'Duration of polling cycles', CYCLE_BUCKETS),
+    HTTP_DURATION: ('histogram', 'Time to produce HTTP responses, by route', HTTP_BUCKETS),
+}
+
+
+class Histogram:
+    """Cumulative-on-render histogram with fixed bucket bounds."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Counters and histograms of one process, shared with other processes through files."""
+
+    def __init__(self):
+        self.directory: Optional[str] = None
+        self.enabled = False
+        self.flush_interval = 5.0
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Keeps concurrent flushes from writing out of order
+        self._dirty = False
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._token = uuid.uuid4().hex[:8]
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self.flush)
+
+    def configure(self, directory: Optional[str], flush_interval: float = 5.0):
+        """
+        Enable collection.
+
+        Args:
+            directory: Directory shared by all processes for their metric files, None to disable metrics
+            flush_interval: Seconds between writes of this process's file
+        """
+        self.directory = directory
+        self.enabled = directory is not None
+        self.flush_interval = flush_interval
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+
+    def _after_fork(self):
+        # A forked child starts with empty metrics and its own flusher thread
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._dirty = False
+        self._flusher = None
+        self._stop = threading.Event()
+        self._token = uuid.uuid4().hex[:8]
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write metrics: {e}")
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1):
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._dirty = True
+            self._ensure_flusher()
+
+    def observe(self, name: str, labels: Labels, value: float):
+        """Record a value in a histogram."""
+        if not self.enabled:
+            return
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(len(buckets))
+            histogram.counts[bisect.bisect_left(buckets, value)] += 1
+            histogram.sum += value
+            histogram.count += 1
+            self._dirty = True
+            self._ensure_flusher()
+
+    def _dump(self) -> Dict:
+        return dump(self._counters, self._histograms)
+
+    def flush(self):
+        """Write this process's metrics to its file if they changed."""
+        if not self.enabled:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                payload = json.dumps(self._dump(), separators=(',', ':')).encode('utf-8')
+                self._dirty = False
+            write_atomic(os.path.join(self.directory, f'{os.getpid()}-{self._token}.json'), payload)
+
+    def collect(self) -> Dict:
+        """Sum the metrics of every process that wrote to the directory."""
+        self.flush()
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        with _DirectoryLock(self.directory, fcntl.LOCK_SH):
+            for path in glob.glob(os.path.join(self.directory, '*.json')):
+                data = _read(path)
+                if data is not None:
+                    merge(data, counters, histograms)
+        return {'counters': counters, 'histograms': histograms}
+
+    def render(self, gauges: Iterable[Tuple[str, str, Labels, float]] = ()) -> str:
+        """
+        Render all processes' metrics in the Prometheus text format.
+
+        Args:
+            gauges: Extra (name, help, labels, value) gauge samples computed at scrape time
+        """
+        collected = self.collect() if self.enabled else {'counters': {}, 'histograms': {}}
+        by_name: Dict[str, List[str]] = {}
+
+        for (name, labels), value in sorted(collected['counters'].items()):
+            by_name.setdefault(name, []).append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+        for (name, labels), histogram in sorted(collected['histograms'].items(), key=lambda item: item[0]):
+            buckets = METRICS[name][2]
+            lines = by_name.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], histogram.counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else format_value(bound)
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+        output = []
+        for name in sorted(by_name):
+            kind, help_text, _ = METRICS.get(name, ('untyped', name, None))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(by_name[name])
+
+        gauge_help = {}
+        gauge_lines: Dict[str, List[str]] = {}
+        for name, help_text, labels, value in gauges:
+            gauge_help.setdefault(name, help_text)
+            gauge_lines.setdefault(name, []).append(f"{name}{format_labels(labels)} {format_value(value)}")
+        for name in gauge_lines:
+            output.append(f"# HELP {name} {gauge_help[name]}")
+            output.append(f"# TYPE {name} gauge")
+            output.extend(gauge_lines[name])
+
+        return '\n'.join(output) + '\n'
+
+
+def dump(counters: Dict[Tuple[str, Labels], float], histograms: Dict[Tuple[str, Labels], Histogram]) -> Dict:
+    """Serializable form of counters and histograms (the metric file format)."""
+    return {
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [[name, list(labels), h.counts, h.sum, h.count]
+                       for (name, labels), h in histograms.items()]
+    }
+
+
+def merge(data: Dict, counters: Dict[Tuple[str, Labels], float], histograms: Dict[Tuple[str, Labels], Histogram]):
+    """Add the contents of a metric file to the given totals."""
+    for name, labels, value in data.get('counters', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, counts, total, count in data.get('histograms', []):
+        if name not in METRICS:
+            continue
+        key = (name, tuple(tuple(pair) for pair in labels))
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(len(METRICS[name][2]))
+        if len(counts) != len(histogram.counts):
+            continue  # Written with different buckets (older version)
+        histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+        histogram.sum += total
+        histogram.count += count
+
+
+def _read(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'rb') as f:
+            return json.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Skipping unreadable metrics file {path}: {e}")
+        return None
+
+
+def _process_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    return True
+
+
+def fold_exited(directory: str) -> int:
+    """
+    Fold the metric files of processes that are no longer running into exited.json.
+
+    Called by the Gunicorn master when a worker or the poller exits. A file is
+    only folded once no process with its pid is running, so a file whose pid
+    was already reused is kept until that process exits too.
+
+    Returns:
+        Number of files folded
+    """
+    if not os.path.isdir(directory):
+        return 0
+    with _DirectoryLock(directory, fcntl.LOCK_EX):
+        exited = []
+        for path in glob.glob(os.path.join(directory, '*-*.json')):
+            pid = os.path.basename(path).split('-', 1)[0]
+            if pid.isdigit() and not _process_running(int(pid)):
+                exited.append(path)
+        if not exited:
+            return 0
+
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        for path in [os.path.join(directory, EXITED_FILE)] + exited:
+            data = _read(path)
+            if data is not None:
+                merge(data, counters, histograms)
+        payload = json.dumps(dump(counters, histograms), separators=(',', ':')).encode('utf-8')
+        write_atomic(os.path.join(directory, EXITED_FILE), payload)
+        for path in exited:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        return len(exited)
+
+
+class _DirectoryLock:
+    """Context manager holding a flock on the metrics directory's lock file."""
+
+    def __init__(self, directory: str, operation: int):
+        self.path = os.path.join(directory, LOCK_FILE)
+        self.operation = operation
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, self.operation)
+        return self
+
+    def __exit__(self, *exc):
+        os.close(self.fd)  # Releases the lock
+        return False
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels: Labels) -> str:
+    """Render a label set as {key="value",...}."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def format_value(value: float) -> str:
+    """Render a sample value, without a trailing .0 for whole numbers."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def reset_directory(directory: str):
+    """Remove the metric files of a previous run (called once by the Gunicorn master)."""
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# Process-wide registry, configured by create_app()
+registry = MetricsRegistry()
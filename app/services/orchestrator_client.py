@@ -5,14 +5,27 @@ This module provides a unified interface for interacting with orchestrators.
 import json
 import logging
 import re
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import requests
-from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
 from urllib3.util.retry import Retry
 
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.connection_pool import ConnectionStats, TrackedHTTPAdapter
+from app.services.endpoints import DEFAULT_PORT, Endpoint, TlsVerify
+from app.services.identity_cache import IdentityCache
+from app.services.latency_tracker import LatencyTracker
+from app.services.metrics import (
+    CYCLE_DURATION, QUERY_DURATION, QUERY_RESULTS, RPC_DURATION, RPC_ERRORS, RPC_REQUEST_BYTES,
+    RPC_RESPONSE_BYTES, RPC_RETRIES, registry as metrics
+)
+from app.services.token_bucket import HostRateLimiter
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -27,9 +40,29 @@ STATE_MAP = {
 
 # Constants
 DEFAULT_TIMEOUT = 5
-DEFAULT_PORT = 55000
+DEFAULT_CONNECT_TIMEOUT = 2
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+MIN_REQUEST_TIMEOUT = 0.05  # Smallest connect/read timeout of a request sent close to the cycle deadline
+JSON_HEADERS = {"Content-Type": "application/json"}
+DEFAULT_POOL_HOSTS = 1024  # Orchestrators whose idle connections the threaded engine keeps
 ONLINE_STATES = [0, 1]  # States that indicate orchestrator is online
-MIN_ONLINE_FOR_BRIDGE = 16  # Minimum orchestrators online for bridge to be considered online
+MIN_ONLINE_FOR_BRIDGE = 16  # Default minimum orchestrators online for bridge to be considered online
+
+# Bridge networks reported in network_stats: network name in getStatus -> stats key
+DEFAULT_NETWORKS = {
+    'BNB Chain': 'bnb',
+    'Ethereum': 'eth',
+    'Supernova': 'supernova'
+}
+
+# Polling engines
+ENGINE_THREADED = "threaded"
+ENGINE_ASYNC = "async"
+
+# RPC modes
+RPC_MODE_SERIAL = "serial"  # One POST per RPC, paced by the per-host rate limiter
+RPC_MODE_BATCH = "batch"  # getIdentity and getStatus sent together as a JSON-RPC batch
 
 # Import pillar mapping from external config file
 try:
@@ -41,30 +74,206 @@ except ImportError:
                   "Please ensure config/orchestrator_mapping.py exists with PILLAR_MAPPING defined.")
 
 
+def format_pillar_name(name: str) -> str:
+    """Format pillar name for URL by removing special characters and converting to lowercase."""
+    return ''.join(c.lower() for c in name if c.isalnum())
+
+
+def build_static_pillars(mapping: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Precompute the static per-pillar fields for a pillar mapping.
+    
+    Args:
+        mapping: IP to {"name", "pubkey"} pillar mapping
+        
+    Returns:
+        Dictionary of IP to static pillar fields, ordered by pillar name
+    """
+    static_pillars = {}
+    for ip, info in sorted(mapping.items(), key=lambda item: item[1]['name'].lower()):
+        pillar_url = format_pillar_name(info['name'])
+        static_pillars[ip] = {
+            'ip': ip,
+            'pillar_name': info['name'],
+            'pillar_url': pillar_url,
+            'pubkey': info['pubkey'],
+            'zenonhub_url': f"https://zenonhub.io/pillar/{pillar_url}"
+        }
+    return static_pillars
+
+
+def rpc_error_class(error: Exception) -> str:
+    """Classify a failed request for the error metrics."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return 'connect_timeout'
+    if isinstance(error, requests.exceptions.ReadTimeout):
+        return 'read_timeout'
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return 'connection'
+    if isinstance(error, requests.exceptions.HTTPError):
+        return 'http'
+    return type(error).__name__
+
+
+def empty_network_stats(networks: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+    """Zeroed wraps/unwraps counts for every network of a network list."""
+    return {key: {'wraps': 0, 'unwraps': 0} for key in networks.values()}
+
+
+# Static pillar fields, computed once at mapping load
+STATIC_PILLARS = build_static_pillars(PILLAR_MAPPING)
+
+# Network lists of orchestrators whose fleet does not use DEFAULT_NETWORKS (see app.services.fleets)
+FLEET_NETWORKS: Dict[str, Dict[str, str]] = {}
+
+# Registry endpoint overrides (host, port, scheme, tls_verify) by orchestrator IP (see app.services.endpoints)
+ENDPOINT_OVERRIDES: Dict[str, Dict] = {}
+
+
+def set_pillar_mapping(mapping: Dict[str, Dict]):
+    """
+    Replace the pillar mapping (e.g. after the orchestrator registry changed).
+    
+    Both module globals are rebound rather than mutated, so readers iterating
+    the previous mapping are unaffected.
+    """
+    global PILLAR_MAPPING, STATIC_PILLARS
+    static_pillars = build_static_pillars(mapping)
+    PILLAR_MAPPING = mapping
+    STATIC_PILLARS = static_pillars
+
+
+def set_fleet_networks(networks_by_ip: Dict[str, Dict[str, str]]):
+    """Replace the per-orchestrator network lists (rebound like set_pillar_mapping)."""
+    global FLEET_NETWORKS
+    FLEET_NETWORKS = networks_by_ip
+
+
+def set_endpoint_overrides(overrides_by_ip: Dict[str, Dict]):
+    """Replace the per-orchestrator endpoint overrides (rebound like set_pillar_mapping)."""
+    global ENDPOINT_OVERRIDES
+    ENDPOINT_OVERRIDES = overrides_by_ip
+
+
+def networks_for(ip: str) -> Dict[str, str]:
+    """Return the network list of an orchestrator's fleet."""
+    return FLEET_NETWORKS.get(ip, DEFAULT_NETWORKS)
+
+
 class OrchestratorClient:
     """Client for interacting with orchestrator nodes."""
     
-    def __init__(self, timeout: int = DEFAULT_TIMEOUT, max_workers: int = 10):
+    def __init__(self, timeout: int = DEFAULT_TIMEOUT, max_workers: int = 10,
+                 engine: str = ENGINE_THREADED, max_concurrency: int = 100,
+                 per_host_limit: int = 2, rpc_mode: str = RPC_MODE_SERIAL,
+                 rate_limit: float = 10.0, rate_burst: float = 2.0,
+                 identity_ttl: float = 3600, breaker_threshold: int = 3,
+                 breaker_reset: float = 60, breaker_max_reset: float = 600,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT, adaptive_timeouts: bool = True,
+                 min_timeout: float = 1.0, timeout_multiplier: float = 3.0,
+                 cycle_deadline: float = 0, port: int = DEFAULT_PORT, scheme: str = 'http',
+                 tls_verify: TlsVerify = True, pool_hosts: int = DEFAULT_POOL_HOSTS,
+                 keepalive_timeout: float = 300):
         """
         Initialize the orchestrator client.
         
         Args:
-            timeout: Request timeout in seconds
+            timeout: Read timeout in seconds (the upper bound when timeouts adapt)
             max_workers: Maximum number of concurrent threads
+            engine: Polling engine to use ('threaded' or 'async')
+            max_concurrency: Global in-flight request limit for the async engine
+            per_host_limit: Per-orchestrator connection limit for the async engine, and the
+                idle connections kept per orchestrator by either engine
+            rpc_mode: How getIdentity/getStatus are sent ('serial' or 'batch')
+            rate_limit: Requests per second allowed per orchestrator (0 disables)
+            rate_burst: Requests an orchestrator may receive back-to-back
+            identity_ttl: Seconds a getIdentity response is reused (0 disables caching)
+            breaker_threshold: Consecutive network failures that open an orchestrator's circuit (0 disables)
+            breaker_reset: Seconds before an open circuit lets a probe through
+            breaker_max_reset: Maximum seconds between probes of an orchestrator that stays down
+            connect_timeout: Connect timeout in seconds
+            adaptive_timeouts: Derive each orchestrator's read timeout from its p95 latency
+            min_timeout: Lower bound for adaptive read timeouts
+            timeout_multiplier: Adaptive read timeout as a multiple of the p95 latency
+            cycle_deadline: Seconds a query_all_orchestrators call may take before pending
+                orchestrators are reported as timed out (0 disables)
+            port: JSON-RPC port of orchestrators without a registry override
+            scheme: 'http' or 'https' for orchestrators without a registry override
+            tls_verify: Certificate verification for https endpoints (True, False or a CA bundle path)
+            pool_hosts: Orchestrators whose idle connections the threaded engine keeps between cycles
+            keepalive_timeout: Seconds the async engine keeps an idle connection open
         """
         self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.cycle_deadline = cycle_deadline
+        self.latency = LatencyTracker(
+            max_timeout=timeout,
+            min_timeout=min_timeout,
+            multiplier=timeout_multiplier,
+            adaptive=adaptive_timeouts
+        )
         self.max_workers = max_workers
-        self.session = self._create_session()
+        self.default_endpoint = Endpoint(None, port, scheme, tls_verify)
+        self._endpoints: Dict[str, Endpoint] = {}
+        self._endpoint_overrides = None  # ENDPOINT_OVERRIDES the cached endpoints were built from
+        self.connection_stats = ConnectionStats()
+        self.session = self._create_session(
+            pool_hosts=max(pool_hosts, max_workers),
+            per_host=max(1, per_host_limit)
+        )
+        self.rate_limiter = HostRateLimiter(rate=rate_limit, burst=rate_burst)
+        self.rpc_mode = rpc_mode if rpc_mode in (RPC_MODE_SERIAL, RPC_MODE_BATCH) else RPC_MODE_SERIAL
+        self.batch_unsupported = set()  # Hosts that rejected a JSON-RPC batch
+        self.identity_cache = IdentityCache(ttl=identity_ttl)
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=breaker_threshold,
+            reset_timeout=breaker_reset,
+            max_reset_timeout=breaker_max_reset
+        )
+        self._rpc_executor: Optional[ThreadPoolExecutor] = None
+        self._query_executor: Optional[ThreadPoolExecutor] = None
+        self._deadlines: Dict[str, float] = {}  # Cycle deadline of each orchestrator's running query
+        self._in_flight = set()  # Orchestrators whose threaded query is still running
+        self._in_flight_lock = threading.Lock()
+        self.engine = ENGINE_THREADED
+        self.async_engine = None
+        
+        if engine == ENGINE_ASYNC:
+            from app.services.async_engine import AsyncPollingEngine
+            if AsyncPollingEngine.available():
+                self.engine = ENGINE_ASYNC
+                self.async_engine = AsyncPollingEngine(
+                    self,
+                    max_concurrency=max_concurrency,
+                    per_host_limit=per_host_limit,
+                    keepalive_timeout=keepalive_timeout
+                )
+            else:
+                logger.warning("Async polling engine requested but aiohttp is not installed. "
+                               "Falling back to the threaded engine.")
+        elif engine != ENGINE_THREADED:
+            logger.warning(f"Unknown polling engine '{engine}'. Falling back to the threaded engine.")
     
-    def _create_session(self) -> requests.Session:
-        """Create a requests session with retry logic."""
+    def _create_session(self, pool_hosts: int = DEFAULT_POOL_HOSTS, per_host: int = 2) -> requests.Session:
+        """
+        Create a requests session with retry logic and a connection pool per orchestrator.
+        
+        Args:
+            pool_hosts: Orchestrators whose connections are kept alive between cycles
+            per_host: Idle connections kept per orchestrator
+        """
         session = requests.Session()
         retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.3,
+            total=RETRY_TOTAL,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
             status_forcelist=[429, 500, 502, 503, 504],
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = TrackedHTTPAdapter(
+            self.connection_stats,
+            pool_connections=pool_hosts,
+            pool_maxsize=per_host,
+            max_retries=retry_strategy
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
@@ -80,7 +289,93 @@ class OrchestratorClient:
     @staticmethod
     def format_pillar_name(name: str) -> str:
         """Format pillar name for URL by removing special characters and converting to lowercase."""
-        return ''.join(c.lower() for c in name if c.isalnum())
+        return format_pillar_name(name)
+    
+    @staticmethod
+    def _pillar_url(ip: str, pillar_name: str) -> str:
+        """Return the URL slug for a pillar, using the precomputed value when mapped."""
+        static_pillar = STATIC_PILLARS.get(ip)
+        if static_pillar is not None:
+            return static_pillar['pillar_url']
+        return format_pillar_name(pillar_name)
+    
+    def endpoint(self, ip: str) -> Endpoint:
+        """Return an orchestrator's endpoint: the default one, with its registry overrides applied."""
+        overrides = ENDPOINT_OVERRIDES
+        if overrides is not self._endpoint_overrides:
+            # The registry changed: rebuild endpoints on demand
+            self._endpoints = {}
+            self._endpoint_overrides = overrides
+        endpoint = self._endpoints.get(ip)
+        if endpoint is None:
+            endpoint = self.default_endpoint.for_ip(ip, overrides.get(ip))
+            self._endpoints[ip] = endpoint
+        return endpoint
+    
+    def _build_url(self, ip: str) -> str:
+        """Build the JSON-RPC endpoint URL for an orchestrator."""
+        return self.endpoint(ip).url
+    
+    def request_timeout(self, ip: str) -> Tuple[float, float]:
+        """
+        Return the (connect, read) timeouts for the next request to an orchestrator.
+        
+        During a threaded cycle with a deadline both are clamped to the time left
+        before it (at least MIN_REQUEST_TIMEOUT), so a request still running when
+        the deadline passes is abandoned instead of holding its worker thread.
+        """
+        connect_timeout, read_timeout = self.connect_timeout, self.latency.timeout_for(ip)
+        deadline = self._deadlines.get(ip)
+        if deadline is not None:
+            remaining = max(MIN_REQUEST_TIMEOUT, deadline - time.monotonic())
+            connect_timeout, read_timeout = min(connect_timeout, remaining), min(read_timeout, remaining)
+        return connect_timeout, read_timeout
+    
+    def _post(self, ip: str, method: str, payload) -> requests.Response:
+        """
+        POST a JSON-RPC payload to an orchestrator, recording latency, retries, bytes and errors.
+        
+        Args:
+            ip: IP address of the orchestrator
+            method: RPC method, used as the metric label ('batch' for batch requests)
+            payload: JSON-RPC request or batch array
+            
+        Returns:
+            The HTTP response (whatever its status)
+        """
+        body = json.dumps(payload).encode('utf-8')
+        labels = (('ip', ip), ('method', method))
+        
+        endpoint = self.endpoint(ip)
+        self.rate_limiter.wait(ip)
+        started = time.monotonic()
+        try:
+            response = self.session.post(
+                endpoint.url,
+                data=body,
+                headers=JSON_HEADERS,
+                timeout=self.request_timeout(ip),
+                verify=endpoint.tls_verify
+            )
+        except requests.exceptions.RequestException as e:
+            metrics.observe(RPC_DURATION, labels, time.monotonic() - started)
+            metrics.inc(RPC_ERRORS, labels + (('error', rpc_error_class(e)),))
+            if e.args and isinstance(e.args[0], MaxRetryError):
+                metrics.inc(RPC_RETRIES, labels, RETRY_TOTAL)
+            raise
+        
+        elapsed = time.monotonic() - started
+        metrics.observe(RPC_DURATION, labels, elapsed)
+        metrics.inc(RPC_REQUEST_BYTES, labels, len(body))
+        metrics.inc(RPC_RESPONSE_BYTES, labels, len(response.content))
+        retries = getattr(response.raw, 'retries', None)
+        if retries is not None and retries.history:
+            metrics.inc(RPC_RETRIES, labels, len(retries.history))
+        if response.status_code >= 400:
+            metrics.inc(RPC_ERRORS, labels + (('error', 'http'),))
+        else:
+            self.latency.record(ip, elapsed)
+        return response
     
     def _make_request(self, ip: str, method: str, params: List = None) -> Dict:
         """
@@ -94,19 +389,94 @@ class OrchestratorClient:
         Returns:
             Response data dictionary
         """
-        url = f"http://{ip}:{DEFAULT_PORT}"
-        headers = {"Content-Type": "application/json"}
-        payload = {"method": method, "params": params or []}
-        
-        response = self.session.post(
-            url,
-            json=payload,
-            headers=headers,
-            timeout=self.timeout
-        )
+        response = self._post(ip, method, {"method": method, "params": params or []})
         response.raise_for_status()
         return response.json()
     
+    @staticmethod
+    def _build_batch_payload(methods: List[str]) -> List[Dict]:
+        """Build a JSON-RPC batch array, using each method's position as its id."""
+        return [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": []}
+            for i, method in enumerate(methods)
+        ]
+    
+    @staticmethod
+    def _parse_batch_response(methods: List[str], data) -> Dict[str, Dict]:
+        """
+        Map a JSON-RPC batch response back to its methods.
+        
+        Raises:
+            BatchNotSupportedError: If the node did not answer with a matching batch array
+        """
+        if not isinstance(data, list):
+            raise BatchNotSupportedError("Response is not a JSON-RPC batch array")
+        
+        by_id = {item.get("id"): item for item in data if isinstance(item, dict)}
+        try:
+            return {method: by_id[i] for i, method in enumerate(methods)}
+        except KeyError:
+            raise BatchNotSupportedError("Batch response is missing replies")
+    
+    def _make_batch_request(self, ip: str, methods: List[str]) -> Dict[str, Dict]:
+        """
+        Send several RPCs to an orchestrator in a single JSON-RPC batch POST.
+        
+        Args:
+            ip: IP address of the orchestrator
+            methods: RPC methods to call (without parameters)
+            
+        Returns:
+            Dictionary mapping each method to its response
+        """
+        response = self._post(ip, "batch", self._build_batch_payload(methods))
+        if 400 <= response.status_code < 500:
+            raise BatchNotSupportedError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        try:
+            data = response.json()
+        except ValueError:
+            raise BatchNotSupportedError("Batch response is not valid JSON")
+        return self._parse_batch_response(methods, data)
+    
+    def _make_concurrent_requests(self, ip: str, methods: List[str]) -> Dict[str, Dict]:
+        """Issue several RPCs to an orchestrator at the same time as separate POSTs."""
+        if len(methods) == 1:
+            return {methods[0]: self._make_request(ip, methods[0])}
+        
+        if self._rpc_executor is None:
+            self._rpc_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers * 2,
+                thread_name_prefix="orchestrator-rpc"
+            )
+        futures = {method: self._rpc_executor.submit(self._make_request, ip, method) for method in methods}
+        return {method: future.result() for method, future in futures.items()}
+    
+    def _fetch_rpc(self, ip: str, methods: List[str]) -> Dict[str, Dict]:
+        """
+        Call the given RPC methods on an orchestrator using the configured RPC mode.
+        
+        In batch mode the calls go out as one JSON-RPC batch; nodes that reject
+        batching are remembered and queried with concurrent single calls instead.
+        
+        Args:
+            ip: IP address of the orchestrator
+            methods: RPC methods to call
+            
+        Returns:
+            Dictionary mapping each method to its response
+        """
+        if self.rpc_mode == RPC_MODE_BATCH:
+            if len(methods) > 1 and ip not in self.batch_unsupported:
+                try:
+                    return self._make_batch_request(ip, methods)
+                except BatchNotSupportedError as e:
+                    logger.info(f"Orchestrator at {ip} rejected JSON-RPC batch ({e}), using concurrent calls")
+                    self.batch_unsupported.add(ip)
+            return self._make_concurrent_requests(ip, methods)
+        
+        return {method: self._make_request(ip, method) for method in methods}
+    
     def query_single_orchestrator(self, ip: str) -> Dict:
         """
         Query a single orchestrator for its status.
@@ -117,34 +487,82 @@ class OrchestratorClient:
         Returns:
             Dictionary containing orchestrator status information
         """
+        if not self.circuit_breaker.allow(ip):
+            return self._circuit_open_response(ip)
+        
+        started = time.monotonic()
         try:
-            # Query identity
-            identity_data = self._make_request(ip, "getIdentity")
-            
-            # Small delay to avoid overwhelming the orchestrator
-            time.sleep(0.1)
-            
-            # Query status
-            status_data = self._make_request(ip, "getStatus")
+            # Query status, plus identity unless it is cached (pacing is handled by the per-host rate limiter)
+            methods, cached_identity = self._rpc_methods_for(ip)
+            responses = self._fetch_rpc(ip, methods)
             
-            # Check for errors
-            if identity_data.get("error") or status_data.get("error"):
-                error_msg = identity_data.get("error") or status_data.get("error")
-                logger.error(f"RPC error for {ip}: {error_msg}")
-                return self._create_error_response(ip, error_msg)
-            
-            # Process the data
-            return self._process_orchestrator_data(ip, identity_data, status_data)
+            result = self._handle_rpc_responses(ip, responses, cached_identity)
+            outcome = 'ok' if result['state_num'] is not None else 'rpc_error'
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Network error querying orchestrator at {ip}: {str(e)}")
-            return self._create_error_response(ip, f"Network error: {str(e)}")
+            result = self._create_error_response(ip, f"Network error: {str(e)}")
+            self.circuit_breaker.record_failure(ip, result)
+            self.record_query(ip, started, 'network_error')
+            return result
         except (KeyError, json.JSONDecodeError) as e:
             logger.error(f"Data parsing error for orchestrator at {ip}: {str(e)}")
-            return self._create_error_response(ip, f"Invalid response format: {str(e)}")
+            result = self._create_error_response(ip, f"Invalid response format: {str(e)}")
+            outcome = 'parse_error'
         except Exception as e:
             logger.error(f"Unexpected error querying orchestrator at {ip}: {str(e)}")
-            return self._create_error_response(ip, f"Unexpected error: {str(e)}")
+            result = self._create_error_response(ip, f"Unexpected error: {str(e)}")
+            outcome = 'error'
+        
+        # The node answered, even if the answer was unusable
+        self.circuit_breaker.record_success(ip)
+        self.record_query(ip, started, outcome)
+        return result
+    
+    @staticmethod
+    def record_query(ip: str, started: float, outcome: str):
+        """Record the duration and outcome of one orchestrator query."""
+        metrics.observe(QUERY_DURATION, (('ip', ip),), time.monotonic() - started)
+        metrics.inc(QUERY_RESULTS, (('ip', ip), ('result', outcome)))
+    
+    def _circuit_open_response(self, ip: str) -> Dict:
+        """Fail fast for an orchestrator whose circuit is open, repeating its last error."""
+        metrics.inc(QUERY_RESULTS, (('ip', ip), ('result', 'circuit_open')))
+        last_error = self.circuit_breaker.last_error(ip)
+        if last_error is None:
+            return self._create_error_response(ip, "Circuit open: orchestrator unreachable")
+        return dict(last_error)
+    
+    def _rpc_methods_for(self, ip: str) -> Tuple[List[str], Optional[Dict]]:
+        """
+        Decide which RPCs an orchestrator needs this cycle.
+        
+        Returns:
+            Tuple of (methods to call, cached identity response or None)
+        """
+        cached_identity = self.identity_cache.get(ip)
+        if cached_identity is not None:
+            return ["getStatus"], cached_identity
+        return ["getIdentity", "getStatus"], None
+    
+    def _handle_rpc_responses(self, ip: str, responses: Dict[str, Dict],
+                              cached_identity: Optional[Dict] = None) -> Dict:
+        """Turn raw getIdentity/getStatus responses into a result, checking for RPC errors."""
+        identity_data = cached_identity or responses["getIdentity"]
+        status_data = responses["getStatus"]
+        
+        if identity_data.get("error") or status_data.get("error"):
+            error_msg = identity_data.get("error") or status_data.get("error")
+            logger.error(f"RPC error for {ip}: {error_msg}")
+            return self._create_error_response(ip, error_msg)
+        
+        result = self._process_orchestrator_data(ip, identity_data, status_data)
+        
+        # Only cache identities that were just fetched and match the static mapping
+        if cached_identity is None and not result["name_mismatch"]:
+            self.identity_cache.set(ip, identity_data)
+        
+        return result
     
     def _process_orchestrator_data(self, ip: str, identity_data: Dict, status_data: Dict) -> Dict:
         """Process raw orchestrator data into standardized format."""
@@ -165,14 +583,15 @@ class OrchestratorClient:
             name_mismatch = True
             error_msg = f"Name mismatch: API returned '{api_pillar_name}', expected '{static_pillar_name}'"
             logger.warning(f"Pillar name mismatch for {ip}: API='{api_pillar_name}' vs Static='{static_pillar_name}'")
+            self.identity_cache.invalidate(ip)
         
-        # Process network statistics
-        network_stats = self._process_network_stats(status_data)
+        # Process network statistics for the networks of the orchestrator's fleet
+        network_stats = self._process_network_stats(status_data, networks_for(ip))
         
         return {
             "ip": ip,
             "pillar_name": static_pillar_name,  # Always use static name
-            "pillar_url": self.format_pillar_name(static_pillar_name),
+            "pillar_url": self._pillar_url(ip, static_pillar_name),
             "producer_address": producer_address,
             "status": status,
             "state": f"{state_num} ({state_name})",
@@ -184,26 +603,23 @@ class OrchestratorClient:
             "name_mismatch": name_mismatch
         }
     
-    def _process_network_stats(self, status_data: Dict) -> Dict:
-        """Extract network statistics from status data."""
-        network_stats = {
-            'bnb': {'wraps': 0, 'unwraps': 0},
-            'eth': {'wraps': 0, 'unwraps': 0},
-            'supernova': {'wraps': 0, 'unwraps': 0}
-        }
+    @staticmethod
+    def _process_network_stats(status_data: Dict, networks: Dict[str, str] = DEFAULT_NETWORKS) -> Dict:
+        """
+        Extract network statistics from status data.
+        
+        Args:
+            status_data: getStatus response
+            networks: Network name in the response -> key in the returned stats
+        """
+        network_stats = empty_network_stats(networks)
         
         if "result" in status_data and "networks" in status_data["result"]:
-            networks = status_data["result"]["networks"]
+            reported = status_data["result"]["networks"]
             
-            network_mapping = {
-                'BNB Chain': 'bnb',
-                'Ethereum': 'eth',
-                'Supernova': 'supernova'
-            }
-            
-            for network_name, network_key in network_mapping.items():
-                if network_name in networks:
-                    network_data = networks[network_name]
+            for network_name, network_key in networks.items():
+                if network_name in reported:
+                    network_data = reported[network_name]
                     network_stats[network_key]['wraps'] = network_data.get('wrapsToSign', 0)
                     network_stats[network_key]['unwraps'] = network_data.get('unwrapsToSign', 0)
         
@@ -211,6 +627,9 @@ class OrchestratorClient:
     
     def _create_error_response(self, ip: str, error: str) -> Dict:
         """Create a standardized error response for a failed orchestrator query."""
+        # Re-fetch the identity once the node comes back from the error
+        self.identity_cache.invalidate(ip)
+        
         # Get static pillar info even for offline orchestrators
         static_pillar = PILLAR_MAPPING.get(ip, {})
         static_pillar_name = static_pillar.get("name", f"Unknown-{ip}")
@@ -218,68 +637,131 @@ class OrchestratorClient:
         return {
             "ip": ip,
             "pillar_name": static_pillar_name,  # Use static name
-            "pillar_url": self.format_pillar_name(static_pillar_name),
+            "pillar_url": self._pillar_url(ip, static_pillar_name),
             "producer_address": "Unknown",
             "status": "offline",
             "state": "Unknown",
             "state_num": None,
-            "network_stats": {
-                'bnb': {'wraps': 0, 'unwraps': 0},
-                'eth': {'wraps': 0, 'unwraps': 0},
-                'supernova': {'wraps': 0, 'unwraps': 0}
-            },
+            "network_stats": empty_network_stats(networks_for(ip)),
             "error": error,
             "last_checked": datetime.now().isoformat(),
             "api_pillar_name": None,  # No API response available
             "name_mismatch": False
         }
     
-    def query_all_orchestrators(self, ip_addresses: List[str]) -> Tuple[List[Dict], Dict]:
+    def _create_timeout_response(self, ip: str) -> Dict:
+        """Create the result for an orchestrator that did not answer before the cycle deadline."""
+        metrics.inc(QUERY_RESULTS, (('ip', ip), ('result', 'timeout')))
+        response = self._create_error_response(
+            ip, f"Timeout: no response within the {self.cycle_deadline:g}s polling deadline")
+        response["state"] = "Timeout"
+        return response
+    
+    def query_all_orchestrators(self, ip_addresses: List[str],
+                                min_online: int = MIN_ONLINE_FOR_BRIDGE) -> Tuple[List[Dict], Dict]:
         """
         Query all orchestrators concurrently.
         
         Args:
             ip_addresses: List of orchestrator IP addresses
+            min_online: Orchestrators that must be online for the bridge to be online
             
         Returns:
             Tuple of (orchestrator_results, summary_stats)
         """
-        results = []
         start_time = time.time()
+        deadline = time.monotonic() + self.cycle_deadline if self.cycle_deadline > 0 else None
         
-        # Process in batches to avoid overwhelming the orchestrators
-        batch_size = self.max_workers
-        for i in range(0, len(ip_addresses), batch_size):
-            batch = ip_addresses[i:i + batch_size]
-            
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Submit batch tasks
-                future_to_ip = {
-                    executor.submit(self.query_single_orchestrator, ip): ip 
-                    for ip in batch
-                }
-                
-                # Collect results as they complete
-                for future in as_completed(future_to_ip):
-                    ip = future_to_ip[future]
-                    try:
-                        result = future.result()
-                        results.append(result)
-                    except Exception as e:
-                        logger.error(f"Failed to query orchestrator {ip}: {e}")
-                        results.append(self._create_error_response(ip, str(e)))
-            
-            # Small delay between batches to avoid rate limiting
-            if i + batch_size < len(ip_addresses):
-                time.sleep(0.2)
+        if self.async_engine is not None:
+            results = self.async_engine.query_all(ip_addresses, deadline)
+        else:
+            results = self._query_all_threaded(ip_addresses, deadline)
+        
+        for result in results:
+            result['circuit'] = self.circuit_breaker.describe(result['ip'])
+        metrics.observe(CYCLE_DURATION, (), time.time() - start_time)
+        
+        return results, self.build_summary(results, start_time, min_online)
+    
+    def _query_all_threaded(self, ip_addresses: List[str], deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Query orchestrators on a pool of max_workers threads.
+        
+        Queries still running at the deadline are not waited for. Their requests
+        time out by the deadline (see request_timeout), so each holds its worker
+        for at most one more request per remaining retry, and an orchestrator
+        whose previous query has not returned yet is reported as timed out
+        rather than queued again: the pool never holds more than one query per
+        orchestrator.
+        
+        Args:
+            ip_addresses: List of orchestrator IP addresses
+            deadline: time.monotonic() value after which pending orchestrators are reported as timed out
+        """
+        if self._query_executor is None:
+            self._query_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="orchestrator-query"
+            )
+        
+        results = []
+        future_to_ip = {}
+        for ip in ip_addresses:
+            with self._in_flight_lock:
+                busy = ip in self._in_flight
+                if not busy:
+                    self._in_flight.add(ip)
+            if busy:
+                logger.warning(f"Orchestrator {ip} is still answering the previous cycle, skipping it")
+                results.append(self._create_timeout_response(ip))
+                continue
+            if deadline is None:
+                self._deadlines.pop(ip, None)
+            else:
+                self._deadlines[ip] = deadline
+            future_to_ip[self._query_executor.submit(self._query_tracked, ip)] = ip
         
+        pending = dict(future_to_ip)
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            # Collect results as they complete
+            for future in as_completed(future_to_ip, timeout=timeout):
+                ip = pending.pop(future)
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Failed to query orchestrator {ip}: {e}")
+                    results.append(self._create_error_response(ip, str(e)))
+        except FuturesTimeoutError:
+            # Stragglers finish in the background; their results are not waited for
+            for future, ip in pending.items():
+                if future.cancel():
+                    self._release(ip)
+                results.append(self._create_timeout_response(ip))
+        
+        return results
+    
+    def _query_tracked(self, ip: str) -> Dict:
+        """Query an orchestrator on a pool thread, marking it idle again once the query returns."""
+        try:
+            return self.query_single_orchestrator(ip)
+        finally:
+            self._release(ip)
+    
+    def _release(self, ip: str):
+        with self._in_flight_lock:
+            self._in_flight.discard(ip)
+    
+    def build_summary(self, results: List[Dict], start_time: float,
+                      min_online: int = MIN_ONLINE_FOR_BRIDGE) -> Dict:
+        """Sort results in place and compute the summary statistics for a query cycle."""
         # Sort results by pillar name
         results.sort(key=lambda x: x['pillar_name'].lower())
         
         # Calculate summary statistics
         elapsed_time = time.time() - start_time
         online_count = sum(1 for r in results if r['status'] == 'online')
-        bridge_status = 'online' if online_count >= MIN_ONLINE_FOR_BRIDGE else 'offline'
+        bridge_status = 'online' if online_count >= min_online else 'offline'
         
         summary = {
             'timestamp': datetime.now().isoformat(),
@@ -289,8 +771,20 @@ class OrchestratorClient:
             'query_time_seconds': round(elapsed_time, 2)
         }
         
-        return results, summary
+        return summary
     
     def close(self):
-        """Close the HTTP session."""
-        self.session.close()
\ No newline at end of file
+        """Close the HTTP session, the async engine's connections and the worker threads."""
+        if self.async_engine is not None:
+            self.async_engine.close()
+        if self._query_executor is not None:
+            self._query_executor.shutdown(wait=False)
+            self._query_executor = None
+        if self._rpc_executor is not None:
+            self._rpc_executor.shutdown(wait=False)
+            self._rpc_executor = None
+        self.session.close()
+
+
+class BatchNotSupportedError(Exception):
+    """Raised when an orchestrator does not accept JSON-RPC batch requests."""
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Orchestrator registry: the set of orchestrators to poll.
+Loaded once per process from ORCHESTRATOR_REGISTRY_FILE (YAML, JSON or CSV)
+when set, otherwise from the ORCHESTRATOR_IP_<n> environment variables or,
+if there are none, from PILLAR_MAPPING. IPs are validated once at load.
+The registry file is re-checked at most every reload interval and reloaded
+when it changes, so orchestrators can be added or removed without a restart;
+listeners receive the added and removed IPs. Entries may also override where
+an orchestrator is reached (host, port, scheme, tls_verify; see
+app.services.endpoints).
+"""
+import csv
+import ipaddress
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.endpoints import parse_endpoint_overrides
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+Mapping = Dict[str, Dict]
+
+PARSE_ERRORS = (OSError, ValueError, csv.Error) + ((yaml.YAMLError,) if yaml is not None else ())
+
+
+class RegistryError(Exception):
+    """Raised when a registry file cannot be read or parsed."""
+
+
+def _entries(data) -> List[Dict]:
+    """Normalize the supported document layouts to a list of {ip, name, pubkey} dicts."""
+    if isinstance(data, dict) and 'orchestrators' in data:
+        data = data['orchestrators']
+    if isinstance(data, dict):
+        # {"1.2.3.4": {"name": ..., "pubkey": ...}} like PILLAR_MAPPING
+        return [dict(info or {}, ip=ip) for ip, info in data.items()]
+    if isinstance(data, list):
+        return [{'ip': entry} if isinstance(entry, str) else entry for entry in data]
+    raise RegistryError("expected a list of orchestrators or a mapping of IP to pillar info")
+
+
+def read_registry_file(path: str) -> List[Dict]:
+    """
+    Read the entries of a registry file.
+
+    YAML and JSON files hold a list of orchestrators (IP strings or objects with
+    ip, name and pubkey), optionally under an "orchestrators" key, or a mapping of
+    IP to {name, pubkey}. CSV files have an ip column and optional name and pubkey
+    columns. Entries of any format may add host, port, scheme and tls_verify.
+
+    Args:
+        path: Registry file, format chosen by extension (.yaml/.yml, .json, .csv)
+
+    Returns:
+        List of entry dicts with at least an 'ip' key
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, newline='') as f:
+            if extension == '.csv':
+                rows = (line for line in f if line.strip() and not line.lstrip().startswith('#'))
+                return [{key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+                        for row in csv.DictReader(rows)]
+            if extension in ('.yaml', '.yml'):
+                if yaml is None:
+                    raise RegistryError("the pyyaml package is required for YAML registry files")
+                return _entries(yaml.safe_load(f) or [])
+            if extension == '.json':
+                return _entries(json.load(f))
+    except PARSE_ERRORS as e:
+        raise RegistryError(str(e)) from e
+    raise RegistryError(f"unsupported registry file type '{extension}' (use .yaml, .json or .csv)")
+
+
+def validate_entries(entries: List[Dict], pillar_mapping: Mapping) -> Tuple[List[str], Mapping, Mapping]:
+    """
+    Validate registry entries and merge their pillar info over PILLAR_MAPPING.
+
+    Invalid and duplicate IPs, and entries with an invalid endpoint override,
+    are logged and skipped. Entries without a name keep the PILLAR_MAPPING info
+    of their IP, if any.
+
+    Returns:
+        (IPs in registry order, pillar mapping, endpoint overrides by IP)
+    """
+    ips = []
+    seen = set()
+    mapping = dict(pillar_mapping)
+    endpoints = {}
+    for entry in entries:
+        ip = str(entry.get('ip', '')).strip() if isinstance(entry, dict) else ''
+        try:
+            ipaddress.ip_address(ip)
+            overrides = parse_endpoint_overrides(entry)
+        except ValueError:
+            logger.warning(f"Invalid orchestrator entry in registry: {entry}")
+            continue
+        if ip in seen:
+            logger.warning(f"Duplicate orchestrator IP in registry: {ip}")
+            continue
+        seen.add(ip)
+        ips.append(ip)
+        if entry.get('name'):
+            mapping[ip] = {'name': str(entry['name']), 'pubkey': str(entry.get('pubkey') or '')}
+        if overrides:
+            endpoints[ip] = overrides
+    return ips, mapping, endpoints
+
+
+def validate_ips(ips: List[str]) -> List[str]:
+    """Return the valid IP addresses of a list, logging the others."""
+    valid_ips = []
+    for ip in ips:
+        try:
+            ipaddress.ip_address(ip)
+            valid_ips.append(ip)
+        except ValueError:
+            logger.warning(f"Invalid IP address in configuration: {ip}")
+    return valid_ips
+
+
+class OrchestratorRegistry:
+    """Thread-safe orchestrator list with change detection on the registry file."""
+
+    def __init__(self, path: Optional[str], default_ips: List[str], pillar_mapping: Mapping,
+                 reload_interval: float = 10, clock=time.monotonic):
+        """
+        Initialize the registry and load it.
+
+        Args:
+            path: Registry file, None to use default_ips (or the PILLAR_MAPPING IPs if empty)
+            default_ips: Validated IPs from the environment
+            pillar_mapping: Static IP to {name, pubkey} mapping from config/orchestrator_mapping.py
+            reload_interval: Minimum seconds between registry file change checks (0 disables reloading)
+            clock: Monotonic time source
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.clock = clock
+        self.version = 0
+        self.listeners: List[Callable[[List[str], List[str]], None]] = []
+        self._default_ips = default_ips or list(pillar_mapping)
+        self._pillar_mapping = dict(pillar_mapping)
+        self._ips: List[str] = []
+        self._mapping: Mapping = self._pillar_mapping
+        self._endpoints: Mapping = {}
+        self._file_signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def ips(self) -> List[str]:
+        """Orchestrator IPs in registry order (reloaded first if the file changed)."""
+        self.refresh()
+        return self._ips
+
+    @property
+    def mapping(self) -> Mapping:
+        """IP to {name, pubkey} pillar info: PILLAR_MAPPING plus registry file names."""
+        self.refresh()
+        return self._mapping
+
+    @property
+    def endpoints(self) -> Mapping:
+        """IP to endpoint overrides (host, port, scheme, tls_verify) from the registry file."""
+        self.refresh()
+        return self._endpoints
+
+    def add_listener(self, callback: Callable[[List[str], List[str]], None]):
+        """Register a callback(added, removed) to run after the registry changes."""
+        self.listeners.append(callback)
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _load(self):
+        if not self.path:
+            self._ips = list(self._default_ips)
+            return
+        try:
+            # Remembered even if parsing fails, so a broken file is only re-read once it changes
+            self._file_signature = self._signature()
+            ips, mapping, endpoints = validate_entries(read_registry_file(self.path), self._pillar_mapping)
+        except (OSError, RegistryError) as e:
+            logger.error(f"Failed to load orchestrator registry {self.path}: {e}")
+            return
+        self._ips, self._mapping, self._endpoints = ips, mapping, endpoints
+        logger.info(f"Loaded {len(ips)} orchestrators from {self.path}")
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the registry file if it changed since the last load.
+
+        Checks at most once per reload interval unless forced. A file that
+        cannot be parsed keeps the previous orchestrators.
+
+        Returns:
+            True if the set of orchestrators, their pillar info or their endpoints changed
+        """
+        if not self.path or (not force and (self.reload_interval <= 0 or self.clock() < self._next_check)):
+            return False
+        with self._lock:
+            if not force and self.clock() < self._next_check:
+                return False
+            self._next_check = self.clock() + self.reload_interval
+            try:
+                if self._signature() == self._file_signature:
+                    return False
+            except OSError as e:
+                logger.warning(f"Cannot stat orchestrator registry {self.path}: {e}")
+                return False
+
+            old_ips, old_mapping, old_endpoints = self._ips, self._mapping, self._endpoints
+            self._load()
+            if self._ips == old_ips and self._mapping == old_mapping and self._endpoints == old_endpoints:
+                return False
+            old, new = set(old_ips), set(self._ips)
+            added = [ip for ip in self._ips if ip not in old]
+            removed = [ip for ip in old_ips if ip not in new]
+            self.version += 1
+
+        logger.info(f"Orchestrator registry changed: {len(added)} added, {len(removed)} removed, "
+                    f"{len(self._ips)} total")
+        for callback in self.listeners:
+            try:
+                callback(added, removed)
+            except Exception as e:
+                logger.error(f"Error in registry listener: {e}")
+        return True
+
+
+_registry: Optional[OrchestratorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> OrchestratorRegistry:
+    """Return the process-wide registry, loading it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                from config.settings import Config
+                from app.services import orchestrator_client
+
+                registry = OrchestratorRegistry(
+                    Config.ORCHESTRATOR_REGISTRY_FILE or None,
+                    Config.get_env_orchestrator_ips(),
+                    orchestrator_client.PILLAR_MAPPING,
+                    Config.REGISTRY_RELOAD_INTERVAL
+                )
+                # Pillar names and pubkeys from the registry file feed /api/pillars and name checks
+                orchestrator_client.set_pillar_mapping(registry.mapping)
+                registry.add_listener(lambda added, removed: orchestrator_client.set_pillar_mapping(registry.mapping))
+                _registry = registry
+    return _registry
@@ -0,0 +1,174 @@
+"""
+Adaptive per-orchestrator polling schedule.
+Each orchestrator has its own next-due time in a priority queue:
+- nodes whose state changed recently, or that have wraps/unwraps waiting to
+  be signed, are polled at the fast interval;
+- stable nodes are polled at the base interval;
+- unreachable nodes back off exponentially (with jitter) up to a maximum.
+Initial due times are staggered across the base interval so polls are spread
+evenly instead of arriving in one burst.
+"""
+import heapq
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+JITTER = 0.1  # +/- fraction applied to every interval so nodes do not re-synchronize
+
+
+class NodeSchedule:
+    """Polling state of one orchestrator."""
+
+    __slots__ = ('ip', 'next_due', 'interval', 'failures', 'state', 'changed_at')
+
+    def __init__(self, ip: str, next_due: float):
+        self.ip = ip
+        self.next_due = next_due
+        self.interval: Optional[float] = None
+        self.failures = 0
+        self.state: Optional[Tuple] = None
+        self.changed_at: Optional[float] = None
+
+
+class PollScheduler:
+    """Priority queue of orchestrators keyed by their next-due time."""
+
+    def __init__(self, base_interval: float, fast_interval: float, max_backoff: float,
+                 hot_seconds: float, clock=time.monotonic, rng: Optional[random.Random] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            base_interval: Seconds between polls of a stable node
+            fast_interval: Seconds between polls of a node that changed recently or has pending work
+            max_backoff: Maximum seconds between polls of an unreachable node
+            hot_seconds: How long a node stays on the fast interval after a state change
+            clock: Monotonic time source
+            rng: Random source for jitter
+        """
+        self.base_interval = base_interval
+        self.fast_interval = min(fast_interval, base_interval)
+        self.max_backoff = max(max_backoff, base_interval)
+        self.hot_seconds = hot_seconds
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.nodes: Dict[str, NodeSchedule] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _push(self, node: NodeSchedule):
+        self._seq += 1
+        heapq.heappush(self._heap, (node.next_due, self._seq, node.ip))
+
+    def set_ips(self, ips: Iterable[str], stagger: bool = True):
+        """
+        Track exactly these orchestrators.
+
+        New nodes are staggered evenly over the next base interval (the last
+        one is due a full interval from now), or due immediately without
+        stagger; removed nodes are dropped lazily from the queue.
+        """
+        with self._lock:
+            ips = list(dict.fromkeys(ips))
+            new_ips = [ip for ip in ips if ip not in self.nodes]
+            for ip in set(self.nodes) - set(ips):
+                del self.nodes[ip]
+
+            now = self.clock()
+            for index, ip in enumerate(new_ips):
+                offset = self.base_interval * (index + 1) / len(new_ips) if stagger else 0.0
+                node = NodeSchedule(ip, now + offset)
+                self.nodes[ip] = node
+                self._push(node)
+
+    def pop_due(self, horizon: float = 0.0) -> List[str]:
+        """
+        Remove and return the orchestrators due within `horizon` seconds.
+
+        They stay unscheduled until record() (or defer()) is called for them.
+        """
+        with self._lock:
+            limit = self.clock() + horizon
+            due = []
+            while self._heap and self._heap[0][0] <= limit:
+                next_due, _, ip = heapq.heappop(self._heap)
+                node = self.nodes.get(ip)
+                # Skip entries of removed nodes and stale entries of rescheduled ones
+                if node is not None and node.next_due == next_due:
+                    due.append(ip)
+            return due
+
+    def seconds_until_due(self) -> float:
+        """Seconds until the next orchestrator is due (base interval if none is scheduled)."""
+        with self._lock:
+            while self._heap:
+                next_due, _, ip = self._heap[0]
+                node = self.nodes.get(ip)
+                if node is not None and node.next_due == next_due:
+                    return max(0.0, next_due - self.clock())
+                heapq.heappop(self._heap)
+            return self.base_interval
+
+    def _jittered(self, interval: float) -> float:
+        return interval * self.rng.uniform(1 - JITTER, 1 + JITTER)
+
+    def record(self, result: Dict):
+        """
+        Schedule the next poll of an orchestrator from its latest result.
+
+        Args:
+            result: Orchestrator entry as produced by OrchestratorClient
+        """
+        with self._lock:
+            node = self.nodes.get(result.get('ip'))
+            if node is None:
+                return
+            now = self.clock()
+
+            unreachable = result.get('state_num') is None and bool(result.get('error'))
+            state = None if unreachable else (result.get('status'), result.get('state_num'))
+            # Going down or coming back counts as a change too; the first poll does not
+            if node.interval is not None and state != node.state:
+                node.changed_at = now
+            node.state = state
+
+            if unreachable:
+                # Back off exponentially, with full jitter above the base interval
+                node.failures += 1
+                ceiling = min(self.max_backoff, self.base_interval * 2 ** (node.failures - 1))
+                interval = self.rng.uniform(self.base_interval, ceiling)
+            else:
+                node.failures = 0
+                stats = result.get('network_stats') or {}
+                pending = any(network.get('wraps') or network.get('unwraps') for network in stats.values())
+                recently_changed = node.changed_at is not None and now - node.changed_at < self.hot_seconds
+                interval = self._jittered(self.fast_interval if pending or recently_changed else self.base_interval)
+
+            node.interval = interval
+            node.next_due = now + interval
+            self._push(node)
+
+    def defer(self, ips: Iterable[str], delay: float):
+        """Reschedule orchestrators whose poll could not run (e.g. the update failed)."""
+        with self._lock:
+            due = self.clock() + delay
+            for ip in ips:
+                node = self.nodes.get(ip)
+                if node is not None:
+                    node.next_due = due
+                    self._push(node)
+
+    def stats(self) -> Dict:
+        """Summarize the current schedule (for logging)."""
+        with self._lock:
+            intervals = [node.interval for node in self.nodes.values() if node.interval is not None]
+            return {
+                'nodes': len(self.nodes),
+                'fast': sum(1 for node in self.nodes.values()
+                            if node.interval is not None and node.failures == 0
+                            and node.interval < self.base_interval * (1 - JITTER)),
+                'backing_off': sum(1 for node in self.nodes.values() if node.failures),
+                'polls_per_minute': round(sum(60 / interval for interval in intervals if interval > 0), 1)
+            }
@@ -0,0 +1,96 @@
+"""
+Supervisor for the dedicated poller process.
+Runs in the Gunicorn master: spawns `python -m app.poller`, restarts it with
+exponential backoff whenever it exits, and stops it when the master shuts down.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class PollerSupervisor:
+    """Keeps exactly one poller process running."""
+
+    def __init__(self, command: Optional[List[str]] = None, cwd: Optional[str] = None,
+                 min_backoff: float = 1.0, max_backoff: float = 60.0,
+                 log: Callable[[str], None] = print, on_exit: Optional[Callable[[int], None]] = None):
+        """
+        Initialize the supervisor.
+
+        Args:
+            command: Command line of the poller process
+            cwd: Working directory for the poller (where .env and data/ live),
+                defaults to the master's working directory
+            min_backoff: Initial delay before restarting a poller that exited
+            max_backoff: Maximum restart delay
+            log: Function used to report lifecycle events
+            on_exit: Called with the pid of a poller that exited, before it is restarted
+        """
+        self.command = command or [sys.executable, '-m', 'app.poller']
+        self.cwd = cwd or os.getcwd()
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.log = log
+        self.on_exit = on_exit
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Spawn the poller and start monitoring it."""
+        self._stop_event.clear()
+        self._spawn()
+        self._thread = threading.Thread(target=self._monitor, name='poller-supervisor', daemon=True)
+        self._thread.start()
+
+    def _spawn(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get('PYTHONPATH')]))
+        self.process = subprocess.Popen(self.command, cwd=self.cwd, env=env)
+        self.log(f"Poller process started (pid {self.process.pid})")
+
+    def _monitor(self):
+        """Restart the poller whenever it exits, backing off if it keeps crashing."""
+        backoff = self.min_backoff
+        started_at = time.monotonic()
+
+        while not self._stop_event.wait(1.0):
+            returncode = self.process.poll()
+            if returncode is None:
+                # Reset the backoff once the poller has been stable for a while
+                if time.monotonic() - started_at > self.max_backoff:
+                    backoff = self.min_backoff
+                continue
+
+            # The Gunicorn master may reap the child first, so the exit code is not reliable
+            self.log(f"Poller process {self.process.pid} exited, restarting in {backoff:.0f}s")
+            if self.on_exit is not None:
+                self.on_exit(self.process.pid)
+            if self._stop_event.wait(backoff):
+                break
+            self._spawn()
+            self.restarts += 1
+            started_at = time.monotonic()
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop monitoring and terminate the poller."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.log(f"Poller process {self.process.pid} did not stop, killing it")
+                self.process.kill()
+                self.process.wait()
+            self.log("Poller process stopped")
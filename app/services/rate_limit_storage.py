@@ -0,0 +1,237 @@
+"""
+Shared-memory rate limit storage for Flask-Limiter.
+Every Gunicorn worker maps the same fixed-size table (a file on /dev/shm), so
+limits are enforced across the whole deployment instead of once per worker.
+Each limiter key hashes to a short run of slots; a slot holds the key's
+sliding-window counters (current and previous window) and its last access
+time. When every slot in the run is taken the least recently used one is
+evicted, so memory stays bounded however many client IPs are seen, and every
+operation touches at most PROBE_SLOTS slots.
+
+Registered with the `limits` package as the `shm://` storage scheme:
+
+    Limiter(storage_uri='shm:///dev/shm/bridge-health-ratelimit?slots=65536',
+            strategy='sliding-window-counter')
+
+Supports the sliding-window-counter and fixed-window strategies.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from math import floor
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+
+DEFAULT_SLOTS = 65536
+PROBE_SLOTS = 8  # Slots searched per key; the least recently used one is evicted when all are taken
+
+# Slot: key hash (0 = empty), window number, current count, previous count, last access, fixed-window expiry
+SLOT = struct.Struct('<QQIIdd')
+
+
+def key_hash(key: str) -> int:
+    """64-bit hash of a limiter key (never 0, which marks an empty slot)."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+
+class SharedMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """Rate limit counters in a memory-mapped table shared by all processes on the host."""
+
+    STORAGE_SCHEME = ['shm']
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        """
+        Initialize the storage, creating the table file if needed.
+
+        Args:
+            uri: shm://<path>[?slots=N]
+            wrap_exceptions: Wrap OSErrors in limits.errors.StorageError
+            options: slots (overrides the URI)
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        parts = urlsplit(uri or 'shm:///dev/shm/bridge-health-ratelimit')
+        self.path = parts.path
+        self.slots = int(options.get('slots') or parse_qs(parts.query).get('slots', [DEFAULT_SLOTS])[0])
+        self._pid = None
+        self._fd = None
+        self._mm = None
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        """Map the table (again after a fork: flock locks are shared by inherited descriptors)."""
+        size = self.slots * SLOT.size
+        if self._mm is not None:
+            self._mm.close()
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != size:
+                # New table, or one created with a different size: start empty
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mm = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self._pid = os.getpid()
+
+    @property
+    def base_exceptions(self):
+        return OSError
+
+    def _locked(self):
+        if self._pid != os.getpid():
+            self._open()
+        return _TableLock(self._lock, self._fd)
+
+    def _find(self, key: str, create: bool) -> Tuple[int, Optional[list]]:
+        """
+        Find the slot of a key (call with the table locked).
+
+        Returns:
+            (offset, slot fields), fields None if the key has no slot and create is False
+        """
+        wanted = key_hash(key)
+        start = wanted % self.slots
+        victim, victim_access = None, None
+        for probe in range(PROBE_SLOTS):
+            offset = ((start + probe) % self.slots) * SLOT.size
+            fields = list(SLOT.unpack_from(self._mm, offset))
+            if fields[0] == wanted:
+                return offset, fields
+            if victim_access is None or fields[4] < victim_access:
+                victim, victim_access = offset, fields[4]  # Empty slots have last access 0
+        if not create:
+            return victim, None
+        return victim, [wanted, 0, 0, 0, 0.0, 0.0]
+
+    def _write(self, offset: int, fields: list, now: float):
+        fields[4] = now
+        SLOT.pack_into(self._mm, offset, *fields)
+
+    @staticmethod
+    def _roll(fields: list, window: int):
+        """Advance a slot's sliding-window counters to the given window."""
+        if fields[1] == window:
+            return
+        fields[3] = fields[2] if fields[1] == window - 1 else 0
+        fields[2] = 0
+        fields[1] = window
+
+    @staticmethod
+    def _window_info(fields: Optional[list], expiry: int, now: float) -> Tuple[int, float, int, float]:
+        previous_count, current_count = (fields[3], fields[2]) if fields else (0, 0)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    # Sliding window counter strategy
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        window = int(now / expiry)
+        with self._locked():
+            offset, fields = self._find(key, create=True)
+            self._roll(fields, window)
+            previous_count, previous_ttl, current_count, _ = self._window_info(fields, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                self._write(offset, fields, now)
+                return False
+            fields[2] += amount
+            self._write(offset, fields, now)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        now = time.time()
+        with self._locked():
+            _, fields = self._find(key, create=False)
+        if fields is not None:
+            self._roll(fields, int(now / expiry))
+        return self._window_info(fields, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
+
+    # Fixed window strategy
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._locked():
+            offset, fields = self._find(key, create=True)
+            if fields[5] <= now:
+                fields[2], fields[5] = 0, now + expiry
+            fields[2] += amount
+            self._write(offset, fields, now)
+            return fields[2]
+
+    def get(self, key: str) -> int:
+        with self._locked():
+            _, fields = self._find(key, create=False)
+        return fields[2] if fields is not None and fields[5] > time.time() else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._locked():
+            _, fields = self._find(key, create=False)
+        return fields[5] if fields is not None and fields[5] > 0 else time.time()
+
+    def clear(self, key: str) -> None:
+        with self._locked():
+            offset, fields = self._find(key, create=False)
+            if fields is not None:
+                SLOT.pack_into(self._mm, offset, 0, 0, 0, 0, 0.0, 0.0)
+
+    def check(self) -> bool:
+        return self._mm is not None and not self._mm.closed
+
+    def reset(self) -> Optional[int]:
+        with self._locked():
+            used = sum(1 for offset in range(0, len(self._mm), SLOT.size)
+                       if SLOT.unpack_from(self._mm, offset)[0])
+            self._mm[:] = bytes(len(self._mm))
+        return used
+
+
+def limiter_storage_uri(config) -> str:
+    """
+    Build the Flask-Limiter storage URI for the configured RATE_LIMIT_STORAGE.
+
+    'shm' shares counters between the workers of one host, 'redis' between all
+    instances using the REDIS_* server, and 'memory' keeps them per worker.
+    """
+    if config.RATE_LIMIT_STORAGE == 'redis':
+        password = f":{quote(config.REDIS_PASSWORD, safe='')}@" if config.REDIS_PASSWORD else ''
+        return f"redis://{password}{config.REDIS_HOST}:{config.REDIS_PORT}/{config.REDIS_DB}"
+    if config.RATE_LIMIT_STORAGE == 'shm':
+        return f"shm://{os.path.abspath(config.RATE_LIMIT_SHM_PATH)}?slots={config.RATE_LIMIT_SLOTS}"
+    return 'memory://'
+
+
+class _TableLock:
+    """Thread lock plus an exclusive flock, serializing table access across threads and processes."""
+
+    def __init__(self, lock: threading.Lock, fd: int):
+        self.lock = lock
+        self.fd = fd
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        except BaseException:
+            self.lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            self.lock.release()
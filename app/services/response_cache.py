@@ -0,0 +1,100 @@
+"""
+Pre-serialized API response bodies.
+Each status snapshot is rendered to bytes once per endpoint (plus gzip and,
+when available, brotli variants) with a strong ETag derived from the body,
+so API requests only pick a variant and copy bytes.
+"""
+import gzip
+import hashlib
+import json
+import time
+from datetime import datetime
+from email.utils import formatdate
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+
+
+class RenderedResponse:
+    """A JSON response body rendered once, with compressed variants and validators."""
+
+    def __init__(self, body: bytes, etag: str, last_modified: float,
+                 variants: Optional[Dict[str, bytes]] = None):
+        """
+        Initialize the rendered response.
+
+        Args:
+            body: Uncompressed JSON body
+            etag: Opaque strong ETag value (without quotes)
+            last_modified: Unix timestamp of the snapshot the body was rendered from
+            variants: Compressed variants rendered elsewhere (e.g. loaded from Redis);
+                computed from the body when omitted
+        """
+        self.body = body
+        self.etag = etag
+        self.last_modified = int(last_modified)
+        self.last_modified_http = formatdate(self.last_modified, usegmt=True)
+        self.variants: Dict[str, bytes] = {}
+
+        if variants is not None:
+            self.variants = dict(variants)
+        elif len(body) >= MIN_COMPRESS_SIZE:
+            self.variants['gzip'] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    def select(self, accept_encodings) -> Tuple[bytes, Optional[str], str]:
+        """
+        Pick the best variant for a client.
+
+        Args:
+            accept_encodings: Werkzeug Accept object for the Accept-Encoding header
+
+        Returns:
+            Tuple of (body, content encoding or None, ETag for that variant)
+        """
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return self.variants[encoding], encoding, f"{self.etag}-{encoding}"
+        return self.body, None, self.etag
+
+    def matches_etag(self, etags) -> bool:
+        """Return True if an If-None-Match header matches any variant of this body."""
+        return (etags.star_tag or
+                etags.contains(self.etag) or
+                any(etags.contains(f"{self.etag}-{encoding}") for encoding in self.variants))
+
+
+def snapshot_time(data: Dict, default: Optional[float] = None) -> float:
+    """Return the snapshot's 'timestamp' field as a Unix timestamp."""
+    try:
+        return datetime.fromisoformat(data['timestamp']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return default if default is not None else time.time()
+
+
+def render_json(name: str, payload: Dict, last_modified: float) -> RenderedResponse:
+    """
+    Serialize an API payload once.
+
+    Args:
+        name: Endpoint name, mixed into the ETag so each endpoint has its own validator
+        payload: Response payload to serialize
+        last_modified: Unix timestamp used for Last-Modified
+
+    Returns:
+        RenderedResponse holding the body and its variants
+    """
+    # Matches Flask's jsonify output (sorted keys, compact separators, trailing newline)
+    body = (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+    # Derived from the body, so a changed payload (e.g. a new API version) never reuses a validator
+    etag = hashlib.sha1(name.encode('utf-8') + b':' + body).hexdigest()[:24]
+    return RenderedResponse(body, etag, last_modified)
@@ -0,0 +1,262 @@
+"""
+Shared-memory publishing of status snapshots across Gunicorn workers.
+The updater writes each serialized snapshot into a memory-mapped, versioned
+segment (double-buffered and guarded by a seqlock). Workers map the segment
+once and only check an 8-byte version counter per request; the payload is
+copied out and parsed once per update, with no file open, stat or lock on
+the request path.
+
+Layout: a 128-byte header followed by two payload slots of `capacity` bytes.
+"""
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b'BHSNAP01'
+HEADER_SIZE = 128
+INITIAL_CAPACITY = 256 * 1024
+READ_RETRIES = 100
+ATTACH_INTERVAL = 1.0  # Seconds between attempts to map a segment that does not exist yet
+
+# Header field offsets
+OFF_MAGIC = 0
+OFF_SEQ = 8  # u64, odd while the header is being changed
+OFF_VERSION = 16  # u64, incremented on every publish
+OFF_ACTIVE = 24  # u32, slot holding the current payload
+OFF_LENGTHS = 32  # 2 x u64, payload length per slot
+OFF_CAPACITY = 48  # u64, size of each slot
+OFF_PUBLISHED_AT = 56  # f64, Unix time of the last publish
+OFF_HEARTBEAT = 64  # f64, Unix time the writer last reported liveness
+
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+F64 = struct.Struct('<d')
+
+
+class SharedSnapshotWriter:
+    """Publishes serialized snapshots into the shared segment (single writer)."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the writer, creating or reusing the segment file.
+
+        Args:
+            path: Segment file path, normally on a tmpfs such as /dev/shm
+        """
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._mm = None
+
+        with self._locked():
+            size = os.fstat(self._fd).st_size
+            if size >= HEADER_SIZE:
+                self._map(size)
+                if self._mm[OFF_MAGIC:OFF_MAGIC + 8] == MAGIC:
+                    # Reuse the existing segment so versions keep increasing across restarts
+                    if self._u64(OFF_SEQ) & 1:
+                        self._set_u64(OFF_SEQ, self._u64(OFF_SEQ) + 1)
+                    return
+            self._initialize(INITIAL_CAPACITY)
+
+    def _locked(self):
+        """Serialize writers (there should only ever be one) with an advisory lock."""
+        return _FileLock(self._fd)
+
+    def _map(self, size: int):
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+
+    def _u64(self, offset: int) -> int:
+        return U64.unpack_from(self._mm, offset)[0]
+
+    def _set_u64(self, offset: int, value: int):
+        U64.pack_into(self._mm, offset, value)
+
+    def _initialize(self, capacity: int):
+        """Lay out a fresh, empty segment."""
+        os.ftruncate(self._fd, HEADER_SIZE + 2 * capacity)
+        self._map(HEADER_SIZE + 2 * capacity)
+        self._mm[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self._mm[OFF_MAGIC:OFF_MAGIC + 8] = MAGIC
+        self._set_u64(OFF_CAPACITY, capacity)
+
+    def publish(self, payload: bytes) -> int:
+        """
+        Publish a serialized snapshot.
+
+        Args:
+            payload: Serialized snapshot bytes
+
+        Returns:
+            The new snapshot version
+        """
+        with self._locked():
+            seq = self._u64(OFF_SEQ)
+            version = self._u64(OFF_VERSION) + 1
+            capacity = self._u64(OFF_CAPACITY)
+            length = len(payload)
+
+            if length > capacity:
+                # Grow the segment: slot offsets move, so hold the seqlock for the whole rewrite
+                self._set_u64(OFF_SEQ, seq + 1)
+                capacity = max(length * 2, capacity * 2)
+                os.ftruncate(self._fd, HEADER_SIZE + 2 * capacity)
+                self._map(HEADER_SIZE + 2 * capacity)
+                target = 0
+                self._mm[HEADER_SIZE:HEADER_SIZE + length] = payload
+                self._set_u64(OFF_CAPACITY, capacity)
+            else:
+                # Fill the inactive slot first; readers of the active slot are unaffected
+                target = 1 - U32.unpack_from(self._mm, OFF_ACTIVE)[0]
+                offset = HEADER_SIZE + target * capacity
+                self._mm[offset:offset + length] = payload
+                self._set_u64(OFF_SEQ, seq + 1)
+
+            self._set_u64(OFF_LENGTHS + 8 * target, length)
+            U32.pack_into(self._mm, OFF_ACTIVE, target)
+            self._set_u64(OFF_VERSION, version)
+            F64.pack_into(self._mm, OFF_PUBLISHED_AT, time.time())
+            self._set_u64(OFF_SEQ, seq + 2)
+            return version
+
+    def heartbeat(self):
+        """Record that the writer is alive."""
+        F64.pack_into(self._mm, OFF_HEARTBEAT, time.time())
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        os.close(self._fd)
+
+
+class SharedSnapshotReader:
+    """Lock-free reader of the shared segment."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the reader. The segment is mapped lazily once it exists.
+
+        Args:
+            path: Segment file path
+        """
+        self.path = path
+        self._mm = None
+        self._next_attach = 0.0
+        self._attach_error: Optional[str] = None
+
+    def _attach(self) -> bool:
+        """Map the segment read-only, returning False if it does not exist yet."""
+        self._next_attach = time.monotonic() + ATTACH_INTERVAL
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            self._attach_failed(e)
+            return False
+        try:
+            size = os.fstat(fd).st_size
+            if size < HEADER_SIZE:
+                return False
+            mm = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ)
+        except (OSError, ValueError) as e:
+            # e.g. the file was truncated while the writer created it
+            self._attach_failed(e)
+            return False
+        finally:
+            os.close(fd)
+
+        if mm[OFF_MAGIC:OFF_MAGIC + 8] != MAGIC:
+            mm.close()
+            return False
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mm
+        return True
+
+    def _attach_failed(self, error: Exception):
+        """Report a segment that exists but cannot be mapped (once per distinct error)."""
+        message = str(error)
+        if message != self._attach_error:
+            self._attach_error = message
+            logger.warning(f"Cannot map snapshot segment {self.path}: {message}")
+
+    @property
+    def attached(self) -> bool:
+        if self._mm is not None:
+            return True
+        return time.monotonic() >= self._next_attach and self._attach()
+
+    def version(self) -> int:
+        """Return the current snapshot version (0 if nothing was published yet)."""
+        if not self.attached:
+            return 0
+        return U64.unpack_from(self._mm, OFF_VERSION)[0]
+
+    def heartbeat(self) -> Optional[float]:
+        """Return the writer's last heartbeat time, if any."""
+        if not self.attached:
+            return None
+        value = F64.unpack_from(self._mm, OFF_HEARTBEAT)[0]
+        return value or None
+
+    def read(self) -> Optional[Tuple[int, bytes]]:
+        """
+        Copy out the current payload, retrying while a publish is in progress.
+
+        Returns:
+            Tuple of (version, payload), or None if nothing is available
+        """
+        if not self.attached:
+            return None
+
+        for _ in range(READ_RETRIES):
+            mm = self._mm
+            seq = U64.unpack_from(mm, OFF_SEQ)[0]
+            if seq & 1:
+                time.sleep(0)
+                continue
+
+            version = U64.unpack_from(mm, OFF_VERSION)[0]
+            if version == 0:
+                return None
+            active = U32.unpack_from(mm, OFF_ACTIVE)[0]
+            length = U64.unpack_from(mm, OFF_LENGTHS + 8 * active)[0]
+            capacity = U64.unpack_from(mm, OFF_CAPACITY)[0]
+            offset = HEADER_SIZE + active * capacity
+
+            if offset + length > len(mm):
+                # The writer grew the segment; map the larger file and retry
+                self._attach()
+                continue
+
+            payload = mm[offset:offset + length]
+            if U64.unpack_from(mm, OFF_SEQ)[0] == seq:
+                return version, payload
+
+        logger.warning(f"Could not read a consistent snapshot from {self.path}")
+        return None
+
+
+class _FileLock:
+    """Context manager holding an exclusive flock on a file descriptor."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        return False
@@ -0,0 +1,99 @@
+"""
+Serialization of status snapshots.
+Snapshots are stored as compact JSON by default, or as msgpack when
+SNAPSHOT_FORMAT=msgpack and the optional `msgpack` package is installed
+(smaller and several times faster to encode and parse). Decoding detects the
+format from the payload, so readers cope with either while a deployment
+switches formats.
+"""
+import json
+import logging
+import os
+import tempfile
+from typing import Dict
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+FORMAT_JSON = 'json'
+FORMAT_MSGPACK = 'msgpack'
+FORMATS = (FORMAT_JSON, FORMAT_MSGPACK)
+
+
+def resolve_format(requested: str) -> str:
+    """Return the format to use, falling back to JSON when msgpack is not installed."""
+    if requested == FORMAT_MSGPACK and msgpack is None:
+        logger.warning("SNAPSHOT_FORMAT=msgpack but the msgpack package is not installed, using JSON")
+        return FORMAT_JSON
+    return requested
+
+
+def file_path_for(path: str, fmt: str) -> str:
+    """Return the status file path for a format (msgpack files get a .msgpack extension)."""
+    if fmt == FORMAT_MSGPACK:
+        return os.path.splitext(path)[0] + '.msgpack'
+    return path
+
+
+def encode(data: Dict, fmt: str = FORMAT_JSON) -> bytes:
+    """
+    Serialize a snapshot.
+
+    Args:
+        data: Status data
+        fmt: FORMAT_JSON or FORMAT_MSGPACK
+
+    Returns:
+        Serialized bytes
+    """
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def decode(payload: bytes) -> Dict:
+    """
+    Deserialize a snapshot written in either format.
+
+    Raises:
+        ValueError: If the payload is truncated or not a valid snapshot
+    """
+    if not payload:
+        raise ValueError("Empty snapshot payload")
+    # A JSON object starts with '{' (or whitespace); a msgpack map never does
+    if payload[:1] in (b'{', b' ', b'\n', b'\t', b'\r'):
+        return json.loads(payload)
+    if msgpack is None:
+        raise ValueError("Snapshot is msgpack-encoded but the msgpack package is not installed")
+    data = msgpack.unpackb(payload, raw=False)
+    if not isinstance(data, dict):
+        raise ValueError("Snapshot payload is not a map")
+    return data
+
+
+def write_atomic(path: str, payload: bytes):
+    """
+    Replace a file atomically: readers see either the old or the new content, never a partial write.
+
+    Args:
+        path: Destination path
+        payload: File content
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,287 @@
+"""
+Process-local snapshot store for the orchestrator status file.
+The status file is parsed at most once per update in each process: parsed data
+is cached and keyed by the file's inode, mtime and size, and the file is only
+re-examined after inotify reports a change (or, where inotify is unavailable,
+after a throttled stat poll). When a shared-memory segment is published by the
+updater, it is used instead of the file.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services.shared_snapshot import SharedSnapshotReader
+from app.services.snapshot_codec import decode
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# inotify constants (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class Snapshot:
+    """Parsed status data for one version of the status file, plus views derived from it."""
+
+    def __init__(self, data: Dict, key: Tuple):
+        self.data = data
+        self.key = key
+        self.loaded_at = time.time()
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.RLock()  # Views may be derived from other views
+
+    def derive(self, name: str, builder: Callable[[Dict], Any]) -> Any:
+        """
+        Return a view of this snapshot, building it on first use.
+
+        Args:
+            name: Cache key for the derived view
+            builder: Function computing the view from the snapshot data
+
+        Returns:
+            The cached derived view
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self.data)
+            return self._derived[name]
+
+    def set_derived(self, name: str, value: Any):
+        """Store a view that was built elsewhere (e.g. by the poller of another instance)."""
+        with self._lock:
+            self._derived[name] = value
+
+
+class InotifyWatcher:
+    """Counts change events for one file using Linux inotify on its directory."""
+
+    _libc = None
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.directory = os.path.dirname(self.path)
+        self.filename = os.fsencode(os.path.basename(self.path))
+        self.generation = 0
+        self._fd = None
+
+    @classmethod
+    def _load_libc(cls):
+        """Load libc's inotify functions, or return None if unsupported."""
+        if cls._libc is None:
+            cls._libc = False
+            if sys.platform.startswith('linux'):
+                try:
+                    libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+                    libc.inotify_init1
+                    libc.inotify_add_watch
+                    cls._libc = libc
+                except (OSError, AttributeError):
+                    pass
+        return cls._libc or None
+
+    def start(self) -> bool:
+        """Start watching in a daemon thread. Returns False if inotify is unavailable."""
+        libc = self._load_libc()
+        if libc is None or not os.path.isdir(self.directory):
+            return False
+
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            return False
+        if libc.inotify_add_watch(fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        thread = threading.Thread(target=self._run, name='snapshot-inotify', daemon=True)
+        thread.start()
+        return True
+
+    def _run(self):
+        """Read inotify events and bump the generation for events on the watched file."""
+        while True:
+            try:
+                # Wait in select() first: under gevent workers it yields to other
+                # greenlets, while a bare read would block the whole worker
+                select.select([self._fd], [], [])
+                buffer = os.read(self._fd, 4096)
+            except OSError as e:
+                logger.warning(f"inotify watcher for {self.path} stopped: {e}")
+                self.generation += 1
+                self._fd = None
+                return
+
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(buffer):
+                _, _, _, name_len = EVENT_HEADER.unpack_from(buffer, offset)
+                name_start = offset + EVENT_HEADER.size
+                name = buffer[name_start:name_start + name_len].rstrip(b'\0')
+                if name == self.filename:
+                    self.generation += 1
+                offset = name_start + name_len
+
+    @property
+    def active(self) -> bool:
+        return self._fd is not None
+
+
+class SnapshotStore:
+    """Caches the parsed contents of a status file until the file changes."""
+
+    def __init__(self, path: str, stat_interval: float = 1.0, shared_path: Optional[str] = None):
+        """
+        Initialize the snapshot store.
+
+        Args:
+            path: Path to the status file
+            stat_interval: Minimum seconds between stat checks when inotify is unavailable
+            shared_path: Shared-memory segment to prefer over the file, if any
+        """
+        self.path = path
+        self.shared = SharedSnapshotReader(shared_path) if shared_path else None
+        self.stat_interval = stat_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        self._watcher: Optional[InotifyWatcher] = None
+        self._watcher_pid = None
+        self._seen_generation = -1
+        self._next_stat = 0.0
+
+    def _ensure_watcher(self) -> Optional[InotifyWatcher]:
+        """Start the inotify watcher in this process (threads do not survive fork)."""
+        pid = os.getpid()
+        if self._watcher_pid != pid:
+            self._watcher_pid = pid
+            self._watcher = None
+            self._next_stat = 0.0
+        if self._watcher is not None and not self._watcher.active:
+            self._watcher = None
+        if self._watcher is None and time.monotonic() >= self._next_stat:
+            # Retried on each stat poll, e.g. until the data directory exists
+            watcher = InotifyWatcher(self.path)
+            if watcher.start():
+                self._watcher = watcher
+                self._seen_generation = -1
+        return self._watcher
+
+    def _stat_key(self) -> Optional[Tuple]:
+        """Return the (inode, mtime, size) key of the status file, or None if missing."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def get(self) -> Optional[Snapshot]:
+        """Return the current snapshot, re-parsing the source only if it has changed."""
+        if self.shared is not None:
+            version = self.shared.version()
+            if version:
+                snapshot = self._snapshot
+                if snapshot is not None and snapshot.key == ('shm', version):
+                    return snapshot
+                snapshot = self._get_shared()
+                if snapshot is not None:
+                    return snapshot
+
+        watcher = self._ensure_watcher()
+        snapshot = self._snapshot
+
+        if watcher is not None:
+            generation = watcher.generation
+            if generation == self._seen_generation and snapshot is not None:
+                return snapshot
+        else:
+            now = time.monotonic()
+            if now < self._next_stat and snapshot is not None:
+                return snapshot
+            generation = None
+
+        with self._lock:
+            key = self._stat_key()
+            loaded = True
+            if key is None:
+                self._snapshot = None
+            elif self._snapshot is None or self._snapshot.key != key:
+                loaded = self._load(key)
+
+            # A failed parse is retried on the next call
+            if loaded:
+                if generation is not None:
+                    self._seen_generation = generation
+                else:
+                    self._next_stat = time.monotonic() + self.stat_interval
+            return self._snapshot
+
+    def _get_shared(self) -> Optional[Snapshot]:
+        """Copy and parse the latest snapshot from shared memory."""
+        with self._lock:
+            result = self.shared.read()
+            if result is None:
+                return None
+            version, payload = result
+            if self._snapshot is not None and self._snapshot.key == ('shm', version):
+                return self._snapshot
+            try:
+                data = decode(payload)
+            except ValueError as e:
+                logger.error(f"Error decoding shared snapshot: {e}")
+                return None
+            self._snapshot = Snapshot(data, ('shm', version))
+            return self._snapshot
+
+    def _load(self, key: Tuple) -> bool:
+        """Parse the status file; on a decode error keep the previous snapshot."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = decode(f.read())
+        except FileNotFoundError:
+            self._snapshot = None
+            return True
+        except ValueError as e:
+            logger.error(f"Error decoding status file: {e}")
+            return False
+        self._snapshot = Snapshot(data, key)
+        return True
+
+    def prime(self, data: Dict, key: Optional[Tuple] = None):
+        """Install data this process has just written, so it is not parsed back."""
+        with self._lock:
+            key = key or self._stat_key()
+            if key is not None:
+                self._snapshot = Snapshot(data, key)
+
+
+_stores: Dict[str, SnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_snapshot_store(path: str, stat_interval: float = 1.0,
+                       shared_path: Optional[str] = None) -> SnapshotStore:
+    """Return the process-wide snapshot store for a status file path."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SnapshotStore(path, stat_interval=stat_interval,
+                                                  shared_path=shared_path)
+        return store
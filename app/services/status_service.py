@@ -1,47 +1,164 @@
 """Status service for managing orchestrator data and updates"""
 
-import json
-import os
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from config.settings import Config
-from app.services.orchestrator_client import OrchestratorClient
+from app.services.bridge_analytics import BridgeAnalytics
+from app.services.change_feed import assign_versions, changes_since
+from app.services.endpoints import parse_tls_verify
+from app.services.history_store import HistoryStore
+from app.services.fleets import Fleet, get_fleets, primary_fleet
+from app.services.orchestrator_client import OrchestratorClient, empty_network_stats
+from app.services.orchestrator_registry import OrchestratorRegistry
+from app.services.response_cache import RenderedResponse, render_json, snapshot_time
+from app.services.snapshot_store import Snapshot
+from app.services.storage import StorageBackend, create_storage_backend
+
+API_VERSION = '1.0'
+RENDERED_ENDPOINTS = ('status', 'summary', 'pillars')
+
+
+def create_client() -> OrchestratorClient:
+    """Create an orchestrator client from the configuration."""
+    return OrchestratorClient(
+        timeout=Config.ORCHESTRATOR_TIMEOUT,
+        max_workers=Config.MAX_CONCURRENT_REQUESTS,
+        engine=Config.POLLING_ENGINE,
+        max_concurrency=Config.ASYNC_MAX_CONCURRENCY,
+        per_host_limit=Config.ASYNC_PER_HOST_LIMIT,
+        rpc_mode=Config.ORCHESTRATOR_RPC_MODE,
+        rate_limit=Config.ORCHESTRATOR_RATE_LIMIT,
+        rate_burst=Config.ORCHESTRATOR_RATE_BURST,
+        identity_ttl=Config.IDENTITY_CACHE_TTL,
+        breaker_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+        breaker_reset=Config.CIRCUIT_RESET_SECONDS,
+        breaker_max_reset=Config.CIRCUIT_MAX_RESET_SECONDS,
+        connect_timeout=Config.ORCHESTRATOR_CONNECT_TIMEOUT,
+        adaptive_timeouts=Config.ADAPTIVE_TIMEOUTS,
+        min_timeout=Config.MIN_ORCHESTRATOR_TIMEOUT,
+        timeout_multiplier=Config.TIMEOUT_P95_MULTIPLIER,
+        cycle_deadline=Config.POLL_CYCLE_DEADLINE,
+        port=Config.ORCHESTRATOR_PORT,
+        scheme=Config.ORCHESTRATOR_SCHEME,
+        tls_verify=parse_tls_verify(Config.ORCHESTRATOR_TLS_VERIFY),
+        pool_hosts=Config.ORCHESTRATOR_POOL_HOSTS,
+        keepalive_timeout=Config.ORCHESTRATOR_KEEPALIVE_SECONDS
+    )
+
+
+def create_fleet_services() -> Dict[str, 'StatusService']:
+    """Create a StatusService for every fleet, primary first, all sharing one orchestrator client."""
+    client = create_client()
+    return {name: StatusService(fleet=fleet, client=client) for name, fleet in get_fleets().items()}
 
 
 class StatusService:
     """Service class for managing orchestrator status data."""
     
-    def __init__(self):
-        self.client = OrchestratorClient(
-            timeout=Config.ORCHESTRATOR_TIMEOUT,
-            max_workers=Config.MAX_CONCURRENT_REQUESTS
-        )
-        self.status_file = os.path.join('data', Config.STATUS_FILE)
-        self.orchestrator_ips = Config.get_orchestrator_ips()
+    def __init__(self, storage: Optional[StorageBackend] = None, fleet: Optional[Fleet] = None,
+                 client: Optional[OrchestratorClient] = None):
+        """
+        Initialize the status service.
+        
+        Args:
+            storage: Snapshot storage backend, defaults to the one selected by the configuration
+            fleet: Fleet whose status is managed, defaults to the primary fleet
+            client: Orchestrator client, shared by the services of all fleets (created if None);
+                a client passed in is closed by its owner, not by close()
+        """
+        self.fleet = fleet or primary_fleet()
+        self._owns_client = client is None
+        self.client = client or create_client()
+        self.status_file = self.fleet.data_path(Config.STATUS_FILE)
+        self.storage = storage or create_storage_backend(Config, self.status_file, self.render_all,
+                                                         RENDERED_ENDPOINTS, self.fleet.namespace)
+        self.history: Optional[HistoryStore] = None
+        if Config.HISTORY_ENABLED:
+            self.history = HistoryStore(
+                self.fleet.data_path(Config.HISTORY_DIR),
+                {'1m': Config.HISTORY_1M_SLOTS, '1h': Config.HISTORY_1H_SLOTS, '1d': Config.HISTORY_1D_SLOTS},
+                self.fleet.networks.values()
+            )
+        self.analytics: Optional[BridgeAnalytics] = None  # Created by the first publish (poller only)
+        self._analytics_checked = False
+    
+    @property
+    def registry(self) -> OrchestratorRegistry:
+        return self.fleet.registry
+    
+    @property
+    def orchestrator_ips(self) -> List[str]:
+        """Orchestrators to poll, picking up registry file changes."""
+        return self.registry.ips
+    
+    def get_snapshot(self) -> Optional[Snapshot]:
+        """Get the current status snapshot from the storage backend."""
+        self.registry.refresh()  # Keeps this process's pillar mapping current for /api/pillars
+        return self.storage.get_snapshot()
     
     def load_cached_status(self) -> Optional[Dict]:
-        """Load status from JSON file if it exists."""
-        try:
-            with open(self.status_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return None
-        except json.JSONDecodeError as e:
-            from app.main import get_logger
-            logger = get_logger()
-            logger.error(f"Error decoding status file: {e}")
-            return None
+        """Load status from the current snapshot, if one exists."""
+        snapshot = self.get_snapshot()
+        return snapshot.data if snapshot else None
+    
+    def should_update(self) -> bool:
+        """Return True if this instance should poll (False while another instance holds the Redis lock)."""
+        return self.storage.should_poll()
     
-    def update_status(self) -> Dict:
-        """Update the status of all orchestrators and save to JSON file."""
+    def select_ips(self, ips: Optional[List[str]] = None) -> List[str]:
+        """Return the configured orchestrators among `ips` (all of them when None)."""
+        orchestrator_ips = self.orchestrator_ips
+        if ips is None:
+            return orchestrator_ips
+        configured = set(orchestrator_ips)
+        return [ip for ip in ips if ip in configured]
+    
+    def update_status(self, ips: Optional[List[str]] = None) -> Dict:
+        """
+        Poll orchestrators and publish a new snapshot to the storage backend.
+        
+        Args:
+            ips: Orchestrators to poll (those due under adaptive polling), default all of them.
+                The others keep their result from the current snapshot.
+        """
         from app.main import get_logger
         logger = get_logger()
         
-        logger.info("Starting orchestrator status update cycle...")
+        polled = self.select_ips(ips)
+        log = logger.debug if ips is not None else logger.info
+        log(f"Starting orchestrator status update cycle for {len(polled)} orchestrators...")
+        
+        # Query the orchestrators concurrently
+        start_time = time.time()
+        results, _ = self.client.query_all_orchestrators(polled, self.fleet.min_online)
+        return self.publish_results(results, start_time, polled if ips is not None else None)
+    
+    def publish_results(self, results: List[Dict], start_time: float,
+                        polled: Optional[List[str]] = None) -> Dict:
+        """
+        Publish the results of a polling cycle as a new snapshot.
+        
+        Args:
+            results: Orchestrator results of the cycle
+            start_time: time.time() when the cycle started
+            polled: Orchestrators polled in a partial cycle, None when all of them were.
+                The others keep their result from the current snapshot.
+        """
+        from app.main import get_logger
+        logger = get_logger()
         
-        # Query all orchestrators concurrently
-        results, summary = self.client.query_all_orchestrators(self.orchestrator_ips)
+        partial = polled is not None
+        previous = self.load_cached_status()
+        if partial:
+            # Carry over the latest result of every orchestrator that was not due this cycle
+            latest = {orch['ip']: dict(orch) for orch in (previous or {}).get('orchestrators', [])}
+            latest.update((orch['ip'], orch) for orch in results)
+            merged = [latest[ip] for ip in self.orchestrator_ips if ip in latest]
+        else:
+            merged = results
+        summary = self.client.build_summary(merged, start_time, self.fleet.min_online)
         
         # Prepare the full status data
         status_data = {
@@ -50,96 +167,263 @@ class StatusService:
             'online_count': summary['online_count'],
             'total_count': summary['total_count'],
             'query_time_seconds': summary['query_time_seconds'],
-            'orchestrators': results
+            'orchestrators': merged
         }
         
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+        analytics = self._get_analytics()
+        if analytics is not None:
+            try:
+                status_data['analytics'] = analytics.update(status_data, self.fleet.min_online,
+                                                            self.client.latency.p95, snapshot_time(status_data))
+            except Exception as e:
+                logger.error(f"Failed to compute bridge analytics: {e}")
         
-        # Save to file
-        with open(self.status_file, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        # Version the snapshot and mark the orchestrators that changed since the last one
+        assign_versions(previous, status_data)
         
-        logger.info(f"Orchestrator status update complete. Queried {summary['total_count']} orchestrators in {summary['query_time_seconds']}s")
+        self.storage.publish(status_data)
+        
+        if self.history is not None:
+            try:
+                self.history.record(status_data, snapshot_time(status_data), polled)
+            except Exception as e:
+                logger.error(f"Failed to record status history: {e}")
+        
+        log = logger.debug if partial else logger.info
+        log(f"Orchestrator status update complete. Queried {len(results)} of {summary['total_count']} "
+            f"orchestrators in {summary['query_time_seconds']}s")
         return status_data
     
+    def _get_analytics(self) -> Optional[BridgeAnalytics]:
+        """Return the fleet's analytics stage, creating it on first use (None when disabled or without numpy)."""
+        if not self._analytics_checked:
+            self._analytics_checked = True
+            if Config.ANALYTICS_ENABLED:
+                if BridgeAnalytics.available():
+                    self.analytics = BridgeAnalytics(
+                        self.fleet.networks.values(),
+                        window_seconds=Config.ANALYTICS_WINDOW_SECONDS,
+                        slots=Config.ANALYTICS_WINDOW_SLOTS,
+                        outlier_threshold=Config.ANALYTICS_OUTLIER_THRESHOLD
+                    )
+                else:
+                    from app.main import get_logger
+                    get_logger().warning("ANALYTICS_ENABLED is set but numpy is not installed; "
+                                         "snapshots will not include analytics")
+        return self.analytics
+    
+    def heartbeat(self):
+        """Report that the updater is alive."""
+        self.storage.heartbeat()
+    
+    def get_history(self, limit: int = 100) -> List[Dict]:
+        """Get recent snapshot summaries, newest first (empty with the file backend)."""
+        return self.storage.get_history(limit)
+    
+    def get_poller_status(self) -> Dict:
+        """Get the updater's liveness as seen from this process."""
+        last_heartbeat = self.storage.last_heartbeat()
+        if last_heartbeat is None:
+            return {'alive': False, 'last_heartbeat': None, 'heartbeat_age_seconds': None}
+        
+        age = max(0.0, time.time() - last_heartbeat)
+        return {
+            'alive': age <= Config.POLLER_STALE_SECONDS,
+            'last_heartbeat': datetime.fromtimestamp(last_heartbeat).isoformat(),
+            'heartbeat_age_seconds': round(age, 1)
+        }
+    
+    def get_metric_gauges(self) -> List[Tuple]:
+        """
+        Build the /metrics gauges that describe the current snapshot, labelled with the fleet.
+        
+        Returns:
+            List of (name, help, labels, value) samples
+        """
+        fleet_labels = (('fleet', self.fleet.name),)
+        gauges = []
+        poller = self.get_poller_status()
+        if poller['heartbeat_age_seconds'] is not None:
+            gauges.append(('bridge_health_poller_heartbeat_age_seconds', 'Seconds since the poller last reported',
+                           fleet_labels, poller['heartbeat_age_seconds']))
+        
+        data = self.load_cached_status()
+        if not data:
+            return gauges
+        
+        gauges.append(('bridge_health_snapshot_age_seconds', 'Seconds since the current snapshot was taken',
+                       fleet_labels, round(max(0.0, time.time() - snapshot_time(data)), 3)))
+        gauges.append(('bridge_health_bridge_online', 'Whether enough orchestrators are online for the bridge',
+                       fleet_labels, 1 if data.get('bridge_status') == 'online' else 0))
+        gauges.append(('bridge_health_orchestrators_online', 'Orchestrators online in the current snapshot',
+                       fleet_labels, data.get('online_count', 0)))
+        analytics = data.get('analytics')
+        if analytics:
+            gauges.append(('bridge_health_quorum_margin', 'Online orchestrators above the bridge threshold',
+                           fleet_labels, analytics['quorum']['margin']))
+            if analytics['availability']['bridge'] is not None:
+                gauges.append(('bridge_health_bridge_availability', 'Fraction of the analytics window the bridge was online',
+                               fleet_labels, analytics['availability']['bridge']))
+            gauges.append(('bridge_health_outliers', 'Orchestrators far above their peers\' latency or pending counts',
+                           fleet_labels, len(analytics['outliers'])))
+        for orch in data.get('orchestrators', []):
+            ip_labels = fleet_labels + (('ip', orch['ip']), ('pillar', orch.get('pillar_name', '')))
+            gauges.append(('bridge_health_orchestrator_up', 'Whether the orchestrator is online',
+                           ip_labels, 1 if orch.get('status') == 'online' else 0))
+            circuit = orch.get('circuit') or {}
+            gauges.append(('bridge_health_orchestrator_circuit_open', 'Whether the orchestrator\'s circuit breaker is open',
+                           ip_labels, 0 if circuit.get('state', 'closed') == 'closed' else 1))
+            for network, counts in (orch.get('network_stats') or {}).items():
+                for direction in ('wraps', 'unwraps'):
+                    gauges.append(('bridge_health_orchestrator_pending', 'Wraps/unwraps waiting to be signed',
+                                   ip_labels + (('network', network), ('direction', direction)),
+                                   counts.get(direction, 0)))
+        return gauges
+    
     def get_status(self) -> Optional[Dict]:
         """Get current status data, returning cached data if available."""
         return self.load_cached_status()
     
     def get_summary(self) -> Optional[Dict]:
         """Get status summary without individual orchestrator details."""
-        data = self.load_cached_status()
-        if not data:
+        snapshot = self.get_snapshot()
+        if not snapshot or not snapshot.data:
             return None
         
+        return snapshot.derive('summary', self._build_summary)
+    
+    @staticmethod
+    def _build_summary(data: Dict) -> Dict:
+        """Build the summary view of a status snapshot."""
         return {
             'timestamp': data.get('timestamp'),
             'bridge_status': data.get('bridge_status'),
             'online_count': data.get('online_count'),
             'total_count': data.get('total_count'),
-            'query_time_seconds': data.get('query_time_seconds')
+            'query_time_seconds': data.get('query_time_seconds'),
+            'analytics': data.get('analytics')
         }
     
+    def get_changes(self, since: int) -> Optional[Dict]:
+        """
+        Get the orchestrators that changed after version `since`.
+        
+        Args:
+            since: Snapshot version the client last saw (0 for a full snapshot)
+            
+        Returns:
+            Change feed dict, or None if no status data is available
+        """
+        snapshot = self.get_snapshot()
+        if not snapshot or not snapshot.data:
+            return None
+        
+        return changes_since(snapshot.data, since)
+    
     def get_pillars(self) -> Optional[Dict]:
-        """Get comprehensive pillar data combining static info and current status."""
-        from app.services.orchestrator_client import PILLAR_MAPPING
+        """
+        Get comprehensive pillar data combining static info and current status.
         
-        data = self.load_cached_status()
-        if not data:
+        The merged view is built once per snapshot and shared by all requests.
+        """
+        snapshot = self.get_snapshot()
+        if not snapshot or not snapshot.data:
             return None
         
+        return snapshot.derive('pillars', self._build_pillars)
+    
+    def _build_pillars(self, data: Dict) -> Dict:
+        """Build the pillars view by merging the fleet's static pillar fields with a status snapshot."""
         # Create a lookup dictionary for current status
         current_status = {orch['ip']: orch for orch in data.get('orchestrators', [])}
         
-        # Combine static pillar data with current status
+        # Combine static pillar data with current status (static_pillars is already sorted by name)
         pillars = []
-        for ip, static_info in PILLAR_MAPPING.items():
+        counts = {'online': 0, 'offline': 0, 'unknown': 0}
+        for ip, static_info in self.fleet.static_pillars.items():
             current = current_status.get(ip, {})
+            status = current.get('status', 'unknown')
+            producer_address = current.get('producer_address', 'Unknown')
             
-            pillar_data = {
-                # Static information
-                'ip': ip,
-                'pillar_name': static_info['name'],
-                'pillar_url': self.client.format_pillar_name(static_info['name']),
-                'pubkey': static_info['pubkey'],
-                'zenonhub_url': f"https://zenonhub.io/pillar/{self.client.format_pillar_name(static_info['name'])}",
-                
+            pillar_data = dict(static_info)
+            pillar_data.update({
                 # Current status (from live data or defaults)
-                'status': current.get('status', 'unknown'),
-                'producer_address': current.get('producer_address', 'Unknown'),
+                'status': status,
+                'producer_address': producer_address,
                 'state': current.get('state', 'Unknown'),
                 'state_num': current.get('state_num'),
-                'network_stats': current.get('network_stats', {
-                    'bnb': {'wraps': 0, 'unwraps': 0},
-                    'eth': {'wraps': 0, 'unwraps': 0},
-                    'supernova': {'wraps': 0, 'unwraps': 0}
-                }),
+                'network_stats': current.get('network_stats') or empty_network_stats(self.fleet.networks),
                 'error': current.get('error'),
                 'last_checked': current.get('last_checked'),
                 
                 # Validation info
                 'api_pillar_name': current.get('api_pillar_name'),
                 'name_mismatch': current.get('name_mismatch', False),
+                'circuit': current.get('circuit'),
                 
                 # Producer address links
-                'producer_explorer_url': f"https://zenonhub.io/explorer/account/{current.get('producer_address')}" if current.get('producer_address') and current.get('producer_address') != 'Unknown' else None
-            }
+                'producer_explorer_url': f"https://zenonhub.io/explorer/account/{producer_address}" if producer_address and producer_address != 'Unknown' else None
+            })
             
             pillars.append(pillar_data)
-        
-        # Sort by pillar name
-        pillars.sort(key=lambda x: x['pillar_name'].lower())
+            if status in counts:
+                counts[status] += 1
         
         return {
             'timestamp': data.get('timestamp'),
             'total_pillars': len(pillars),
-            'online_count': sum(1 for p in pillars if p['status'] == 'online'),
-            'offline_count': sum(1 for p in pillars if p['status'] == 'offline'),
-            'unknown_count': sum(1 for p in pillars if p['status'] == 'unknown'),
+            'online_count': counts['online'],
+            'offline_count': counts['offline'],
+            'unknown_count': counts['unknown'],
             'pillars': pillars
         }
     
+    def get_rendered(self, endpoint: str) -> Optional[RenderedResponse]:
+        """
+        Get the pre-serialized API response for an endpoint.
+        
+        The body is rendered once per snapshot and shared by every request until
+        the next update.
+        
+        Args:
+            endpoint: One of 'status', 'summary' or 'pillars'
+            
+        Returns:
+            RenderedResponse, or None if no status data is available
+        """
+        snapshot = self.get_snapshot()
+        if not snapshot or not snapshot.data:
+            return None
+        
+        return self.render_endpoint(snapshot, endpoint)
+    
+    def render_endpoint(self, snapshot: Snapshot, endpoint: str) -> RenderedResponse:
+        """Render (or return the already rendered) body of one endpoint for a snapshot."""
+        views = {
+            'status': lambda: snapshot.data,
+            'summary': lambda: snapshot.derive('summary', self._build_summary),
+            'pillars': lambda: snapshot.derive('pillars', self._build_pillars)
+        }
+        view = views[endpoint]
+        
+        def render(data: Dict) -> RenderedResponse:
+            payload = {
+                'success': True,
+                'data': view(),
+                'api_version': API_VERSION
+            }
+            return render_json(endpoint, payload, snapshot_time(data, default=snapshot.loaded_at))
+        
+        return snapshot.derive(f'rendered:{endpoint}', render)
+    
+    def render_all(self, snapshot: Snapshot) -> Dict[str, RenderedResponse]:
+        """Render every API endpoint for a snapshot (used by backends that store the bodies)."""
+        return {endpoint: self.render_endpoint(snapshot, endpoint) for endpoint in RENDERED_ENDPOINTS}
+    
     def close(self):
-        """Close the orchestrator client."""
-        self.client.close()
\ No newline at end of file
+        """Close the storage backend, the history store and the orchestrator client if this service created it."""
+        if self._owns_client:
+            self.client.close()
+        self.storage.close()
+        if self.history is not None:
+            self.history.close()
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Push channel for status updates (Server-Sent Events and long polling).
+Each worker runs one watcher thread that notices new snapshot versions (via
+the storage backend, or immediately when the in-process updater calls
+notify()). For every version it serializes a full and a delta message once;
+all subscribers of the worker are then woken and write the same bytes, so the
+per-client cost of an update is a memory copy.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from app.services.change_feed import changes_since
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+API_VERSION = '1.0'
+CHECK_INTERVAL = 0.5  # Seconds between snapshot version checks in the watcher thread
+KEEPALIVE_INTERVAL = 15  # Seconds between SSE comments that keep idle connections open
+
+
+class StreamMessage:
+    """One snapshot version, serialized once for every subscriber."""
+
+    def __init__(self, data: dict, previous_version: Optional[int]):
+        """
+        Serialize a snapshot.
+
+        Args:
+            data: Versioned status snapshot
+            previous_version: Version of the worker's previous message, None for the first one
+        """
+        self.version = data.get('version', 0)
+        self.previous_version = previous_version
+
+        full_json = json.dumps(changes_since(data, 0), separators=(',', ':'))
+        self.full_event = f"id: {self.version}\nevent: snapshot\ndata: {full_json}\n\n".encode('utf-8')
+        self.full_body = self._envelope(full_json)
+
+        if previous_version is None:
+            self.delta_event = self.full_event
+            self.delta_body = self.full_body
+        else:
+            delta_json = json.dumps(changes_since(data, previous_version), separators=(',', ':'))
+            self.delta_event = f"id: {self.version}\nevent: delta\ndata: {delta_json}\n\n".encode('utf-8')
+            self.delta_body = self._envelope(delta_json)
+
+    @staticmethod
+    def _envelope(data_json: str) -> bytes:
+        return f'{{"api_version":"{API_VERSION}","data":{data_json},"success":true}}\n'.encode('utf-8')
+
+    def event_for(self, client_version: int) -> Optional[bytes]:
+        """Return the SSE frame a client at `client_version` needs, or None if it is current."""
+        if client_version == self.version:
+            return None
+        if client_version == self.previous_version:
+            return self.delta_event
+        return self.full_event
+
+    def body_for(self, client_version: int) -> bytes:
+        """Return the long-poll body for a client at `client_version`."""
+        if client_version == self.previous_version:
+            return self.delta_body
+        return self.full_body
+
+
+class StatusBroadcaster:
+    """Fans out snapshot updates to the SSE and long-poll clients of this worker."""
+
+    def __init__(self, status_service, max_clients: int = 100, max_stream_seconds: int = 300):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            status_service: StatusService used to read the current snapshot
+            max_clients: Maximum concurrent streaming clients per worker
+            max_stream_seconds: Streams are closed after this long; EventSource
+                reconnects on its own with Last-Event-ID, so nothing is missed
+        """
+        self.status_service = status_service
+        self.max_clients = max_clients
+        self.max_stream_seconds = max_stream_seconds
+        self.clients = 0
+        self._message: Optional[StreamMessage] = None
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid = None
+
+    def _ensure_watcher(self):
+        """Start the watcher thread in this process (threads do not survive fork)."""
+        pid = os.getpid()
+        if self._thread_pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread_pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._thread_pid = pid
+            self._check()
+            self._thread = threading.Thread(target=self._watch, name='status-stream', daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Wake the watcher right away (called by the in-process updater after each cycle)."""
+        self._wake.set()
+
+    def _watch(self):
+        while True:
+            self._wake.wait(CHECK_INTERVAL)
+            self._wake.clear()
+            try:
+                self._check()
+            except Exception as e:
+                logger.error(f"Error checking for status updates: {e}")
+
+    def _check(self):
+        """Serialize and broadcast the current snapshot if its version is new."""
+        snapshot = self.status_service.get_snapshot()
+        if snapshot is None or not snapshot.data:
+            return
+        version = snapshot.data.get('version', 0)
+        current = self._message
+        if current is not None and current.version == version:
+            return
+
+        message = StreamMessage(snapshot.data, current.version if current is not None else None)
+        with self._cond:
+            self._message = message
+            self._cond.notify_all()
+
+    def wait_for_update(self, client_version: int, timeout: float) -> Optional[StreamMessage]:
+        """
+        Block until a snapshot newer than `client_version` is available.
+
+        Returns:
+            The current message, or None on timeout
+        """
+        self._ensure_watcher()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                message = self._message
+                if message is not None and message.version != client_version:
+                    return message
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def acquire_client(self) -> bool:
+        """Reserve a streaming slot; False when the worker is at max_clients."""
+        with self._cond:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def release_client(self):
+        with self._cond:
+            self.clients -= 1
+
+    def stream(self, client_version: int = 0) -> Iterator[bytes]:
+        """
+        Yield SSE frames for one client until max_stream_seconds elapse.
+
+        Args:
+            client_version: Last version the client saw (from Last-Event-ID), 0 for none
+        """
+        # Tell EventSource to wait a little before reconnecting
+        yield b"retry: 3000\n\n"
+        ends_at = time.monotonic() + self.max_stream_seconds
+        while True:
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return
+            message = self.wait_for_update(client_version, min(KEEPALIVE_INTERVAL, remaining))
+            if message is None:
+                yield b": keepalive\n\n"
+                continue
+            event = message.event_for(client_version)
+            client_version = message.version
+            if event is not None:
+                yield event
+
+    def poll(self, client_version: int, timeout: float) -> Tuple[Optional[bytes], int]:
+        """
+        Long-poll for a snapshot newer than `client_version`.
+
+        Returns:
+            Tuple of (response body or None on timeout, current version)
+        """
+        message = self.wait_for_update(client_version, timeout)
+        if message is None:
+            return None, client_version
+        return message.body_for(client_version), message.version
@@ -0,0 +1,353 @@
+"""
+Pluggable storage backends for status snapshots.
+The file backend keeps the status JSON file plus the shared-memory segment
+for a single host. The Redis backend stores the snapshot, pre-serialized
+endpoint bodies and a rolling history in Redis, so several bridge-health
+instances behind a load balancer can share one poller.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.response_cache import RenderedResponse
+from app.services.shared_snapshot import SharedSnapshotWriter
+from app.services.snapshot_codec import FORMAT_JSON, decode, encode, file_path_for, resolve_format, write_atomic
+from app.services.snapshot_store import Snapshot, get_snapshot_store
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Renders every endpoint body for a snapshot: {endpoint: RenderedResponse}
+Renderer = Callable[[Snapshot], Dict[str, RenderedResponse]]
+
+
+class StorageBackend:
+    """Interface for publishing and reading status snapshots."""
+
+    name = 'base'
+
+    def publish(self, status_data: Dict) -> Snapshot:
+        """Store a new status snapshot and return it as seen by this process."""
+        raise NotImplementedError
+
+    def get_snapshot(self) -> Optional[Snapshot]:
+        """Return the current snapshot, or None if nothing was published yet."""
+        raise NotImplementedError
+
+    def get_history(self, limit: int = 100) -> List[Dict]:
+        """Return recent snapshot summaries, newest first."""
+        return []
+
+    def heartbeat(self):
+        """Record that the poller is alive."""
+
+    def last_heartbeat(self) -> Optional[float]:
+        """Return the Unix time of the poller's last heartbeat, if known."""
+        return None
+
+    def should_poll(self) -> bool:
+        """Return True if this process should run the next polling cycle."""
+        return True
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+
+class FileStorageBackend(StorageBackend):
+    """Status JSON file on disk, mirrored into a shared-memory segment for local workers."""
+
+    name = 'file'
+
+    def __init__(self, status_file: str, stat_interval: float = 1.0, shared_path: Optional[str] = None,
+                 fmt: str = FORMAT_JSON):
+        """
+        Initialize the file backend.
+
+        Args:
+            status_file: Path of the status file
+            stat_interval: Seconds between stat checks when inotify is unavailable
+            shared_path: Shared-memory segment path (None disables it)
+            fmt: Snapshot encoding (see app.services.snapshot_codec)
+        """
+        self.status_file = status_file
+        self.format = fmt
+        self.shared_path = shared_path
+        self.heartbeat_file = os.path.join(os.path.dirname(status_file), 'poller.heartbeat')
+        self.snapshot_store = get_snapshot_store(status_file, stat_interval=stat_interval,
+                                                 shared_path=shared_path)
+        self._shared_writer: Optional[SharedSnapshotWriter] = None
+        self._shared_writer_failed = False
+
+    def _get_shared_writer(self) -> Optional[SharedSnapshotWriter]:
+        """Open the shared-memory segment for writing (only the poller publishes)."""
+        if self._shared_writer is None and self.shared_path and not self._shared_writer_failed:
+            try:
+                self._shared_writer = SharedSnapshotWriter(self.shared_path)
+            except OSError as e:
+                logger.warning(f"Shared snapshot segment disabled: {e}")
+                self._shared_writer_failed = True
+        return self._shared_writer
+
+    def publish(self, status_data: Dict) -> Snapshot:
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+
+        # Encode once; written to a temp file and renamed so readers never see a partial file
+        payload = encode(status_data, self.format)
+        write_atomic(self.status_file, payload)
+
+        # Publish to shared memory so workers skip the file entirely
+        shared_key = None
+        writer = self._get_shared_writer()
+        if writer is not None:
+            shared_key = ('shm', writer.publish(payload))
+        self.snapshot_store.prime(status_data, key=shared_key)
+        return self.snapshot_store.get()
+
+    def get_snapshot(self) -> Optional[Snapshot]:
+        return self.snapshot_store.get()
+
+    def heartbeat(self):
+        writer = self._get_shared_writer()
+        if writer is not None:
+            writer.heartbeat()
+        try:
+            os.makedirs(os.path.dirname(self.heartbeat_file), exist_ok=True)
+            with open(self.heartbeat_file, 'a'):
+                os.utime(self.heartbeat_file, None)
+        except OSError:
+            pass
+
+    def last_heartbeat(self) -> Optional[float]:
+        shared = self.snapshot_store.shared
+        if shared is not None:
+            value = shared.heartbeat()
+            if value is not None:
+                return value
+        try:
+            return os.stat(self.heartbeat_file).st_mtime
+        except OSError:
+            return None
+
+    def close(self):
+        if self._shared_writer is not None:
+            self._shared_writer.close()
+            self._shared_writer = None
+
+
+class RedisStorageBackend(StorageBackend):
+    """Snapshot, pre-rendered bodies and rolling history stored in Redis."""
+
+    name = 'redis'
+
+    def __init__(self, client, renderer: Renderer, prefix: str = 'bridge-health',
+                 history_length: int = 1440, poll_interval: float = 1.0, leader_ttl: int = 30,
+                 endpoints: Tuple[str, ...] = ('status', 'summary', 'pillars'), fmt: str = FORMAT_JSON):
+        """
+        Initialize the Redis backend.
+
+        Args:
+            client: redis.Redis compatible client (e.g. fakeredis.FakeRedis in tests)
+            renderer: Function rendering every endpoint body for a snapshot
+            prefix: Key prefix shared by all instances monitoring the same fleet
+            history_length: Number of snapshot summaries kept in the rolling history
+            poll_interval: Minimum seconds between version checks in each process
+            leader_ttl: Seconds the polling leadership lock is held without renewal
+            endpoints: Endpoints whose pre-rendered bodies are loaded with each snapshot
+            fmt: Snapshot encoding (see app.services.snapshot_codec)
+        """
+        self.client = client
+        self.renderer = renderer
+        self.prefix = prefix
+        self.history_length = history_length
+        self.poll_interval = poll_interval
+        self.leader_ttl = leader_ttl
+        self.endpoints = endpoints
+        self.format = fmt
+        self.instance_id = f"{os.uname().nodename}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._snapshot: Optional[Snapshot] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, renderer: Renderer, endpoints: Tuple[str, ...],
+                    namespace: Optional[str] = None) -> 'RedisStorageBackend':
+        """Build the backend from the REDIS_* settings, under REDIS_KEY_PREFIX:<namespace> if given."""
+        if redis is None:
+            raise RuntimeError("REDIS_ENABLED is set but the redis package is not installed")
+        client = redis.Redis(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            db=config.REDIS_DB,
+            password=config.REDIS_PASSWORD or None,
+            socket_timeout=5,
+            socket_connect_timeout=5
+        )
+        prefix = f"{config.REDIS_KEY_PREFIX}:{namespace}" if namespace else config.REDIS_KEY_PREFIX
+        return cls(client, renderer, prefix=prefix,
+                   history_length=config.REDIS_HISTORY_LENGTH,
+                   poll_interval=config.SNAPSHOT_STAT_INTERVAL,
+                   endpoints=endpoints, fmt=resolve_format(config.SNAPSHOT_FORMAT))
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def publish(self, status_data: Dict) -> Snapshot:
+        payload = encode(status_data, self.format)
+        summary = {key: value for key, value in status_data.items() if key not in ('orchestrators', 'removed')}
+        summary['states'] = {orch['ip']: orch.get('state_num') for orch in status_data.get('orchestrators', [])}
+
+        version = self.client.incr(self._key('version'))
+        snapshot = Snapshot(status_data, ('redis', version))
+        rendered = self.renderer(snapshot)
+
+        # One round trip, applied atomically so readers never mix versions
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._key('snapshot'), payload)
+        for endpoint, body in rendered.items():
+            fields = {
+                'body': body.body,
+                'etag': body.etag,
+                'last_modified': body.last_modified
+            }
+            for encoding, data in body.variants.items():
+                fields[f'variant:{encoding}'] = data
+            body_key = self._key(f'body:{endpoint}')
+            pipe.delete(body_key)
+            pipe.hset(body_key, mapping=fields)
+        pipe.set(self._key('published_version'), version)
+        pipe.lpush(self._key('history'), json.dumps(summary, separators=(',', ':')))
+        pipe.ltrim(self._key('history'), 0, self.history_length - 1)
+        pipe.execute()
+
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def get_snapshot(self) -> Optional[Snapshot]:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now < self._next_check:
+            return snapshot
+
+        with self._lock:
+            self._next_check = now + self.poll_interval
+            try:
+                version = self.client.get(self._key('published_version'))
+                if version is None:
+                    return self._snapshot
+                version = int(version)
+                if self._snapshot is not None and self._snapshot.key == ('redis', version):
+                    return self._snapshot
+                self._snapshot = self._load(version) or self._snapshot
+            except (redis.RedisError, ValueError) as e:
+                logger.error(f"Error reading status snapshot from Redis: {e}")
+            return self._snapshot
+
+    def _load(self, version: int) -> Optional[Snapshot]:
+        """Fetch the snapshot and its pre-rendered bodies in a single pipeline."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.get(self._key('snapshot'))
+        for endpoint in self.endpoints:
+            pipe.hgetall(self._key(f'body:{endpoint}'))
+        payload, *bodies = pipe.execute()
+        if payload is None:
+            return None
+
+        snapshot = Snapshot(decode(payload), ('redis', version))
+        for endpoint, fields in zip(self.endpoints, bodies):
+            if not fields:
+                continue
+            fields = {key.decode() if isinstance(key, bytes) else key: value for key, value in fields.items()}
+            variants = {key.split(':', 1)[1]: value for key, value in fields.items() if key.startswith('variant:')}
+            etag = fields['etag'].decode() if isinstance(fields['etag'], bytes) else fields['etag']
+            snapshot.set_derived(f'rendered:{endpoint}', RenderedResponse(
+                fields['body'], etag, float(fields['last_modified']), variants=variants
+            ))
+        return snapshot
+
+    def get_history(self, limit: int = 100) -> List[Dict]:
+        try:
+            entries = self.client.lrange(self._key('history'), 0, max(0, limit - 1))
+        except redis.RedisError as e:
+            logger.error(f"Error reading status history from Redis: {e}")
+            return []
+        return [json.loads(entry) for entry in entries]
+
+    def _is_leader(self) -> bool:
+        return self.client.get(self._key('leader')) == self.instance_id.encode()
+
+    def heartbeat(self):
+        """Report liveness and renew the leader lock; standby instances stay silent."""
+        try:
+            if not self._is_leader():
+                return
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(self._key('heartbeat'), time.time())
+            pipe.expire(self._key('leader'), self.leader_ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to write poller heartbeat to Redis: {e}")
+
+    def last_heartbeat(self) -> Optional[float]:
+        try:
+            value = self.client.get(self._key('heartbeat'))
+        except redis.RedisError:
+            return None
+        return float(value) if value is not None else None
+
+    def should_poll(self) -> bool:
+        """Only the instance holding the leader lock polls; the others serve its snapshots."""
+        try:
+            leader_key = self._key('leader')
+            if self.client.set(leader_key, self.instance_id, nx=True, ex=self.leader_ttl):
+                return True
+            if self._is_leader():
+                self.client.expire(leader_key, self.leader_ttl)
+                return True
+            return False
+        except redis.RedisError as e:
+            logger.error(f"Error checking poller leadership in Redis: {e}")
+            return False
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+def create_storage_backend(config, status_file: str, renderer: Renderer,
+                           endpoints: Tuple[str, ...], namespace: Optional[str] = None) -> StorageBackend:
+    """
+    Create the storage backend selected by the configuration.
+
+    Args:
+        config: Application configuration
+        status_file: Status file path for the file backend
+        renderer: Function rendering every endpoint body for a snapshot
+        endpoints: Endpoints whose pre-rendered bodies are stored with each snapshot
+        namespace: Suffix keeping the shared-memory segment and Redis keys of a
+            secondary fleet apart from the primary fleet's (None for the primary)
+    """
+    if config.REDIS_ENABLED:
+        return RedisStorageBackend.from_config(config, renderer, endpoints, namespace)
+    fmt = resolve_format(config.SNAPSHOT_FORMAT)
+    shared_path = config.SHARED_SNAPSHOT_PATH or None
+    if shared_path and namespace:
+        shared_path = f"{shared_path}-{namespace}"
+    return FileStorageBackend(
+        file_path_for(status_file, fmt),
+        stat_interval=config.SNAPSHOT_STAT_INTERVAL,
+        shared_path=shared_path,
+        fmt=fmt
+    )
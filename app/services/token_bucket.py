@@ -0,0 +1,75 @@
+"""
+Per-host token-bucket rate limiting for outgoing orchestrator requests.
+Replaces fixed sleeps between calls: requests go out immediately while a host
+has tokens, and are only delayed once its burst allowance is used up.
+"""
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """A single token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """Thread-safe collection of token buckets, one per orchestrator host."""
+
+    def __init__(self, rate: float = 10.0, burst: float = 2.0):
+        """
+        Initialize the host rate limiter.
+
+        Args:
+            rate: Requests per second allowed per host (0 disables limiting)
+            burst: Number of requests a host may receive back-to-back
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str) -> float:
+        """
+        Reserve a request slot for a host.
+
+        Args:
+            host: Orchestrator host the request is going to
+
+        Returns:
+            Delay in seconds before the request may be sent
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket.reserve(time.monotonic())
+
+    def wait(self, host: str):
+        """Block until a request slot for the host is available."""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
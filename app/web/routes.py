@@ -1,15 +1,19 @@
 """Web UI routes for the orchestrator status application"""
 
+import hmac
 from datetime import datetime
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, Response, render_template, jsonify, request
 
-from app.services.status_service import StatusService
+from config.settings import Config
+from app.services.metrics import registry as metrics
+from app.services.status_service import create_fleet_services
 
 # Create web blueprint
 web_bp = Blueprint('web', __name__)
 
-# Initialize status service
-status_service = StatusService()
+# Initialize a status service per fleet; the web UI and health check show the primary fleet
+fleet_services = create_fleet_services()
+status_service = next(iter(fleet_services.values()))
 
 
 @web_bp.route('/')
@@ -34,8 +38,49 @@ def health_check():
     data = status_service.get_status()
     is_healthy = data is not None
     
-    return jsonify({
+    health = {
         'status': 'healthy' if is_healthy else 'unhealthy',
         'has_data': is_healthy,
+        'poller': status_service.get_poller_status(),
         'timestamp': datetime.now().isoformat()
-    }), 200 if is_healthy else 503
\ No newline at end of file
+    }
+    if len(fleet_services) > 1:
+        # Secondary fleets are reported but do not affect the primary fleet's health
+        health['fleets'] = {
+            name: {'has_data': service.get_status() is not None, 'poller': service.get_poller_status()}
+            for name, service in fleet_services.items()
+        }
+    return jsonify(health), 200 if is_healthy else 503
+
+
+def metrics_authorized() -> bool:
+    """
+    Check the credentials of a /metrics scrape.
+    
+    The metrics label orchestrators by IP, so they are protected like /api:
+    a bearer token equal to METRICS_TOKEN, or a valid API key (X-API-Key header
+    or api_key parameter). Unlike /api there is no exemption for the web UI.
+    Open only when neither METRICS_TOKEN nor API keys are configured.
+    """
+    from app.api.routes import api_keys
+    
+    authorization = request.headers.get('Authorization', '')
+    if Config.METRICS_TOKEN and authorization.startswith('Bearer '):
+        if hmac.compare_digest(authorization[len('Bearer '):].encode(), Config.METRICS_TOKEN.encode()):
+            return True
+    if api_keys.enabled:
+        return api_keys.lookup(request.headers.get('X-API-Key') or request.args.get('api_key')) is not None
+    return not Config.METRICS_TOKEN
+
+
+@web_bp.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metrics for all workers and the poller, plus gauges from the current snapshot."""
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics disabled', 'message': 'Set METRICS_ENABLED=true'}), 404
+    if not metrics_authorized():
+        return jsonify({'error': 'Unauthorized', 'message': 'Invalid or missing metrics token or API key'}), 401
+    
+    gauges = [gauge for service in fleet_services.values() for gauge in service.get_metric_gauges()]
+    body = metrics.render(gauges)
+    return Response(body, mimetype='text/plain; version=0.0.4')
@@ -2,7 +2,6 @@
 Configuration management for the orchestrator status application.
 """
 import os
-import ipaddress
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from config.logging import setup_logging, get_logger
@@ -33,6 +32,11 @@ class Config:
     elif API_KEY:  # Fall back to single API_KEY if API_KEYS not set
         API_KEYS = [API_KEY]
     
+    # Key file (one key per line) that replaces API_KEYS and is re-read when it changes, checked
+    # at most every API_KEYS_RELOAD_INTERVAL seconds (0 disables reloading)
+    API_KEYS_FILE = os.getenv('API_KEYS_FILE', '')
+    API_KEYS_RELOAD_INTERVAL = float(os.getenv('API_KEYS_RELOAD_INTERVAL', '10'))
+    
     ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*').split(',')
     RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', '60'))
     
@@ -47,18 +51,127 @@ class Config:
     REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
     REDIS_DB = int(os.getenv('REDIS_DB', '0'))
     REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
+    REDIS_KEY_PREFIX = os.getenv('REDIS_KEY_PREFIX', 'bridge-health')
+    REDIS_HISTORY_LENGTH = int(os.getenv('REDIS_HISTORY_LENGTH', '1440'))  # Snapshot summaries kept
+    
+    # Rate limit counters: 'shm' (shared by the workers of this host), 'redis' (shared by every
+    # instance using the REDIS_* server) or 'memory' (per worker)
+    RATE_LIMIT_STORAGE = os.getenv(
+        'RATE_LIMIT_STORAGE',
+        'redis' if REDIS_ENABLED else ('shm' if os.path.isdir('/dev/shm') else 'memory')
+    ).lower()
+    RATE_LIMIT_STRATEGY = os.getenv('RATE_LIMIT_STRATEGY', 'sliding-window-counter').lower()
+    RATE_LIMIT_SHM_PATH = os.getenv('RATE_LIMIT_SHM_PATH', '/dev/shm/bridge-health-ratelimit')
+    RATE_LIMIT_SLOTS = int(os.getenv('RATE_LIMIT_SLOTS', '65536'))  # Tracked limiter keys (LRU-evicted)
     
     # Orchestrator settings
+    # Orchestrators are read from ORCHESTRATOR_REGISTRY_FILE (.yaml, .json or .csv) when set,
+    # otherwise from ORCHESTRATOR_IP_1..MAX_ORCHESTRATORS, otherwise from PILLAR_MAPPING.
+    # The file is checked for changes every REGISTRY_RELOAD_INTERVAL seconds (0 disables)
+    ORCHESTRATOR_REGISTRY_FILE = os.getenv('ORCHESTRATOR_REGISTRY_FILE', '')
+    REGISTRY_RELOAD_INTERVAL = float(os.getenv('REGISTRY_RELOAD_INTERVAL', '10'))
+    MAX_ORCHESTRATORS = int(os.getenv('MAX_ORCHESTRATORS', '20'))
+    # Default endpoint of every orchestrator; registry file entries can override host,
+    # port, scheme and tls_verify per orchestrator
     ORCHESTRATOR_PORT = int(os.getenv('ORCHESTRATOR_PORT', '55000'))
-    ORCHESTRATOR_TIMEOUT = int(os.getenv('ORCHESTRATOR_TIMEOUT', '5'))
+    ORCHESTRATOR_SCHEME = os.getenv('ORCHESTRATOR_SCHEME', 'http').lower()
+    ORCHESTRATOR_TLS_VERIFY = os.getenv('ORCHESTRATOR_TLS_VERIFY', 'true')  # true, false or a CA bundle path
+    # Keep-alive connections reused across polling cycles: orchestrators whose idle
+    # connections the threaded engine keeps, and seconds the async engine keeps them
+    ORCHESTRATOR_POOL_HOSTS = int(os.getenv('ORCHESTRATOR_POOL_HOSTS', '1024'))
+    ORCHESTRATOR_KEEPALIVE_SECONDS = float(os.getenv('ORCHESTRATOR_KEEPALIVE_SECONDS', '300'))
+    ORCHESTRATOR_TIMEOUT = int(os.getenv('ORCHESTRATOR_TIMEOUT', '5'))  # Read timeout (upper bound when adaptive)
+    ORCHESTRATOR_CONNECT_TIMEOUT = float(os.getenv('ORCHESTRATOR_CONNECT_TIMEOUT', '2'))
+    # Read timeouts adapt to each orchestrator's p95 latency times TIMEOUT_P95_MULTIPLIER,
+    # between MIN_ORCHESTRATOR_TIMEOUT and ORCHESTRATOR_TIMEOUT
+    ADAPTIVE_TIMEOUTS = os.getenv('ADAPTIVE_TIMEOUTS', 'true').lower() == 'true'
+    TIMEOUT_P95_MULTIPLIER = float(os.getenv('TIMEOUT_P95_MULTIPLIER', '3'))
+    MIN_ORCHESTRATOR_TIMEOUT = float(os.getenv('MIN_ORCHESTRATOR_TIMEOUT', '1'))
+    # Seconds a polling cycle may take; orchestrators that have not answered by then are
+    # reported as timed out so the snapshot is published on time (0 disables)
+    POLL_CYCLE_DEADLINE = float(os.getenv('POLL_CYCLE_DEADLINE', '20'))
     MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '10'))
     
+    # Polling engine settings ('threaded' or 'async')
+    POLLING_ENGINE = os.getenv('POLLING_ENGINE', 'threaded').lower()
+    ASYNC_MAX_CONCURRENCY = int(os.getenv('ASYNC_MAX_CONCURRENCY', '100'))
+    ASYNC_PER_HOST_LIMIT = int(os.getenv('ASYNC_PER_HOST_LIMIT', '2'))
+    
+    # RPC settings ('serial' or 'batch') and per-orchestrator token-bucket pacing
+    ORCHESTRATOR_RPC_MODE = os.getenv('ORCHESTRATOR_RPC_MODE', 'serial').lower()
+    ORCHESTRATOR_RATE_LIMIT = float(os.getenv('ORCHESTRATOR_RATE_LIMIT', '10'))
+    ORCHESTRATOR_RATE_BURST = float(os.getenv('ORCHESTRATOR_RATE_BURST', '2'))
+    
+    # Seconds a getIdentity response is reused before re-fetching (0 disables the cache)
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', '3600'))
+    
+    # Circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive network failures an orchestrator
+    # fails fast with its last error, probed every CIRCUIT_RESET_SECONDS (doubling up to the max)
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))  # 0 disables
+    CIRCUIT_RESET_SECONDS = int(os.getenv('CIRCUIT_RESET_SECONDS', '60'))
+    CIRCUIT_MAX_RESET_SECONDS = int(os.getenv('CIRCUIT_MAX_RESET_SECONDS', '600'))
+    
     # Update settings
     UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', '60'))
     MIN_ONLINE_FOR_BRIDGE = int(os.getenv('MIN_ONLINE_FOR_BRIDGE', '16'))
+    # Bridge networks reported per orchestrator: comma-separated 'getStatus network name=key' pairs
+    BRIDGE_NETWORKS = os.getenv('BRIDGE_NETWORKS', 'BNB Chain=bnb,Ethereum=eth,Supernova=supernova')
+    
+    # Fleets: independent orchestrator sets (e.g. 'mainnet,testnet') polled by one engine, each with
+    # its own snapshot under /api/<fleet>/. The first is the primary fleet, configured by the settings
+    # above and served by the unprefixed routes. The others need FLEET_<NAME>_REGISTRY_FILE; any fleet
+    # can override FLEET_<NAME>_MIN_ONLINE and FLEET_<NAME>_NETWORKS (see app.services.fleets)
+    FLEETS = [name.strip().lower() for name in os.getenv('FLEETS', '').split(',') if name.strip()] or ['default']
+    
+    # Adaptive polling: each orchestrator is polled on its own schedule (UPDATE_INTERVAL when
+    # stable, FAST_POLL_INTERVAL for HOT_NODE_SECONDS after a change or while wraps/unwraps are
+    # pending, backing off up to MAX_POLL_BACKOFF when unreachable). Set to false to poll the
+    # whole fleet every UPDATE_INTERVAL
+    ADAPTIVE_POLLING = os.getenv('ADAPTIVE_POLLING', 'true').lower() == 'true'
+    FAST_POLL_INTERVAL = int(os.getenv('FAST_POLL_INTERVAL', '15'))
+    MAX_POLL_BACKOFF = int(os.getenv('MAX_POLL_BACKOFF', '600'))
+    HOT_NODE_SECONDS = int(os.getenv('HOT_NODE_SECONDS', '300'))
+    POLL_TICK_SECONDS = float(os.getenv('POLL_TICK_SECONDS', '2'))  # Nodes due this close together share a cycle
     
     # File paths
     STATUS_FILE = os.getenv('STATUS_FILE', 'orchestrator_status.json')
+    # Prometheus metrics (/metrics): each process writes its metrics to METRICS_DIR (under data/)
+    # every METRICS_FLUSH_INTERVAL seconds and a scrape sums them
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_DIR = os.getenv('METRICS_DIR', 'metrics')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+    # Bearer token for /metrics scrapes; a valid API key is accepted as well
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    
+    # Push updates (/api/stream); streams are closed after STREAM_MAX_SECONDS and the
+    # browser reconnects, keep it below the Gunicorn worker timeout for sync workers
+    STREAM_MAX_CLIENTS = int(os.getenv('STREAM_MAX_CLIENTS', '500'))  # Per worker
+    STREAM_MAX_SECONDS = int(os.getenv('STREAM_MAX_SECONDS', '60'))
+    STREAM_POLL_TIMEOUT = int(os.getenv('STREAM_POLL_TIMEOUT', '25'))  # Long-poll wait
+    HISTORY_ENABLED = os.getenv('HISTORY_ENABLED', 'True').lower() == 'true'
+    HISTORY_DIR = os.getenv('HISTORY_DIR', 'history')  # Relative to data/
+    # Buckets kept per rollup: 2 days of minutes, 60 days of hours, 2 years of days by default
+    HISTORY_1M_SLOTS = int(os.getenv('HISTORY_1M_SLOTS', '2880'))
+    HISTORY_1H_SLOTS = int(os.getenv('HISTORY_1H_SLOTS', '1440'))
+    HISTORY_1D_SLOTS = int(os.getenv('HISTORY_1D_SLOTS', '730'))
+    # Quorum margin, pending totals, outliers and rolling availability in the summary (needs numpy)
+    ANALYTICS_ENABLED = os.getenv('ANALYTICS_ENABLED', 'True').lower() == 'true'
+    ANALYTICS_WINDOW_SECONDS = int(os.getenv('ANALYTICS_WINDOW_SECONDS', '86400'))  # Rolling availability window
+    ANALYTICS_WINDOW_SLOTS = int(os.getenv('ANALYTICS_WINDOW_SLOTS', '96'))  # Buckets in the window (15 minutes each)
+    ANALYTICS_OUTLIER_THRESHOLD = float(os.getenv('ANALYTICS_OUTLIER_THRESHOLD', '3.5'))  # Robust z-score
+    SNAPSHOT_FORMAT = os.getenv('SNAPSHOT_FORMAT', 'json').lower()  # 'json' or 'msgpack'
+    
+    # Seconds between status file stat checks when inotify is unavailable
+    SNAPSHOT_STAT_INTERVAL = float(os.getenv('SNAPSHOT_STAT_INTERVAL', '1.0'))
+    
+    # Seconds without a heartbeat after which the poller is reported as not alive
+    POLLER_STALE_SECONDS = int(os.getenv('POLLER_STALE_SECONDS', '90'))
+    
+    # Shared-memory segment the updater publishes snapshots to (empty disables)
+    SHARED_SNAPSHOT_PATH = os.getenv(
+        'SHARED_SNAPSHOT_PATH',
+        '/dev/shm/bridge-health-snapshot' if os.path.isdir('/dev/shm') else ''
+    )
     
     # Logging settings
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -67,26 +180,33 @@ class Config:
     LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
     
     @classmethod
-    def get_orchestrator_ips(cls) -> List[str]:
-        """Get and validate orchestrator IPs from environment variables."""
-        ips = []
-        max_orchestrators = int(os.getenv('MAX_ORCHESTRATORS', '20'))
+    def get_env_orchestrator_ips(cls) -> List[str]:
+        """Get and validate orchestrator IPs from the ORCHESTRATOR_IP_<n> environment variables."""
+        from app.services.orchestrator_registry import validate_ips
         
-        for i in range(1, max_orchestrators + 1):
+        ips = []
+        for i in range(1, cls.MAX_ORCHESTRATORS + 1):
             ip = os.getenv(f'ORCHESTRATOR_IP_{i}')
             if ip:
                 ips.append(ip)
         
-        # Validate IPs
-        valid_ips = []
-        for ip in ips:
-            try:
-                ipaddress.ip_address(ip)
-                valid_ips.append(ip)
-            except ValueError:
-                logger.warning(f"Invalid IP address in configuration: {ip}")
-        
-        return valid_ips
+        return validate_ips(ips)
+    
+    @staticmethod
+    def fleet_env_name(fleet: str, name: str) -> str:
+        """Name of a per-fleet setting's environment variable, e.g. FLEET_TESTNET_MIN_ONLINE."""
+        return f"FLEET_{fleet.upper().replace('-', '_')}_{name}"
+    
+    @classmethod
+    def get_fleet_setting(cls, fleet: str, name: str, default: str = '') -> str:
+        """Read a per-fleet setting from the environment."""
+        return os.getenv(cls.fleet_env_name(fleet, name), default)
+    
+    @classmethod
+    def get_orchestrator_ips(cls) -> List[str]:
+        """Get the orchestrator IPs from the orchestrator registry (loaded once, reloaded on file change)."""
+        from app.services.orchestrator_registry import get_registry
+        return get_registry().ips
     
     @classmethod
     def validate(cls) -> bool:
@@ -94,28 +214,129 @@ class Config:
         valid = True
         
         # Check for required settings
-        ips = cls.get_orchestrator_ips()
-        if not ips:
+        if cls.ORCHESTRATOR_REGISTRY_FILE and not os.path.exists(cls.ORCHESTRATOR_REGISTRY_FILE):
+            logger.error(f"ORCHESTRATOR_REGISTRY_FILE not found: {cls.ORCHESTRATOR_REGISTRY_FILE}")
+            valid = False
+        elif not cls.get_orchestrator_ips():
             logger.error("No valid orchestrator IPs found in configuration")
             valid = False
         
+        if cls.REGISTRY_RELOAD_INTERVAL < 0:
+            logger.error("REGISTRY_RELOAD_INTERVAL must be non-negative")
+            valid = False
+        
         # Validate numeric ranges
         if cls.ORCHESTRATOR_TIMEOUT <= 0:
             logger.error("ORCHESTRATOR_TIMEOUT must be positive")
             valid = False
         
+        if cls.ORCHESTRATOR_CONNECT_TIMEOUT <= 0 or cls.MIN_ORCHESTRATOR_TIMEOUT <= 0:
+            logger.error("ORCHESTRATOR_CONNECT_TIMEOUT and MIN_ORCHESTRATOR_TIMEOUT must be positive")
+            valid = False
+        
+        if cls.TIMEOUT_P95_MULTIPLIER < 1:
+            logger.error("TIMEOUT_P95_MULTIPLIER must be at least 1")
+            valid = False
+        
+        if cls.POLL_CYCLE_DEADLINE < 0 or (0 < cls.POLL_CYCLE_DEADLINE < cls.ORCHESTRATOR_TIMEOUT):
+            logger.error("POLL_CYCLE_DEADLINE must be 0 (disabled) or at least ORCHESTRATOR_TIMEOUT")
+            valid = False
+        
         if cls.UPDATE_INTERVAL <= 0:
             logger.error("UPDATE_INTERVAL must be positive")
             valid = False
         
+        if cls.FAST_POLL_INTERVAL <= 0 or cls.FAST_POLL_INTERVAL > cls.UPDATE_INTERVAL:
+            logger.error("FAST_POLL_INTERVAL must be positive and no greater than UPDATE_INTERVAL")
+            valid = False
+        
+        if cls.MAX_POLL_BACKOFF < cls.UPDATE_INTERVAL:
+            logger.error("MAX_POLL_BACKOFF must be at least UPDATE_INTERVAL")
+            valid = False
+        
+        if cls.HOT_NODE_SECONDS < 0 or cls.POLL_TICK_SECONDS < 0:
+            logger.error("HOT_NODE_SECONDS and POLL_TICK_SECONDS must be non-negative")
+            valid = False
+        
         if cls.MIN_ONLINE_FOR_BRIDGE < 0:
             logger.error("MIN_ONLINE_FOR_BRIDGE must be non-negative")
             valid = False
         
+        if not cls.validate_fleets():
+            valid = False
+        
         if cls.MAX_CONCURRENT_REQUESTS <= 0:
             logger.error("MAX_CONCURRENT_REQUESTS must be positive")
             valid = False
         
+        if not 0 < cls.ORCHESTRATOR_PORT < 65536:
+            logger.error("ORCHESTRATOR_PORT must be between 1 and 65535")
+            valid = False
+        
+        if cls.ORCHESTRATOR_SCHEME not in ('http', 'https'):
+            logger.error("ORCHESTRATOR_SCHEME must be 'http' or 'https'")
+            valid = False
+        
+        if cls.ORCHESTRATOR_POOL_HOSTS <= 0 or cls.ORCHESTRATOR_KEEPALIVE_SECONDS < 0:
+            logger.error("ORCHESTRATOR_POOL_HOSTS must be positive and ORCHESTRATOR_KEEPALIVE_SECONDS non-negative")
+            valid = False
+        
+        if cls.POLLING_ENGINE not in ('threaded', 'async'):
+            logger.error("POLLING_ENGINE must be 'threaded' or 'async'")
+            valid = False
+        
+        if cls.ASYNC_MAX_CONCURRENCY <= 0 or cls.ASYNC_PER_HOST_LIMIT <= 0:
+            logger.error("ASYNC_MAX_CONCURRENCY and ASYNC_PER_HOST_LIMIT must be positive")
+            valid = False
+        
+        if cls.ORCHESTRATOR_RPC_MODE not in ('serial', 'batch'):
+            logger.error("ORCHESTRATOR_RPC_MODE must be 'serial' or 'batch'")
+            valid = False
+        
+        if cls.ORCHESTRATOR_RATE_LIMIT < 0:
+            logger.error("ORCHESTRATOR_RATE_LIMIT must be non-negative")
+            valid = False
+        
+        if cls.IDENTITY_CACHE_TTL < 0:
+            logger.error("IDENTITY_CACHE_TTL must be non-negative")
+            valid = False
+        
+        if cls.CIRCUIT_FAILURE_THRESHOLD < 0:
+            logger.error("CIRCUIT_FAILURE_THRESHOLD must be non-negative")
+            valid = False
+        
+        if cls.CIRCUIT_RESET_SECONDS <= 0 or cls.CIRCUIT_MAX_RESET_SECONDS < cls.CIRCUIT_RESET_SECONDS:
+            logger.error("CIRCUIT_RESET_SECONDS must be positive and no greater than CIRCUIT_MAX_RESET_SECONDS")
+            valid = False
+        
+        if cls.METRICS_FLUSH_INTERVAL <= 0:
+            logger.error("METRICS_FLUSH_INTERVAL must be positive")
+            valid = False
+        
+        if cls.SNAPSHOT_FORMAT not in ('json', 'msgpack'):
+            logger.error("SNAPSHOT_FORMAT must be 'json' or 'msgpack'")
+            valid = False
+        
+        if cls.STREAM_MAX_SECONDS <= 0 or cls.STREAM_POLL_TIMEOUT <= 0:
+            logger.error("STREAM_MAX_SECONDS and STREAM_POLL_TIMEOUT must be positive")
+            valid = False
+        
+        if min(cls.HISTORY_1M_SLOTS, cls.HISTORY_1H_SLOTS, cls.HISTORY_1D_SLOTS) < 0:
+            logger.error("HISTORY_*_SLOTS must be non-negative")
+            valid = False
+        
+        if cls.ANALYTICS_WINDOW_SECONDS <= 0 or cls.ANALYTICS_WINDOW_SLOTS <= 0:
+            logger.error("ANALYTICS_WINDOW_SECONDS and ANALYTICS_WINDOW_SLOTS must be positive")
+            valid = False
+        
+        if cls.ANALYTICS_OUTLIER_THRESHOLD <= 0:
+            logger.error("ANALYTICS_OUTLIER_THRESHOLD must be positive")
+            valid = False
+        
+        if cls.REDIS_HISTORY_LENGTH <= 0:
+            logger.error("REDIS_HISTORY_LENGTH must be positive")
+            valid = False
+        
         # Security validations
         if not cls.FLASK_DEBUG and cls.SECRET_KEY == 'dev-key-change-in-production':
             logger.warning("Using default SECRET_KEY in production mode. Please set a secure SECRET_KEY.")
@@ -128,12 +349,68 @@ class Config:
                 logger.error("SSL certificate or key file not found")
                 valid = False
         
+        if cls.RATE_LIMIT_STORAGE not in ('shm', 'redis', 'memory'):
+            logger.error("RATE_LIMIT_STORAGE must be 'shm', 'redis' or 'memory'")
+            valid = False
+        
+        if cls.RATE_LIMIT_STRATEGY not in ('sliding-window-counter', 'fixed-window', 'moving-window'):
+            logger.error("RATE_LIMIT_STRATEGY must be 'sliding-window-counter', 'fixed-window' or 'moving-window'")
+            valid = False
+        elif cls.RATE_LIMIT_STORAGE == 'shm' and cls.RATE_LIMIT_STRATEGY == 'moving-window':
+            logger.error("RATE_LIMIT_STRATEGY=moving-window is not supported with RATE_LIMIT_STORAGE=shm")
+            valid = False
+        
+        if cls.RATE_LIMIT_SLOTS <= 0:
+            logger.error("RATE_LIMIT_SLOTS must be positive")
+            valid = False
+        
+        if cls.API_KEYS_FILE and not os.path.exists(cls.API_KEYS_FILE):
+            logger.error(f"API_KEYS_FILE not found: {cls.API_KEYS_FILE}")
+            valid = False
+        
+        if cls.API_KEYS_RELOAD_INTERVAL < 0:
+            logger.error("API_KEYS_RELOAD_INTERVAL must be non-negative")
+            valid = False
+        
         if cls.RATE_LIMIT_PER_MINUTE <= 0:
             logger.error("RATE_LIMIT_PER_MINUTE must be positive")
             valid = False
         
         return valid
     
+    @classmethod
+    def validate_fleets(cls) -> bool:
+        """Validate the FLEETS names and the per-fleet settings."""
+        from app.services.fleets import parse_networks, validate_fleet_name
+        
+        valid = True
+        if len(set(cls.FLEETS)) != len(cls.FLEETS):
+            logger.error("FLEETS contains duplicate names")
+            valid = False
+        
+        for index, fleet in enumerate(cls.FLEETS):
+            try:
+                validate_fleet_name(fleet)
+                parse_networks(cls.get_fleet_setting(fleet, 'NETWORKS', cls.BRIDGE_NETWORKS))
+                if int(cls.get_fleet_setting(fleet, 'MIN_ONLINE', str(cls.MIN_ONLINE_FOR_BRIDGE))) < 0:
+                    raise ValueError("MIN_ONLINE must be non-negative")
+            except ValueError as e:
+                logger.error(f"Invalid configuration for fleet '{fleet}': {e}")
+                valid = False
+            
+            if index == 0:
+                continue  # The primary fleet uses ORCHESTRATOR_REGISTRY_FILE, checked above
+            env_name = cls.fleet_env_name(fleet, 'REGISTRY_FILE')
+            registry_file = cls.get_fleet_setting(fleet, 'REGISTRY_FILE')
+            if not registry_file:
+                logger.error(f"{env_name} is required for fleet '{fleet}'")
+                valid = False
+            elif not os.path.exists(registry_file):
+                logger.error(f"{env_name} not found: {registry_file}")
+                valid = False
+        
+        return valid
+    
     @classmethod
     def get_config_dict(cls) -> Dict[str, Any]:
         """Get configuration as a dictionary."""
@@ -142,15 +419,43 @@ class Config:
             'flask_port': cls.FLASK_PORT,
             'flask_debug': cls.FLASK_DEBUG,
             'ssl_enabled': cls.SSL_ENABLED,
+            'orchestrator_registry_file': cls.ORCHESTRATOR_REGISTRY_FILE or None,
             'orchestrator_port': cls.ORCHESTRATOR_PORT,
+            'orchestrator_scheme': cls.ORCHESTRATOR_SCHEME,
+            'orchestrator_pool_hosts': cls.ORCHESTRATOR_POOL_HOSTS,
+            'orchestrator_keepalive_seconds': cls.ORCHESTRATOR_KEEPALIVE_SECONDS,
             'orchestrator_timeout': cls.ORCHESTRATOR_TIMEOUT,
+            'orchestrator_connect_timeout': cls.ORCHESTRATOR_CONNECT_TIMEOUT,
+            'adaptive_timeouts': cls.ADAPTIVE_TIMEOUTS,
+            'poll_cycle_deadline': cls.POLL_CYCLE_DEADLINE,
             'max_concurrent_requests': cls.MAX_CONCURRENT_REQUESTS,
+            'polling_engine': cls.POLLING_ENGINE,
+            'orchestrator_rpc_mode': cls.ORCHESTRATOR_RPC_MODE,
+            'orchestrator_rate_limit': cls.ORCHESTRATOR_RATE_LIMIT,
+            'identity_cache_ttl': cls.IDENTITY_CACHE_TTL,
+            'circuit_failure_threshold': cls.CIRCUIT_FAILURE_THRESHOLD,
+            'circuit_reset_seconds': cls.CIRCUIT_RESET_SECONDS,
             'update_interval': cls.UPDATE_INTERVAL,
+            'adaptive_polling': cls.ADAPTIVE_POLLING,
+            'fast_poll_interval': cls.FAST_POLL_INTERVAL,
+            'max_poll_backoff': cls.MAX_POLL_BACKOFF,
+            'hot_node_seconds': cls.HOT_NODE_SECONDS,
             'min_online_for_bridge': cls.MIN_ONLINE_FOR_BRIDGE,
+            'bridge_networks': cls.BRIDGE_NETWORKS,
+            'fleets': cls.FLEETS,
             'status_file': cls.STATUS_FILE,
+            'snapshot_format': cls.SNAPSHOT_FORMAT,
+            'history_enabled': cls.HISTORY_ENABLED,
+            'analytics_enabled': cls.ANALYTICS_ENABLED,
+            'analytics_window_seconds': cls.ANALYTICS_WINDOW_SECONDS,
+            'metrics_enabled': cls.METRICS_ENABLED,
+            'shared_snapshot_path': cls.SHARED_SNAPSHOT_PATH,
             'log_level': cls.LOG_LEVEL,
             'log_dir': cls.LOG_DIR,
             'rate_limit_per_minute': cls.RATE_LIMIT_PER_MINUTE,
+            'rate_limit_storage': cls.RATE_LIMIT_STORAGE,
+            'rate_limit_strategy': cls.RATE_LIMIT_STRATEGY,
             'redis_enabled': cls.REDIS_ENABLED,
+            'redis_key_prefix': cls.REDIS_KEY_PREFIX,
             'orchestrator_count': len(cls.get_orchestrator_ips())
         }
\ No newline at end of file
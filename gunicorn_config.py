@@ -1,15 +1,35 @@
 import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import gevent  # noqa: F401
+    DEFAULT_WORKER_CLASS = 'gevent'
+except ImportError:
+    DEFAULT_WORKER_CLASS = 'sync'
 
 # Server socket
 bind = "0.0.0.0:5001"
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
-worker_connections = 1000
+# gevent workers serve many connections each (including idle /api/stream
+# clients and keep-alive sockets), so one worker per core is enough; sync
+# workers hold one connection each and need more processes.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', DEFAULT_WORKER_CLASS)
+if worker_class == 'gevent':
+    workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() + 1))
+    # Keep idle client connections open longer than typical load balancer idle timeouts (60s)
+    keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '75'))
+else:
+    workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+    # A sync worker is blocked while it waits on a keep-alive socket, so keep this short
+    keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '2'))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))  # gevent only
 timeout = 120
-keepalive = 2
 
 # Logging
 accesslog = '/opt/bridge-health/logs/gunicorn_access.log'
@@ -31,60 +51,42 @@ tmp_upload_dir = None
 # certfile = '/path/to/certfile'
 
 # Worker lifecycle hooks
-import os
+# Status polling runs in a dedicated poller process supervised by the master,
+# so request workers only serve. Workers see the poller's liveness through the
+# shared snapshot segment / heartbeat file (reported by /health).
 
 def when_ready(server):
     """Called just after the master process is initialized."""
     # This runs in the master process, not in workers
-    pass
+    from config.settings import Config
+    from app.services.metrics import reset_directory
+    from app.services.poller_supervisor import PollerSupervisor
+    
+    # Metrics files of the previous run would otherwise be added to this one
+    metrics_dir = os.path.join('data', Config.METRICS_DIR)
+    reset_directory(metrics_dir)
+    
+    server.poller_supervisor = PollerSupervisor(
+        log=server.log.info,
+        on_exit=lambda pid: fold_metrics(server, metrics_dir)
+    )
+    server.poller_supervisor.start()
 
-def on_starting(server):
-    """Called just before the master process is initialized."""
-    # Clean up any stale lock files
-    lock_file = '/tmp/bridge-health-bg-updater.lock'
-    if os.path.exists(lock_file):
-        os.remove(lock_file)
-        print("Removed stale background updater lock file")
+def child_exit(server, worker):
+    """Called in the master just after a worker exited."""
+    from config.settings import Config
+    fold_metrics(server, os.path.join('data', Config.METRICS_DIR))
 
-def post_fork(server, worker):
-    """Called just after a worker has been forked."""
-    # This is called in the worker process after fork
-    # We'll start the background updater here
-    lock_file = '/tmp/bridge-health-bg-updater.lock'
-    
+def fold_metrics(server, metrics_dir):
+    """Fold the metrics files of exited processes into the directory's running total."""
+    from app.services.metrics import fold_exited
     try:
-        # Try to create lock file atomically
-        fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-        os.write(fd, str(worker.pid).encode())
-        os.close(fd)
-        
-        # Import here to avoid import issues
-        from app.main import create_app
-        app = create_app()
-        
-        # Start background updater
-        with app.app_context():
-            app.background_updater.start()
-            app.background_updater.force_update()
-            print(f"Background updater started in worker {worker.pid}")
-            
-    except FileExistsError:
-        print(f"Background updater NOT started in worker {worker.pid} (lock file exists)")
+        fold_exited(metrics_dir)
     except Exception as e:
-        print(f"Error starting background updater in worker {worker.pid}: {e}")
+        server.log.warning(f"Failed to fold metrics of exited processes: {e}")
 
-def worker_exit(server, worker):
-    """Hook called when a worker exits."""
-    # server parameter required by Gunicorn but not used
-    lock_file = '/tmp/bridge-health-bg-updater.lock'
-    
-    try:
-        # Check if this worker owns the lock file
-        if os.path.exists(lock_file):
-            with open(lock_file, 'r') as f:
-                lock_pid = f.read().strip()
-            if lock_pid == str(worker.pid):
-                os.remove(lock_file)
-                print(f"Background updater lock removed for worker {worker.pid}")
-    except Exception as e:
-        print(f"Error removing lock file in worker {worker.pid}: {e}")
\ No newline at end of file
+def on_exit(server):
+    """Called just before the master process exits."""
+    supervisor = getattr(server, 'poller_supervisor', None)
+    if supervisor is not None:
+        supervisor.stop()
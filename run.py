@@ -9,6 +9,7 @@ import signal
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.main import create_app, get_logger, start_background_services, stop_background_services
+from app.services.metrics import reset_directory
 from config.settings import Config
 
 
@@ -33,6 +34,9 @@ def main():
         print("No valid orchestrator IPs found. Exiting.")
         sys.exit(1)
     
+    # Start with empty metrics (files of a previous run would be added to this one)
+    reset_directory(os.path.join('data', Config.METRICS_DIR))
+    
     # Create Flask app
     global app
     app = create_app()
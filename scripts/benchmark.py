@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the Bridge Health Service
+
+1. Polling: starts a mock orchestrator fleet (scripts/mock_orchestrator.py)
+   for each fleet size and measures query_all_orchestrators cycle time, CPU
+   time per cycle, memory and connection reuse for each polling engine.
+2. HTTP: starts Gunicorn against a generated snapshot and load-tests
+   /api/status, /api/pillars and /health for throughput and p50/p99 latency.
+3. Analytics: times BridgeAnalytics.update on generated snapshots for each
+   fleet size and availability window resolution, over enough snapshots for
+   the window to turn at least once (needs numpy).
+
+Results are written as JSON together with the git commit they were measured
+on. Pass --baseline with an earlier result file to get the relative change of
+every measurement, e.g. to spot regressions between commits.
+
+Usage:
+    python scripts/benchmark.py --fleet-sizes 20,100,1000 --output bench.json
+    python scripts/benchmark.py --baseline bench-main.json --output bench-branch.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import aiohttp
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmark_workers import API_KEY, percentile, start_server, write_environment  # noqa: E402
+from mock_orchestrator import fleet_ips, pillar_name, raise_file_limit  # noqa: E402
+
+HTTP_ENDPOINTS = ('/api/status', '/api/pillars', '/health')
+
+
+def git_commit():
+    """Return the current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def rss_mb():
+    """Current resident set size of this process in MiB."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def start_mock_fleet(args, nodes):
+    """Start the mock fleet in its own process so its CPU time is not counted."""
+    command = [
+        sys.executable, os.path.join(SCRIPTS_DIR, 'mock_orchestrator.py'),
+        '--nodes', str(nodes),
+        '--latency', str(args.latency),
+        '--jitter', str(args.jitter),
+        '--error-rate', str(args.error_rate),
+        '--error-mode', args.error_mode
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    if process.stdout.readline().strip() != 'ready':
+        process.terminate()
+        raise RuntimeError(f"Mock fleet with {nodes} nodes did not start")
+    return process
+
+
+def connection_reuse(before, after):
+    """Fraction of the requests between two ConnectionStats readings sent on a reused connection."""
+    opened = after['opened'] - before['opened']
+    reused = after['reused'] - before['reused']
+    return round(reused / (opened + reused), 4) if opened + reused else None
+
+
+def bench_polling(args, nodes, engine):
+    """Measure polling cycles of one engine against the running mock fleet."""
+    from app.services import orchestrator_client
+
+    ips = fleet_ips(nodes)
+    orchestrator_client.PILLAR_MAPPING.update(
+        {ip: {'name': pillar_name(i), 'pubkey': ''} for i, ip in enumerate(ips)})
+
+    client = orchestrator_client.OrchestratorClient(
+        timeout=args.timeout,
+        max_workers=args.max_workers,
+        engine=engine,
+        rpc_mode=args.rpc_mode,
+        breaker_threshold=0,
+        cycle_deadline=0
+    )
+    try:
+        # Warm-up cycle: fetches and caches identities, opens connections
+        client.query_all_orchestrators(ips)
+
+        durations = []
+        errors = 0
+        connections_before = client.connection_stats.describe()
+        cpu_before = cpu_seconds()
+        for _ in range(args.cycles):
+            started = time.perf_counter()
+            results, summary = client.query_all_orchestrators(ips)
+            durations.append(time.perf_counter() - started)
+            errors += sum(1 for result in results if result['state_num'] is None)
+        cpu_used = cpu_seconds() - cpu_before
+        connections = client.connection_stats.describe()
+    finally:
+        client.close()
+
+    return {
+        'nodes': nodes,
+        'engine': client.engine,
+        'cycles': args.cycles,
+        'cycle_seconds': {
+            'mean': round(statistics.mean(durations), 4),
+            'p50': round(statistics.median(durations), 4),
+            'max': round(max(durations), 4)
+        },
+        'cpu_seconds_per_cycle': round(cpu_used / args.cycles, 4),
+        'rss_mb': rss_mb(),
+        'failed_queries_per_cycle': round(errors / args.cycles, 2),
+        'connections_opened_per_cycle': round((connections['opened'] - connections_before['opened']) / args.cycles, 2),
+        'connection_reuse': connection_reuse(connections_before, connections),
+        'online': summary['online_count']
+    }
+
+
+async def load_endpoint(base, path, clients, duration):
+    """Request one endpoint from `clients` concurrent loops for `duration` seconds."""
+    latencies = []
+    errors = 0
+    ends_at = time.monotonic() + duration
+
+    async def client(session):
+        nonlocal errors
+        while time.monotonic() < ends_at:
+            started = time.perf_counter()
+            try:
+                async with session.get(f'{base}{path}', headers={'X-API-Key': API_KEY}) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                        continue
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    timeout = aiohttp.ClientTimeout(total=max(5.0, duration))
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0), timeout=timeout) as session:
+        await asyncio.gather(*(client(session) for _ in range(clients)))
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': round(len(latencies) / duration, 1),
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50),
+            'p99': percentile(latencies, 0.99),
+            'max': percentile(latencies, 1.0)
+        }
+    }
+
+
+def bench_http(args):
+    """Start Gunicorn against a generated snapshot and load-test each endpoint."""
+    directory = tempfile.mkdtemp(prefix='bridge-health-bench-')
+    try:
+        settings = write_environment(directory, args.http_orchestrators)
+        keepalive = 75 if args.worker_class == 'gevent' else 2
+        process = start_server(directory, settings, args.worker_class, args.workers, args.port, keepalive)
+        try:
+            base = f'http://127.0.0.1:{args.port}'
+            return {
+                'worker_class': args.worker_class,
+                'workers': args.workers,
+                'clients': args.clients,
+                'endpoints': {
+                    path: asyncio.run(load_endpoint(base, path, args.clients, args.duration))
+                    for path in HTTP_ENDPOINTS
+                }
+            }
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_analytics(args, nodes, slots):
+    """Time the analytics stage on generated snapshots of one fleet size."""
+    from app.services.bridge_analytics import BridgeAnalytics
+
+    rng = random.Random(nodes)
+    ips = fleet_ips(nodes)
+    latencies = {ip: rng.uniform(0.02, 0.2) for ip in ips}
+    analytics = BridgeAnalytics(('bnb', 'eth', 'supernova'), args.analytics_window, slots)
+    # Space the snapshots so the last ones expire buckets, as in a long-running poller
+    step = max(1.0, 2 * args.analytics_window / args.analytics_updates)
+
+    durations = []
+    for update in range(args.analytics_updates):
+        orchestrators = []
+        for i, ip in enumerate(ips):
+            online = rng.random() > 0.05
+            orchestrators.append({
+                'ip': ip,
+                'pillar_name': pillar_name(i),
+                'status': 'online' if online else 'offline',
+                'state_num': 2 if online else None,
+                'network_stats': {
+                    network: {'wraps': rng.randint(0, 5) if online else 0,
+                              'unwraps': rng.randint(0, 5) if online else 0}
+                    for network in ('bnb', 'eth', 'supernova')
+                }
+            })
+        status_data = {'bridge_status': 'online', 'orchestrators': orchestrators}
+        started = time.perf_counter()
+        analytics.update(status_data, nodes * 2 // 3, latencies.get, update * step)
+        durations.append(time.perf_counter() - started)
+
+    return {
+        'nodes': nodes,
+        'slots': slots,
+        'updates': args.analytics_updates,
+        'update_ms': {
+            'mean': round(statistics.mean(durations) * 1000, 3),
+            'p50': round(statistics.median(durations) * 1000, 3),
+            'max': round(max(durations) * 1000, 3)
+        }
+    }
+
+
+def relative_change(current, baseline):
+    if not isinstance(current, (int, float)) or not isinstance(baseline, (int, float)) or not baseline:
+        return None
+    return round((current - baseline) / baseline, 3)
+
+
+def compare(report, baseline):
+    """Relative change of every measurement against a baseline report (0.1 = 10% higher)."""
+    comparison = {'baseline_commit': baseline.get('meta', {}).get('commit'), 'polling': [], 'http': {},
+                  'analytics': []}
+
+    baseline_runs = {(run['nodes'], run['engine']): run for run in baseline.get('polling', [])}
+    for run in report.get('polling', []):
+        before = baseline_runs.get((run['nodes'], run['engine']))
+        if before is None:
+            continue
+        comparison['polling'].append({
+            'nodes': run['nodes'],
+            'engine': run['engine'],
+            'cycle_p50': relative_change(run['cycle_seconds']['p50'], before['cycle_seconds']['p50']),
+            'cpu_seconds_per_cycle': relative_change(run['cpu_seconds_per_cycle'], before['cpu_seconds_per_cycle']),
+            'connections_opened_per_cycle': relative_change(run.get('connections_opened_per_cycle'),
+                                                            before.get('connections_opened_per_cycle')),
+            'rss_mb': relative_change(run['rss_mb'], before['rss_mb'])
+        })
+
+    baseline_endpoints = (baseline.get('http') or {}).get('endpoints', {})
+    for path, result in ((report.get('http') or {}).get('endpoints') or {}).items():
+        before = baseline_endpoints.get(path)
+        if before is None:
+            continue
+        comparison['http'][path] = {
+            'requests_per_second': relative_change(result['requests_per_second'], before['requests_per_second']),
+            'p50': relative_change(result['latency_ms']['p50'], before['latency_ms']['p50']),
+            'p99': relative_change(result['latency_ms']['p99'], before['latency_ms']['p99'])
+        }
+
+    baseline_runs = {(run['nodes'], run['slots']): run for run in baseline.get('analytics', [])}
+    for run in report.get('analytics', []):
+        before = baseline_runs.get((run['nodes'], run['slots']))
+        if before is None:
+            continue
+        comparison['analytics'].append({
+            'nodes': run['nodes'],
+            'slots': run['slots'],
+            'update_p50': relative_change(run['update_ms']['p50'], before['update_ms']['p50'])
+        })
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark polling cycles and HTTP endpoints')
+    group = parser.add_argument_group('polling')
+    group.add_argument('--fleet-sizes', default='20,100,1000', help='Comma-separated mock fleet sizes')
+    group.add_argument('--engines', default='threaded,async', help='Comma-separated polling engines')
+    group.add_argument('--cycles', type=int, default=5, help='Measured polling cycles per run')
+    group.add_argument('--latency', type=float, default=50, help='Mock response latency (ms)')
+    group.add_argument('--jitter', type=float, default=20, help='Mock latency jitter (+/- ms)')
+    group.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock requests that fail')
+    group.add_argument('--error-mode', default='rpc', choices=('rpc', 'http', 'close'))
+    group.add_argument('--rpc-mode', default='serial', choices=('serial', 'batch'))
+    group.add_argument('--max-workers', type=int, default=10, help='Threads for the threaded engine')
+    group.add_argument('--timeout', type=float, default=5, help='Orchestrator read timeout (s)')
+
+    group = parser.add_argument_group('http')
+    group.add_argument('--worker-class', default='gevent', help='Gunicorn worker class')
+    group.add_argument('--workers', type=int, default=2, help='Gunicorn workers')
+    group.add_argument('--clients', type=int, default=20, help='Concurrent HTTP clients')
+    group.add_argument('--duration', type=float, default=10, help='Seconds of load per endpoint')
+    group.add_argument('--http-orchestrators', type=int, default=20, help='Orchestrators in the generated snapshot')
+    group.add_argument('--port', type=int, default=5097)
+
+    group = parser.add_argument_group('analytics')
+    group.add_argument('--analytics-slots', default='96,1440', help='Comma-separated availability window slots')
+    group.add_argument('--analytics-window', type=float, default=86400, help='Availability window (s)')
+    group.add_argument('--analytics-updates', type=int, default=200, help='Snapshots analyzed per run')
+
+    parser.add_argument('--skip-polling', action='store_true')
+    parser.add_argument('--skip-http', action='store_true')
+    parser.add_argument('--skip-analytics', action='store_true')
+    parser.add_argument('--baseline', help='Earlier result file to compare against')
+    parser.add_argument('--output', help='Write results to this file instead of stdout')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    raise_file_limit()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'config': vars(args)
+        },
+        'polling': [],
+        'http': None,
+        'analytics': []
+    }
+
+    if not args.skip_polling:
+        for nodes in (int(size) for size in args.fleet_sizes.split(',')):
+            fleet = start_mock_fleet(args, nodes)
+            try:
+                for engine in args.engines.split(','):
+                    print(f"Polling {nodes} mock orchestrators with the {engine} engine...", file=sys.stderr)
+                    report['polling'].append(bench_polling(args, nodes, engine))
+            finally:
+                fleet.terminate()
+                fleet.wait(timeout=30)
+
+    if not args.skip_http:
+        print(f"Load-testing {', '.join(HTTP_ENDPOINTS)}...", file=sys.stderr)
+        report['http'] = bench_http(args)
+
+    if not args.skip_analytics:
+        for nodes in (int(size) for size in args.fleet_sizes.split(',')):
+            for slots in (int(value) for value in args.analytics_slots.split(',')):
+                print(f"Analyzing {nodes}-orchestrator snapshots with {slots} availability slots...", file=sys.stderr)
+                report['analytics'].append(bench_analytics(args, nodes, slots))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['comparison'] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+API Key Authentication Benchmark
+
+Measures the per-request overhead of require_api_key against the previous
+implementation (a linear scan of Config.API_KEYS after parsing the Referer),
+for a valid key, an invalid key and a web UI browser request, with a
+configurable number of configured keys. Each variant wraps a no-op view and is
+called repeatedly inside one request context, so only the decorator is timed.
+
+Usage:
+    python scripts/benchmark_auth.py --keys 5,100,1000 --iterations 100000
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from functools import wraps
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import abort, request  # noqa: E402
+from flask_limiter.util import get_remote_address  # noqa: E402
+
+from config.settings import Config  # noqa: E402
+from app.api import routes  # noqa: E402
+from app.main import create_app, get_logger  # noqa: E402
+from app.services.api_keys import ApiKeyStore  # noqa: E402
+from generate_api_key import generate_api_key  # noqa: E402
+
+SCENARIOS = {
+    'valid_key': {'headers': 'last'},
+    'invalid_key': {'headers': {'X-API-Key': 'zn_api_key_invalid'}},
+    'browser': {'headers': {'User-Agent': 'Mozilla/5.0', 'Referer': 'http://localhost/'}}
+}
+
+
+def legacy_require_api_key(f):
+    """require_api_key before the hashed key store, kept for comparison."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        referer = request.headers.get('Referer', '')
+        user_agent = request.headers.get('User-Agent', '')
+        host = request.headers.get('Host', '')
+
+        is_browser_request = False
+        if referer and user_agent and 'Mozilla' in user_agent:
+            try:
+                from urllib.parse import urlparse
+                referer_host = urlparse(referer).netloc
+                is_browser_request = referer_host == host
+            except:  # noqa: E722
+                pass
+
+        if not is_browser_request:
+            if Config.API_KEYS:
+                api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
+                if not api_key or api_key not in Config.API_KEYS:
+                    logger = get_logger()
+                    logger.warning(f"Unauthorized API access attempt from {get_remote_address()} with key: {api_key[:8] + '...' if api_key else 'None'}")
+                    abort(401, description="Invalid or missing API key")
+
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def view():
+    return None
+
+
+def time_calls(app, decorated, headers, iterations):
+    """Return the mean microseconds per call of a decorated view."""
+    with app.test_request_context('/api/status', headers=headers):
+        for _ in range(min(1000, iterations)):  # Warm-up
+            try:
+                decorated()
+            except Exception:
+                pass
+        started = time.perf_counter()
+        for _ in range(iterations):
+            try:
+                decorated()
+            except Exception:
+                pass  # 401 for invalid keys
+        return round((time.perf_counter() - started) / iterations * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark require_api_key overhead')
+    parser.add_argument('--keys', default='5,100,1000', help='Comma-separated numbers of configured keys')
+    parser.add_argument('--iterations', type=int, default=100000, help='Calls per measurement')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    app = create_app()
+    variants = {'legacy': legacy_require_api_key(view), 'current': routes.require_api_key(view)}
+
+    results = []
+    for count in (int(value) for value in args.keys.split(',')):
+        keys = [generate_api_key() for _ in range(count)]
+        Config.API_KEYS = keys
+        routes.api_keys = ApiKeyStore(keys)
+        for scenario, options in SCENARIOS.items():
+            headers = options['headers']
+            if headers == 'last':
+                headers = {'X-API-Key': keys[-1]}  # Worst case for the linear scan
+            row = {'keys': count, 'scenario': scenario}
+            for name, decorated in variants.items():
+                row[f'{name}_us'] = time_calls(app, decorated, headers, args.iterations)
+            row['speedup'] = round(row['legacy_us'] / row['current_us'], 2)
+            results.append(row)
+            print(f"{count:>6} keys  {scenario:<12} legacy {row['legacy_us']:>8.3f}us  "
+                  f"current {row['current_us']:>8.3f}us  x{row['speedup']}", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
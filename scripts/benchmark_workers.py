@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Worker Class Benchmark for the Bridge Health Service
+
+Starts Gunicorn once per worker class (sync and gevent by default) against a
+generated status snapshot, then:
+
+1. Opens many /api/stream connections at once and counts how many receive
+   their first event (idle connection capacity).
+2. While those streams stay open, hammers /api/status from concurrent clients
+   and reports throughput and latency percentiles.
+
+Results are printed as JSON.
+
+Usage:
+    python scripts/benchmark_workers.py --streams 500 --clients 50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+import aiohttp
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_KEY = 'zn_benchmark_key'
+
+
+def write_environment(directory, orchestrators):
+    """
+    Create a status snapshot for the benchmark server.
+
+    Returns:
+        Environment variables configuring the server
+    """
+    ips = [f"10.0.{i // 250}.{i % 250 + 1}" for i in range(orchestrators)]
+    settings = {
+        'API_KEYS': API_KEY,
+        'RATE_LIMIT_PER_MINUTE': '100000000',
+        'SHARED_SNAPSHOT_PATH': '',
+        'HISTORY_ENABLED': 'false',
+        'STREAM_MAX_CLIENTS': '100000',
+        'LOG_LEVEL': 'WARNING',
+        'LOG_DIR': os.path.join(directory, 'logs')
+    }
+    for i, ip in enumerate(ips, start=1):
+        settings[f'ORCHESTRATOR_IP_{i}'] = ip
+
+    os.makedirs(os.path.join(directory, 'data'), exist_ok=True)
+    orchestrator_entries = [{
+        'ip': ip,
+        'pillar_name': f'Pillar{i}',
+        'pillar_url': f'pillar{i}',
+        'producer_address': 'z1qzkd8urw7c4wg6x0cvd2nrzr4ke9d4zh0tvd8s',
+        'status': 'online',
+        'state': '0 (LiveState)',
+        'state_num': 0,
+        'network_stats': {network: {'wraps': 0, 'unwraps': 0} for network in ('bnb', 'eth', 'supernova')},
+        'error': None,
+        'last_checked': datetime.now().isoformat(),
+        'api_pillar_name': f'Pillar{i}',
+        'name_mismatch': False,
+        'changed_version': 1
+    } for i, ip in enumerate(ips)]
+    status = {
+        'timestamp': datetime.now().isoformat(),
+        'bridge_status': 'online',
+        'online_count': len(ips),
+        'total_count': len(ips),
+        'query_time_seconds': 1.0,
+        'orchestrators': orchestrator_entries,
+        'version': 1,
+        'base_version': 1,
+        'removed': {}
+    }
+    with open(os.path.join(directory, 'data', 'orchestrator_status.json'), 'w') as f:
+        json.dump(status, f)
+    return settings
+
+
+def start_server(directory, settings, worker_class, workers, port, keepalive):
+    """Start Gunicorn without the project config (so no poller is spawned)."""
+    env = dict(os.environ, **settings)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get('PYTHONPATH')]))
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--worker-class', worker_class,
+        '--workers', str(workers),
+        '--worker-connections', '10000',
+        '--keep-alive', str(keepalive),
+        '--bind', f'127.0.0.1:{port}',
+        '--log-level', 'warning',
+        'app.main:create_app()'
+    ]
+    process = subprocess.Popen(command, cwd=directory, env=env)
+
+    # Wait for the server to accept requests
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=2).read()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Gunicorn ({worker_class}) exited during startup")
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Gunicorn ({worker_class}) did not start")
+
+
+async def open_stream(session, url, connected, hold):
+    """Open one /api/stream connection and keep it open until `hold` is set."""
+    try:
+        async with session.get(url, headers={'X-API-Key': API_KEY}) as response:
+            if response.status != 200:
+                return
+            # Skip the retry hint and wait for the snapshot event
+            async for line in response.content:
+                if line.startswith(b'event:'):
+                    connected.append(time.monotonic())
+                    break
+            await hold.wait()
+    except (asyncio.TimeoutError, aiohttp.ClientError):
+        pass
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(len(values) * p))] * 1000, 2)
+
+
+async def run_benchmark(port, streams, clients, duration, first_event_timeout):
+    """Open `streams` idle streams, then measure /api/status while they stay open."""
+    base = f'http://127.0.0.1:{port}'
+    connected = []
+    hold = asyncio.Event()
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as stream_session:
+        # Phase 1: idle streaming connections
+        tasks = [asyncio.create_task(open_stream(stream_session, f'{base}/api/stream', connected, hold))
+                 for _ in range(streams)]
+        await asyncio.sleep(first_event_timeout)
+        streams_established = len(connected)
+
+        # Phase 2: request throughput while the streams are held open
+        latencies = []
+        errors = 0
+        ends_at = time.monotonic() + duration
+
+        async def client(session):
+            nonlocal errors
+            while time.monotonic() < ends_at:
+                started = time.perf_counter()
+                try:
+                    async with session.get(f'{base}/api/status', headers={'X-API-Key': API_KEY}) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                            continue
+                except (asyncio.TimeoutError, aiohttp.ClientError):
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        request_timeout = aiohttp.ClientTimeout(total=max(1.0, ends_at - time.monotonic()))
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0),
+                                         timeout=request_timeout) as session:
+            await asyncio.gather(*(client(session) for _ in range(clients)))
+
+        hold.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    return {
+        'streams_requested': streams,
+        'streams_established': streams_established,
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': round(len(latencies) / duration, 1),
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50),
+            'p99': percentile(latencies, 0.99),
+            'max': percentile(latencies, 1.0)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Gunicorn worker classes under many idle connections')
+    parser.add_argument('--worker-classes', default='sync,gevent', help='Comma-separated worker classes')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes per run')
+    parser.add_argument('--streams', type=int, default=200, help='Idle /api/stream connections to open')
+    parser.add_argument('--clients', type=int, default=20, help='Concurrent /api/status clients')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of /api/status load per run')
+    parser.add_argument('--first-event-timeout', type=float, default=5,
+                        help='Seconds a stream may wait for its first event')
+    parser.add_argument('--orchestrators', type=int, default=20, help='Orchestrators in the generated snapshot')
+    parser.add_argument('--port', type=int, default=5098)
+    args = parser.parse_args()
+
+    report = {
+        'config': vars(args),
+        'results': {}
+    }
+    directory = tempfile.mkdtemp(prefix='bridge-health-bench-')
+    try:
+        settings = write_environment(directory, args.orchestrators)
+        for worker_class in args.worker_classes.split(','):
+            keepalive = 75 if worker_class == 'gevent' else 2
+            print(f"Benchmarking {worker_class} workers...", file=sys.stderr)
+            process = start_server(directory, settings, worker_class, args.workers, args.port, keepalive)
+            try:
+                report['results'][worker_class] = asyncio.run(run_benchmark(
+                    args.port, args.streams, args.clients, args.duration, args.first_event_timeout
+                ))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Mock Orchestrator Fleet
+
+Serves the orchestrator JSON-RPC API (getIdentity and getStatus, single calls
+and batches) on one loopback address per node, so the poller can be exercised
+against fleets of any size without real orchestrators. Latency, jitter and
+error rate are configurable.
+
+Node i listens on 127.0.<i // 250>.<i % 250 + 1>, port 55000, and reports the
+pillar name Mock<i>. Prints "ready" once every node is listening.
+
+Usage:
+    python scripts/mock_orchestrator.py --nodes 100 --latency 50 --jitter 20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+
+DEFAULT_PORT = 55000
+ERROR_MODES = ('rpc', 'http', 'close')
+
+
+def fleet_ips(nodes: int):
+    """Return the loopback addresses of a mock fleet of the given size."""
+    return [f"127.0.{i // 250}.{i % 250 + 1}" for i in range(nodes)]
+
+
+def pillar_name(index: int) -> str:
+    return f"Mock{index}"
+
+
+class MockOrchestrator:
+    """Answers JSON-RPC requests for one mock node."""
+
+    def __init__(self, index: int, args):
+        self.index = index
+        self.args = args
+        self.rng = random.Random(index)
+
+    def _result(self, method: str):
+        if method == 'getIdentity':
+            return {'pillarName': pillar_name(self.index),
+                    'producer': f"z1qmock{self.index:034d}"}
+        if method == 'getStatus':
+            return {
+                'state': 0,
+                'networks': {
+                    'BNB Chain': {'wrapsToSign': 0, 'unwrapsToSign': 0},
+                    'Ethereum': {'wrapsToSign': self.rng.randint(0, 1), 'unwrapsToSign': 0},
+                    'Supernova': {'wrapsToSign': 0, 'unwrapsToSign': 0}
+                }
+            }
+        return None
+
+    def _answer(self, call):
+        reply = {'jsonrpc': '2.0', 'id': call.get('id')}
+        result = self._result(call.get('method'))
+        if result is None:
+            reply['error'] = {'code': -32601, 'message': 'Method not found'}
+        else:
+            reply['result'] = result
+        return reply
+
+    @staticmethod
+    def _error(call):
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32000, 'message': 'Mock error'}}
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 keep-alive requests on one connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                delay = self.args.latency + self.rng.uniform(-self.args.jitter, self.args.jitter)
+                if delay > 0:
+                    await asyncio.sleep(delay / 1000)
+
+                answer = self._answer
+                if self.rng.random() < self.args.error_rate:
+                    if self.args.error_mode == 'close':
+                        break
+                    if self.args.error_mode == 'http':
+                        writer.write(b'HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n\r\n')
+                        await writer.drain()
+                        continue
+                    answer = self._error
+
+                call = json.loads(body)
+                payload = [answer(c) for c in call] if isinstance(call, list) else answer(call)
+
+                data = json.dumps(payload).encode('utf-8')
+                writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: %d\r\n\r\n' % len(data) + data)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def raise_file_limit():
+    """Raise the open file limit to the hard limit (one socket per node plus client connections)."""
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ValueError, OSError):
+        pass
+
+
+async def serve(args):
+    servers = []
+    for index, ip in enumerate(fleet_ips(args.nodes)):
+        node = MockOrchestrator(index, args)
+        servers.append(await asyncio.start_server(node.handle, ip, args.port, backlog=1024))
+    print('ready', flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a mock orchestrator fleet on loopback addresses')
+    parser.add_argument('--nodes', type=int, default=20, help='Number of mock orchestrators')
+    parser.add_argument('--latency', type=float, default=50, help='Response latency in milliseconds')
+    parser.add_argument('--jitter', type=float, default=0, help='Uniform latency jitter (+/- ms)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests that fail')
+    parser.add_argument('--error-mode', choices=ERROR_MODES, default='rpc',
+                        help="How requests fail: JSON-RPC error, HTTP 503 or a closed connection")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    raise_file_limit()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+"""
+Shared pytest setup: makes the repository root importable so tests can use
+the app and config packages without installing them.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,19 @@
+"""
+Tests for API query parameter parsing.
+"""
+import pytest
+
+from app.api.routes import parse_time_param
+
+
+def test_parse_time_param():
+    assert parse_time_param(None, 5) == 5
+    assert parse_time_param('', 5) == 5
+    assert parse_time_param('1700000000.5', 0) == 1700000000
+    assert parse_time_param('2024-01-01T00:00:00+00:00', 0) == 1704067200
+
+
+@pytest.mark.parametrize('value', ['inf', '-inf', 'nan', '1e400', 'yesterday'])
+def test_parse_time_param_rejects_invalid_times(value):
+    with pytest.raises(ValueError):
+        parse_time_param(value, 0)
@@ -0,0 +1,95 @@
+"""
+Tests for the per-orchestrator circuit breaker.
+"""
+import pytest
+
+from app.services.circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+
+ERROR = {'ip': '10.0.0.1', 'status': 'offline', 'error': 'Connection refused'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=10, max_reset_timeout=30, clock=clock)
+
+
+def state(breaker):
+    return breaker.describe('10.0.0.1')['state']
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        breaker.record_failure('10.0.0.1', ERROR)
+
+
+def test_opens_after_threshold(breaker):
+    fail(breaker, 2)
+    assert state(breaker) == STATE_CLOSED
+    assert breaker.allow('10.0.0.1')
+
+    fail(breaker)
+    assert state(breaker) == STATE_OPEN
+    assert not breaker.allow('10.0.0.1')
+    assert breaker.last_error('10.0.0.1') == ERROR
+    assert breaker.describe('10.0.0.1')['next_probe'] is not None
+
+
+def test_half_open_probe_success_closes(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 10
+    assert breaker.allow('10.0.0.1')
+    assert state(breaker) == STATE_HALF_OPEN
+    assert not breaker.allow('10.0.0.1')  # Only one probe at a time
+
+    breaker.record_success('10.0.0.1')
+    assert state(breaker) == STATE_CLOSED
+    assert breaker.describe('10.0.0.1')['failures'] == 0
+    assert breaker.last_error('10.0.0.1') is None
+    assert breaker.allow('10.0.0.1')
+
+
+def test_failed_probe_reopens_with_doubled_timeout(breaker, clock):
+    fail(breaker, 3)
+    for timeout in (20, 30, 30):  # Doubled after each failed probe, up to max_reset_timeout
+        clock.now += 100
+        assert breaker.allow('10.0.0.1')
+        fail(breaker)
+        assert state(breaker) == STATE_OPEN
+        clock.now += timeout - 1
+        assert not breaker.allow('10.0.0.1')
+        clock.now += 1
+        assert breaker.allow('10.0.0.1')
+        fail(breaker)
+
+    breaker.record_success('10.0.0.1')
+    fail(breaker, 3)
+    clock.now += 10  # The timeout is back to reset_timeout once closed
+    assert breaker.allow('10.0.0.1')
+
+
+def test_unanswered_probe_is_replaced(breaker, clock):
+    fail(breaker, 3)
+    clock.now += 10
+    assert breaker.allow('10.0.0.1')
+    clock.now += 10
+    assert breaker.allow('10.0.0.1')
+
+
+def test_disabled_breaker_always_allows(clock):
+    breaker = CircuitBreaker(failure_threshold=0, clock=clock)
+    fail(breaker, 10)
+    assert breaker.allow('10.0.0.1')
+    assert state(breaker) == STATE_CLOSED
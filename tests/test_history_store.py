@@ -0,0 +1,38 @@
+"""
+Tests for the history ring files.
+"""
+import time
+
+from app.services.history_store import FLEET_SERIES, HistoryStore
+
+
+def record_minutes(store, last_bucket, minutes):
+    """Record one sample, 5 seconds into each of the `minutes` buckets up to last_bucket, oldest first."""
+    for age in range(minutes - 1, -1, -1):
+        store.record({'online_count': age, 'bridge_status': 'online'}, last_bucket - age * 60 + 5)
+
+
+def test_query_beyond_retention_with_unaligned_end(tmp_path):
+    store = HistoryStore(str(tmp_path), {'1m': 10})
+    now_bucket = int(time.time()) // 60 * 60
+    record_minutes(store, now_bucket, 15)
+
+    for end in (now_bucket + 60, now_bucket + 30):  # Aligned and unaligned `to`
+        result = store.query(FLEET_SERIES, 'online_count', 0, end, 60)
+        assert result['resolution'] == '1m'
+        assert [point['timestamp'] for point in result['points']] == [
+            now_bucket - age * 60 for age in range(9, -1, -1)]
+        assert [point['avg'] for point in result['points']] == list(range(9, -1, -1))
+    store.close()
+
+
+def test_query_within_retention(tmp_path):
+    store = HistoryStore(str(tmp_path), {'1m': 10})
+    now_bucket = int(time.time()) // 60 * 60
+    record_minutes(store, now_bucket, 5)
+
+    # `from` falls inside a bucket, which is included
+    result = store.query(FLEET_SERIES, 'online_count', now_bucket - 150, now_bucket + 30, 120)
+    assert result['step'] == 120
+    assert sum(point['count'] for point in result['points']) == 4
+    store.close()
@@ -0,0 +1,72 @@
+"""
+Tests for the per-process metric files and folding of exited processes.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from app.services.metrics import EXITED_FILE, QUERY_DURATION, QUERY_RESULTS, MetricsRegistry, fold_exited
+
+LABELS = (('ip', '10.0.0.1'), ('result', 'ok'))
+
+
+def dead_pid():
+    """The pid of a process that has exited and been reaped."""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def write_process_file(directory, pid, token, value):
+    data = {'counters': [[QUERY_RESULTS, [list(pair) for pair in LABELS], value]],
+            'histograms': [[QUERY_DURATION, [['ip', '10.0.0.1']], [1] + [0] * 11, 0.001, 1]]}
+    with open(os.path.join(directory, f'{pid}-{token}.json'), 'w') as f:
+        json.dump(data, f)
+
+
+def total(registry):
+    return registry.collect()['counters'][(QUERY_RESULTS, LABELS)]
+
+
+def test_files_are_unique_per_process_start(tmp_path):
+    first, second = MetricsRegistry(), MetricsRegistry()
+    for registry in (first, second):
+        registry.configure(str(tmp_path))
+        registry.inc(QUERY_RESULTS, LABELS)
+        registry.flush()
+    # Same pid, different start token: neither overwrites the other
+    assert len(list(tmp_path.glob(f'{os.getpid()}-*.json'))) == 2
+    assert total(first) == 2
+
+
+def test_exited_processes_are_folded(tmp_path):
+    registry = MetricsRegistry()
+    registry.configure(str(tmp_path))
+    registry.inc(QUERY_RESULTS, LABELS, 5)
+
+    pid = dead_pid()
+    write_process_file(tmp_path, pid, 'aaaa', 3)
+    write_process_file(tmp_path, pid, 'bbbb', 4)  # An earlier process with the same pid
+    assert total(registry) == 12
+
+    assert fold_exited(str(tmp_path)) == 2
+    assert sorted(path.name for path in tmp_path.glob('*.json')) == sorted(
+        [EXITED_FILE, f'{os.getpid()}-{registry._token}.json'])
+    assert total(registry) == 12
+    assert registry.collect()['histograms'][(QUERY_DURATION, (('ip', '10.0.0.1'),))].count == 2
+
+    # Later exits add to the running total
+    write_process_file(tmp_path, dead_pid(), 'cccc', 1)
+    assert fold_exited(str(tmp_path)) == 1
+    assert total(registry) == 13
+
+
+def test_running_processes_are_not_folded(tmp_path):
+    registry = MetricsRegistry()
+    registry.configure(str(tmp_path))
+    registry.inc(QUERY_RESULTS, LABELS)
+    registry.flush()
+    assert fold_exited(str(tmp_path)) == 0
+    assert not (tmp_path / EXITED_FILE).exists()
+    assert fold_exited(str(tmp_path / 'missing')) == 0
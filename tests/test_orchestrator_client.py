@@ -0,0 +1,73 @@
+"""
+Tests for the threaded engine's cycle deadline.
+"""
+import socket
+import threading
+import time
+
+import pytest
+
+from app.services.orchestrator_client import MIN_REQUEST_TIMEOUT, OrchestratorClient
+
+
+@pytest.fixture
+def silent_server():
+    """A port that accepts connections and never answers."""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(64)
+    yield server.getsockname()[1]
+    server.close()
+
+
+@pytest.fixture
+def client(silent_server):
+    client = OrchestratorClient(timeout=5, port=silent_server, cycle_deadline=0.3,
+                                rate_limit=0, breaker_threshold=0)
+    yield client
+    client.close()
+
+
+def test_request_timeout_clamped_to_deadline(client):
+    assert client.request_timeout('127.0.0.1') == (client.connect_timeout, 5)
+    client._deadlines['127.0.0.1'] = time.monotonic() + 0.5
+    connect_timeout, read_timeout = client.request_timeout('127.0.0.1')
+    assert 0.4 < read_timeout <= 0.5 and connect_timeout == read_timeout
+    client._deadlines['127.0.0.1'] = time.monotonic() - 1
+    assert client.request_timeout('127.0.0.1') == (MIN_REQUEST_TIMEOUT, MIN_REQUEST_TIMEOUT)
+
+
+def test_straggler_is_abandoned_at_deadline(client):
+    started = time.monotonic()
+    results, _ = client.query_all_orchestrators(['127.0.0.1'], min_online=1)
+    assert results[0]['state'] == 'Timeout'
+    assert time.monotonic() - started < 1
+
+    # The hung request times out by the deadline instead of after the 5s read timeout
+    while client._in_flight and time.monotonic() - started < 2:
+        time.sleep(0.01)
+    assert not client._in_flight
+
+
+def test_in_flight_orchestrator_is_not_queued_again(client, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def hang(ip):
+        calls.append(ip)
+        release.wait(5)
+        return client._create_error_response(ip, 'released')
+
+    monkeypatch.setattr(client, 'query_single_orchestrator', hang)
+    first, _ = client.query_all_orchestrators(['10.0.0.1'], min_online=1)
+    second, _ = client.query_all_orchestrators(['10.0.0.1'], min_online=1)
+    assert [r['state'] for r in first + second] == ['Timeout', 'Timeout']
+    assert calls == ['10.0.0.1']
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while client._in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    third, _ = client.query_all_orchestrators(['10.0.0.1'], min_online=1)
+    assert third[0]['error'] == 'released'
+    assert calls == ['10.0.0.1', '10.0.0.1']
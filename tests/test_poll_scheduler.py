@@ -0,0 +1,95 @@
+"""
+Tests for the adaptive polling schedule.
+"""
+import random
+
+import pytest
+
+from app.services.poll_scheduler import JITTER, PollScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def online(ip, state_num=1, pending=0):
+    return {'ip': ip, 'status': 'online', 'state_num': state_num,
+            'network_stats': {'eth': {'wraps': pending, 'unwraps': 0}}}
+
+
+def unreachable(ip):
+    return {'ip': ip, 'status': 'offline', 'state_num': None, 'error': 'Connection refused'}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return PollScheduler(base_interval=10, fast_interval=2, max_backoff=80, hot_seconds=30,
+                         clock=clock, rng=random.Random(1))
+
+
+def interval(scheduler, clock, ip):
+    return scheduler.nodes[ip].next_due - clock.now
+
+
+def test_new_nodes_are_staggered(scheduler, clock):
+    scheduler.set_ips(['a', 'b', 'c', 'd'])
+    due = sorted(node.next_due - clock.now for node in scheduler.nodes.values())
+    assert due == [2.5, 5.0, 7.5, 10.0]
+
+    assert scheduler.pop_due() == []
+    clock.now += 5
+    assert scheduler.pop_due() == ['a', 'b']
+
+
+def test_unreachable_node_backs_off_then_recovers(scheduler, clock):
+    scheduler.set_ips(['a'], stagger=False)
+    assert scheduler.pop_due() == ['a']
+
+    ceilings = []
+    for failures in range(1, 7):
+        scheduler.record(unreachable('a'))
+        ceiling = min(80, 10 * 2 ** (failures - 1))
+        ceilings.append(ceiling)
+        assert 10 <= interval(scheduler, clock, 'a') <= ceiling
+        assert scheduler.nodes['a'].failures == failures
+    assert ceilings[-1] == 80  # Capped at max_backoff
+    assert scheduler.stats()['backing_off'] == 1
+
+    # Coming back is a state change: fast polling until the node has been stable for hot_seconds
+    scheduler.record(online('a'))
+    assert scheduler.nodes['a'].failures == 0
+    assert interval(scheduler, clock, 'a') <= 2 * (1 + JITTER)
+    assert scheduler.stats()['backing_off'] == 0
+
+    clock.now += 31
+    scheduler.record(online('a'))
+    assert 10 * (1 - JITTER) <= interval(scheduler, clock, 'a') <= 10 * (1 + JITTER)
+
+
+def test_pending_work_polls_fast(scheduler, clock):
+    scheduler.set_ips(['a'], stagger=False)
+    scheduler.record(online('a'))  # First poll is not a change
+    assert interval(scheduler, clock, 'a') >= 10 * (1 - JITTER)
+
+    scheduler.record(online('a', pending=3))
+    assert interval(scheduler, clock, 'a') <= 2 * (1 + JITTER)
+
+
+def test_removed_and_rescheduled_entries_are_skipped(scheduler, clock):
+    scheduler.set_ips(['a', 'b'], stagger=False)
+    scheduler.set_ips(['b'])
+    scheduler.defer(['b'], 5)
+    assert scheduler.pop_due() == []
+    assert scheduler.seconds_until_due() == 5
+
+    clock.now += 5
+    assert scheduler.pop_due() == ['b']
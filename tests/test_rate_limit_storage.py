@@ -0,0 +1,91 @@
+"""
+Tests for the shared-memory rate limit storage.
+"""
+import pytest
+
+from app.services import rate_limit_storage
+from app.services.rate_limit_storage import SharedMemoryStorage
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(rate_limit_storage.time, 'time', fake.time)
+    return fake
+
+
+@pytest.fixture
+def uri(tmp_path):
+    return f"shm://{tmp_path / 'ratelimit'}?slots=8"
+
+
+def test_instances_share_counters(uri, clock):
+    first, second = SharedMemoryStorage(uri), SharedMemoryStorage(uri)
+
+    assert first.incr('fixed', 60) == 1
+    assert second.incr('fixed', 60) == 2
+    assert first.get('fixed') == 2
+    assert second.get_expiry('fixed') == clock.now + 60
+
+    clock.now += 61
+    assert first.get('fixed') == 0
+    assert second.incr('fixed', 60) == 1
+
+
+def test_sliding_window_limit_across_instances(uri, clock):
+    first, second = SharedMemoryStorage(uri), SharedMemoryStorage(uri)
+    clock.now = 60 * 1000.0  # Start of a window
+
+    assert first.acquire_sliding_window_entry('client', 3, 60)
+    assert second.acquire_sliding_window_entry('client', 3, 60)
+    assert first.acquire_sliding_window_entry('client', 3, 60)
+    assert not second.acquire_sliding_window_entry('client', 3, 60)
+    assert first.get_sliding_window('client', 60)[2] == 3
+
+    # Halfway through the next window half of the previous count (1.5) still applies
+    clock.now += 90
+    previous, previous_ttl, current, _ = second.get_sliding_window('client', 60)
+    assert (previous, previous_ttl, current) == (3, 30.0, 0)
+    assert first.acquire_sliding_window_entry('client', 3, 60)
+    assert second.acquire_sliding_window_entry('client', 3, 60)
+    assert not first.acquire_sliding_window_entry('client', 3, 60)
+
+    # Two windows later nothing is left
+    clock.now += 120
+    assert second.get_sliding_window('client', 60)[0::2] == (0, 0)
+
+
+def test_least_recently_used_key_is_evicted(uri, clock):
+    first, second = SharedMemoryStorage(uri), SharedMemoryStorage(uri)
+    # With 8 slots every key probes the whole table
+    for n in range(8):
+        clock.now += 1
+        (first if n % 2 else second).incr(f'key{n}', 3600)
+    clock.now += 1
+    first.incr('key0', 3600)  # key1 is now the least recently used
+
+    clock.now += 1
+    second.incr('key8', 3600)
+    assert first.get('key1') == 0
+    assert first.get('key0') == 2
+    assert all(second.get(f'key{n}') == 1 for n in range(2, 9))
+    assert second.reset() == 8
+
+
+def test_clear_and_reset(uri, clock):
+    first, second = SharedMemoryStorage(uri), SharedMemoryStorage(uri)
+    first.incr('a', 60)
+    first.incr('b', 60)
+    second.clear('a')
+    assert first.get('a') == 0
+    assert first.get('b') == 1
+    assert second.reset() == 1
+    assert first.get('b') == 0
@@ -0,0 +1,91 @@
+"""
+Tests for RedisStorageBackend against fakeredis.
+"""
+import time
+
+import pytest
+
+from app.services.response_cache import render_json
+from app.services.storage import RedisStorageBackend
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+def render(snapshot):
+    data = snapshot.data
+    return {'status': render_json('status', data, time.time())}
+
+
+def make_backend(server, **kwargs):
+    return RedisStorageBackend(fakeredis.FakeRedis(server=server), render, prefix='test', poll_interval=0, **kwargs)
+
+
+def status(n):
+    return {
+        'timestamp': f'2024-01-01T00:00:{n:02d}',
+        'bridge_status': 'online',
+        'orchestrators': [{'ip': '10.0.0.1', 'state_num': n}],
+        'removed': []
+    }
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def test_publish_then_read_from_another_instance(server):
+    writer = make_backend(server)
+    reader = make_backend(server)
+    assert reader.get_snapshot() is None
+
+    published = writer.publish(status(1))
+    snapshot = reader.get_snapshot()
+
+    assert snapshot.key == published.key
+    assert snapshot.data == status(1)
+    rendered = snapshot.derive('rendered:status', lambda data: None)
+    expected = render(published)['status']
+    assert rendered.body == expected.body
+    assert rendered.etag == expected.etag
+
+    writer.publish(status(2))
+    assert reader.get_snapshot().data == status(2)
+
+
+def test_history_keeps_newest_summaries(server):
+    backend = make_backend(server, history_length=3)
+    for n in range(5):
+        backend.publish(status(n))
+
+    history = backend.get_history(limit=10)
+    assert [entry['timestamp'] for entry in history] == [status(n)['timestamp'] for n in (4, 3, 2)]
+    assert history[0]['states'] == {'10.0.0.1': 4}
+    assert 'orchestrators' not in history[0]
+    assert backend.client.llen('test:history') == 3
+
+
+def test_leader_lock_handoff(server):
+    first = make_backend(server, leader_ttl=1)
+    second = make_backend(server, leader_ttl=1)
+
+    assert first.should_poll()
+    assert not second.should_poll()
+    assert first.should_poll()  # The leader renews its own lock
+
+    # The leader stops renewing (e.g. it crashed); the lock expires and the standby takes over
+    time.sleep(1.2)
+    assert second.should_poll()
+    assert not first.should_poll()
+
+
+def test_heartbeat_only_from_leader(server):
+    leader = make_backend(server)
+    standby = make_backend(server)
+    assert leader.should_poll()
+
+    standby.heartbeat()
+    assert leader.last_heartbeat() is None
+
+    leader.heartbeat()
+    assert standby.last_heartbeat() is not None
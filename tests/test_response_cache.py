@@ -0,0 +1,26 @@
+"""
+Tests for pre-serialized API responses.
+"""
+from werkzeug.datastructures import Accept
+
+from app.services.response_cache import MIN_COMPRESS_SIZE, render_json
+
+
+def test_etag_follows_the_body():
+    payload = {'success': True, 'data': {'timestamp': '2024-01-01T00:00:00'}, 'api_version': '1'}
+    first = render_json('status', payload, 0)
+    assert render_json('status', dict(payload), 0).etag == first.etag
+    assert render_json('summary', payload, 0).etag != first.etag
+
+    # Same snapshot timestamp, different body
+    assert render_json('status', dict(payload, api_version='2'), 0).etag != first.etag
+
+
+def test_variants_and_selection():
+    small = render_json('status', {'data': 'x'}, 0)
+    assert small.variants == {}
+    large = render_json('status', {'data': 'x' * MIN_COMPRESS_SIZE}, 0)
+    assert 'gzip' in large.variants
+    body, encoding, etag = large.select(Accept([('gzip', 1)]))
+    assert encoding == 'gzip' and etag == f"{large.etag}-gzip"
+    assert large.select(Accept())[1] is None
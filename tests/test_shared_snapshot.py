@@ -0,0 +1,132 @@
+"""
+Tests for the shared-memory snapshot segment and its seqlock reader.
+"""
+import pytest
+
+from app.services import shared_snapshot
+from app.services.shared_snapshot import OFF_SEQ, U64, SharedSnapshotReader, SharedSnapshotWriter
+
+
+class InterleavingU64:
+    """U64 stand-in that runs a callback on the reader's N-th sequence read."""
+
+    def __init__(self, reader, on_read, at):
+        self.reader = reader
+        self.on_read = on_read
+        self.at = at
+        self.seq_reads = 0
+
+    def unpack_from(self, buffer, offset=0):
+        if offset == OFF_SEQ and buffer is self.reader._mm:
+            self.seq_reads += 1
+            if self.seq_reads == self.at:
+                self.on_read()
+        return U64.unpack_from(buffer, offset)
+
+    def pack_into(self, buffer, offset, value):
+        U64.pack_into(buffer, offset, value)
+
+
+@pytest.fixture
+def segment(tmp_path):
+    writer = SharedSnapshotWriter(str(tmp_path / 'segment'))
+    reader = SharedSnapshotReader(writer.path)
+    yield writer, reader
+    writer.close()
+
+
+def test_read_before_and_after_publish(segment):
+    writer, reader = segment
+    assert reader.read() is None
+
+    assert writer.publish(b'first') == 1
+    assert reader.read() == (1, b'first')
+    assert writer.publish(b'second') == 2
+    assert reader.version() == 2
+    assert reader.read() == (2, b'second')
+
+
+def test_torn_read_is_retried(segment, monkeypatch):
+    writer, reader = segment
+    writer.publish(b'a' * 100)
+    writer.publish(b'b' * 100)
+    assert reader.attached
+
+    # Two publishes land while the payload is copied out: the second one
+    # overwrites the slot being read, so the copy must be discarded
+    def publish_during_copy():
+        writer.publish(b'c' * 100)
+        writer.publish(b'd' * 100)
+
+    interleaved = InterleavingU64(reader, publish_during_copy, at=2)
+    monkeypatch.setattr(shared_snapshot, 'U64', interleaved)
+
+    assert reader.read() == (4, b'd' * 100)
+    assert interleaved.seq_reads == 4  # One torn attempt, then a clean one
+
+
+def test_read_waits_for_writer_in_progress(segment, monkeypatch):
+    writer, reader = segment
+    writer.publish(b'payload')
+    seq = U64.unpack_from(writer._mm, OFF_SEQ)[0]
+    writer._set_u64(OFF_SEQ, seq + 1)  # A publish is under way
+
+    spins = []
+
+    def finish_publish(_):
+        spins.append(1)
+        writer._set_u64(OFF_SEQ, seq + 2)
+
+    monkeypatch.setattr(shared_snapshot.time, 'sleep', finish_publish)
+    assert reader.read() == (1, b'payload')
+    assert len(spins) == 1
+
+
+def test_read_gives_up_on_a_stuck_writer(segment):
+    writer, reader = segment
+    writer.publish(b'payload')
+    writer._set_u64(OFF_SEQ, U64.unpack_from(writer._mm, OFF_SEQ)[0] + 1)
+    assert reader.read() is None
+
+
+def test_reader_follows_segment_growth(segment):
+    writer, reader = segment
+    writer.publish(b'small')
+    assert reader.read() == (1, b'small')
+
+    large = b'x' * (shared_snapshot.INITIAL_CAPACITY + 1)
+    writer.publish(large)
+    assert reader.read() == (2, large)
+
+
+def test_writer_reopens_existing_segment(segment):
+    writer, reader = segment
+    writer.publish(b'one')
+    restarted = SharedSnapshotWriter(writer.path)
+    try:
+        assert restarted.publish(b'two') == 2
+    finally:
+        restarted.close()
+    assert reader.read() == (2, b'two')
+
+
+@pytest.mark.parametrize('target, error', [
+    ('os.open', PermissionError(13, 'Permission denied')),
+    ('mmap.mmap', ValueError('mmap length is greater than file size')),
+])
+def test_unmappable_segment_reads_as_empty(segment, monkeypatch, target, error):
+    writer, reader = segment
+    writer.publish(b'payload')
+
+    def fail(*args, **kwargs):
+        raise error
+
+    module, name = target.split('.')
+    monkeypatch.setattr(getattr(shared_snapshot, module), name, fail)
+    assert reader.read() is None
+    assert reader.version() == 0
+    assert reader.heartbeat() is None
+
+    monkeypatch.undo()
+    reader._next_attach = 0.0
+    assert reader.read() == (1, b'payload')
@@ -0,0 +1,42 @@
+"""
+Tests for StatusService ownership of the orchestrator client.
+"""
+import pytest
+
+from app.services import status_service
+from app.services.status_service import StatusService
+from app.services.storage import StorageBackend
+from config.settings import Config
+
+
+class CountingClient:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+class NullStorage(StorageBackend):
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def no_history(monkeypatch):
+    monkeypatch.setattr(Config, 'HISTORY_ENABLED', False)
+
+
+def test_shared_client_is_not_closed_by_services():
+    client = CountingClient()
+    services = [StatusService(storage=NullStorage(), client=client) for _ in range(3)]
+    for service in services:
+        service.close()
+    assert client.closed == 0
+
+
+def test_service_closes_the_client_it_created(monkeypatch):
+    client = CountingClient()
+    monkeypatch.setattr(status_service, 'create_client', lambda: client)
+    StatusService(storage=NullStorage()).close()
+    assert client.closed == 1